@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""Run the performance benchmark suite and gate on a stored baseline.
+
+Usage:
+  PYTHONPATH=. python scripts/benchmark.py                          (1e3-1e5 bars, compare to benchmarks/baseline.json)
+  PYTHONPATH=. python scripts/benchmark.py --sizes 1e3,1e5,1e7 --cases backtest_fixed,backtest_atr_sma
+  PYTHONPATH=. python scripts/benchmark.py --update-baseline        (record this machine's numbers as the baseline)
+  PYTHONPATH=. python scripts/benchmark.py --imports                (cold-start import times against the budget)
+
+Exits with status 1 when any case is slower (bars/sec) or uses more peak
+memory than the baseline by more than --tolerance, or with --imports when
+an import exceeds --import-budget or loads plotting/pandas eagerly.
+"""
+
+import argparse
+from pathlib import Path
+
+from src.bot.benchmark import (CASES, DEFAULT_SIZES, IMPORT_BUDGET_SECONDS, check_imports, compare, import_costs,
+                                load_report, run_suite, save_report)
+
+
+def parse_sizes(s: str):
+    return [int(float(x)) for x in s.split(',') if x.strip()]
+
+
+def main():
+    p = argparse.ArgumentParser(description='Benchmark backtester, strategies and optimizer')
+    p.add_argument('--sizes', default=','.join(str(n) for n in DEFAULT_SIZES), help='Comma-separated bar counts (e.g. "1e3,1e5,1e7")')
+    p.add_argument('--cases', default=None, help=f'Comma-separated cases (default all: {", ".join(CASES)})')
+    p.add_argument('--repeat', type=int, default=9, help='Timed samples per case (the median is kept)')
+    p.add_argument('--no-memory', action='store_true', help='Skip the extra traced run that measures peak memory')
+    p.add_argument('--out', default='outputs/benchmark.json', help='Where to write this run as JSON')
+    p.add_argument('--baseline', default='benchmarks/baseline.json', help='Baseline JSON to compare against')
+    p.add_argument('--tolerance', type=float, default=0.25, help='Allowed relative slowdown / memory growth')
+    p.add_argument('--update-baseline', action='store_true', help='Write this run to --baseline instead of comparing')
+    p.add_argument('--imports', action='store_true', help='Only time cold-start imports of the optimizer, backtester and CLIs')
+    p.add_argument('--import-budget', type=float, default=IMPORT_BUDGET_SECONDS, help='Allowed cold-start seconds per import')
+    args = p.parse_args()
+
+    if args.imports:
+        problems = check_imports(import_costs(repeat=args.repeat, log=print), budget=args.import_budget)
+        if problems:
+            print(f'{len(problems)} import problem(s):')
+            for line in problems:
+                print('  ' + line)
+            raise SystemExit(1)
+        print(f'All imports within {args.import_budget * 1000:.0f} ms')
+        return
+
+    cases = [c.strip() for c in args.cases.split(',')] if args.cases else None
+    report = run_suite(parse_sizes(args.sizes), cases=cases, repeat=args.repeat, memory=not args.no_memory, log=print)
+
+    out = Path(args.out)
+    out.parent.mkdir(parents=True, exist_ok=True)
+    save_report(report, str(out))
+    print(f'Saved {out}')
+
+    baseline = Path(args.baseline)
+    if args.update_baseline:
+        baseline.parent.mkdir(parents=True, exist_ok=True)
+        save_report(report, str(baseline))
+        print(f'Updated baseline {baseline}')
+        return
+    if not baseline.exists():
+        print(f'No baseline at {baseline}; run with --update-baseline to create one')
+        return
+
+    regressions = compare(report, load_report(str(baseline)), tolerance=args.tolerance)
+    if regressions:
+        print(f'{len(regressions)} regression(s) beyond {args.tolerance:.0%}:')
+        for line in regressions:
+            print('  ' + line)
+        raise SystemExit(1)
+    print(f'No regressions beyond {args.tolerance:.0%} against {baseline}')
+
+
+if __name__ == '__main__':
+    main()
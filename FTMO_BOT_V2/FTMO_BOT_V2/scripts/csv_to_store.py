@@ -0,0 +1,32 @@
+#!/usr/bin/env python3
+"""Convert an OHLC CSV into a memory-mappable price store.
+
+Usage:
+  PYTHONPATH=. python scripts/csv_to_store.py --csv data/prices.csv --store data/prices_store
+
+The store can then be passed to walkforward_cli.py with --store; --resample M5 H1 D1
+also builds those aggregates (kept up to date by datastore.append_store).
+"""
+
+import argparse
+
+from src.bot.datastore import TIMEFRAMES, csv_to_store, resample_store
+
+
+def main():
+    p = argparse.ArgumentParser(description='Convert a price CSV to a binary column store')
+    p.add_argument('--csv', required=True, help='Path to CSV file (Date/Open/High/Low/Close[/Volume])')
+    p.add_argument('--store', required=True, help='Output store directory')
+    p.add_argument('--chunksize', type=int, default=1_000_000, help='Rows parsed per chunk')
+    p.add_argument('--resample', nargs='*', default=[], choices=sorted(TIMEFRAMES), help='Timeframes to aggregate and cache in the store')
+    args = p.parse_args()
+
+    meta = csv_to_store(args.csv, args.store, chunksize=args.chunksize)
+    print(f"Wrote {meta['rows']} rows ({', '.join(meta['columns'])}) to {args.store}")
+    for timeframe in args.resample:
+        tf_meta = resample_store(args.store, timeframe)
+        print(f"  {timeframe}: {tf_meta['rows']} bars")
+
+
+if __name__ == '__main__':
+    main()
@@ -5,10 +5,20 @@ Outputs saved to outputs/:
  - grid_results.csv
  - heatmap.png
  - top10.csv
+
+Backtest results are cached in outputs/.cache/results.sqlite, so reruns only
+compute combos whose prices or settings changed (--no-cache to disable).
 """
+import argparse
 from pathlib import Path
+from src.bot.cache import ResultCache
 from src.bot.optimizer import grid_search_ma, save_results_csv, plot_heatmap, get_top_results, save_top_csv
 
+p = argparse.ArgumentParser(description='Run the MA grid report')
+p.add_argument('--cache', default='outputs/.cache/results.sqlite', help='Result cache file')
+p.add_argument('--no-cache', action='store_true', help='Recompute every combo')
+args = p.parse_args()
+
 # parameters
 shorts = list(range(3, 11, 2))  # 3,5,7,9
 longs = [20, 30, 40, 60, 80]
@@ -20,7 +30,11 @@ out = Path('outputs')
 out.mkdir(exist_ok=True)
 
 print('Running grid search...')
-results = grid_search_ma(prices, short_windows=shorts, long_windows=longs, position_sizing='fixed')
+cache = None if args.no_cache else ResultCache(args.cache)
+results = grid_search_ma(prices, short_windows=shorts, long_windows=longs, position_sizing='fixed', cache=cache)
+if cache is not None:
+    print(f'Cache: {cache.hits} reused, {cache.misses} computed')
+    cache.close()
 
 csv_path = out / 'grid_results.csv'
 save_results_csv(results, filename=str(csv_path))
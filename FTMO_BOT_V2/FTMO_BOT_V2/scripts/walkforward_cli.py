@@ -4,31 +4,224 @@
 Usage examples:
   ./scripts/walkforward_cli.py --csv data/prices.csv --close-col Close --shorts 3,5,7 --longs 20,30,40 
   /path/to/.venv/bin/python scripts/walkforward_cli.py --csv data/prices.csv
+  ./scripts/walkforward_cli.py --store data/prices_store --incremental   (see scripts/csv_to_store.py)
+  ./scripts/walkforward_cli.py --csv data/prices.csv --reoptimize rolling --sort-key sharpe
+  ./scripts/walkforward_cli.py --batch 'data/symbols/*.csv' --n-jobs -1   (one file per symbol)
 
 Outputs (in current directory by default):
   - wf_results.json
   - wf_topN.csv
+  with --reoptimize (parameters re-selected on each train window):
+  - wf_folds.csv       combo chosen per fold with its train score and test metrics
+  - wf_oos_equity.csv  stitched out-of-sample equity curve
+  with --batch (symbol = file name without extension):
+  - wf_batch_results.csv, wf_batch_topN.csv
+  - or, with --reoptimize, wf_batch_folds.csv and wf_batch_summary.csv
 
 The script uses src.bot.optimizer.walk_forward_evaluate and saves results using provided helpers.
 """
 
 import argparse
 import csv
+import glob
+import os
 from pathlib import Path
-from typing import List
+from typing import Dict, List, Optional, Tuple
 
-import pandas as pd
+import numpy as np
 
-from src.bot.optimizer import walk_forward_evaluate, save_walkforward_json, save_top_from_walkforward
+from src.bot.cache import ResultCache
+from src.bot.datastore import TIMEFRAMES, load_resampled, load_store
+from src.bot.optimizer import (get_top_results, save_top_from_walkforward, save_walkforward_json, walk_forward_evaluate,
+                               walk_forward_optimize)
+from src.bot.strategies import MovingAverageStrategy
+
+
+# rows parsed per pandas chunk when reading a CSV
+CSV_CHUNK_ROWS = 1_000_000
 
 
 def parse_int_list(s: str) -> List[int]:
     return [int(x.strip()) for x in s.split(',') if x.strip()]
 
 
+def load_store_series(store_dir: str, timeframe: str = None):
+    """Return memory-mapped (close, highs, lows) arrays from a price store (or its `timeframe` aggregate)."""
+    cols = load_resampled(store_dir, timeframe) if timeframe else load_store(store_dir)
+    if 'high' in cols and 'low' in cols:
+        return cols['close'], cols['high'], cols['low']
+    return cols['close'], None, None
+
+
+def _is_number(value: str) -> bool:
+    try:
+        float(value)
+    except ValueError:
+        return False
+    return True
+
+
+def select_csv_columns(path: str, close_col: str = None) -> Tuple[str, Optional[str], Optional[str]]:
+    """Pick the (close, high, low) column names from a CSV's header; high/low are None when absent."""
+    with open(path, newline='') as f:
+        reader = csv.reader(f)
+        header = next(reader, [])
+        first = next(reader, [])
+
+    if close_col and close_col in header:
+        close = close_col
+    else:
+        for col in ('Close', 'close', 'close_price'):
+            if col in header:
+                close = col
+                break
+        else:
+            # fallback to the last column holding a number on the first row
+            numeric_cols = [name for name, value in zip(header, first) if _is_number(value)]
+            if not numeric_cols:
+                raise SystemExit(f'No numeric columns found in {path} to interpret as price/close')
+            close = numeric_cols[-1]
+
+    # highs/lows support ATR-based sizing
+    for high, low in (('High', 'Low'), ('high', 'low')):
+        if high in header and low in header:
+            return close, high, low
+    return close, None, None
+
+
+def load_csv_series(path: str, close_col: str = None, chunk_rows: int = CSV_CHUNK_ROWS):
+    """Return (close, highs, lows) float arrays parsed from a CSV.
+
+    Only the close/high/low columns are read, as float64, `chunk_rows` rows
+    at a time, so wide or very long files are not held as a full DataFrame.
+    """
+    csv_path = Path(path)
+    if not csv_path.exists():
+        raise SystemExit(f'CSV file not found: {csv_path}')
+    # imported here so --store runs and --help do not pay for pandas
+    import pandas as pd
+
+    names = [name for name in select_csv_columns(str(csv_path), close_col) if name]
+    parts: Dict[str, list] = {name: [] for name in names}
+    for chunk in pd.read_csv(csv_path, usecols=names, dtype={name: 'float64' for name in names}, chunksize=chunk_rows):
+        for name in names:
+            parts[name].append(chunk[name].to_numpy())
+    columns = [np.concatenate(parts[name]) if parts[name] else np.empty(0) for name in names]
+    return tuple(columns) if len(columns) == 3 else (columns[0], None, None)
+
+
+def run_walkforward(close, highs, lows, options: dict, n_jobs: int = 1, label: str = ''):
+    """Walk-forward over the MA grid of `options` (the parsed CLI arguments as a dict).
+
+    Returns the walk_forward_optimize result with --reoptimize, otherwise
+    the walk_forward_evaluate rows.
+    """
+    short_windows = parse_int_list(options['shorts'])
+    long_windows = parse_int_list(options['longs'])
+    if options['reoptimize']:
+        return walk_forward_optimize(close, MovingAverageStrategy, {'short_window': short_windows, 'long_window': long_windows},
+                                     train_size=options['train_size'], test_size=options['test_size'], step=options['step'],
+                                     anchored=options['reoptimize'] == 'anchored', sort_key=options['sort_key'],
+                                     position_sizing=options['position_sizing'], highs=highs, lows=lows,
+                                     period=options['atr_period'], atr_method=options['atr_method'], n_jobs=n_jobs,
+                                     constraint=lambda short_window, long_window: short_window < long_window)
+
+    cache = ResultCache(options['cache']) if options['cache'] else None
+    aggregated = walk_forward_evaluate(close, short_windows=short_windows, long_windows=long_windows, train_size=options['train_size'], test_size=options['test_size'], step=options['step'], position_sizing=options['position_sizing'], highs=highs, lows=lows, period=options['atr_period'], atr_method=options['atr_method'], n_jobs=n_jobs, incremental=options['incremental'], cache=cache)
+    if cache is not None:
+        print(f'{label}Cache: {cache.hits} folds reused, {cache.misses} computed')
+        cache.close()
+    return aggregated
+
+
+def run_symbol(path: str, options: dict):
+    """Batch worker: load one symbol file and run its walk-forward."""
+    close, highs, lows = load_csv_series(path, options['close_col'])
+    return run_walkforward(close, highs, lows, options, label=f'{Path(path).stem}: ')
+
+
+def batch_files(spec: str) -> List[Path]:
+    """CSV files of a directory, or the files matching a glob pattern, sorted by name."""
+    path = Path(spec)
+    files = sorted(path.glob('*.csv')) if path.is_dir() else sorted(Path(name) for name in glob.glob(spec))
+    if not files:
+        raise SystemExit(f'No CSV files found for --batch {spec}')
+    return files
+
+
+def run_batch(files: List[Path], options: dict, n_jobs: int = 1) -> List[Tuple[str, object]]:
+    """Run every file's walk-forward, one symbol per worker process; returns [(symbol, result)] in file order."""
+    workers = (os.cpu_count() or 1) if n_jobs == -1 else max(1, n_jobs)
+    workers = min(workers, len(files))
+    paths = [str(f) for f in files]
+    if workers <= 1:
+        results = [run_symbol(path, options) for path in paths]
+    else:
+        from concurrent.futures import ProcessPoolExecutor
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(run_symbol, paths, [options] * len(paths)))
+    return list(zip([f.stem for f in files], results))
+
+
+def save_reoptimize(res: dict, out_dir: Path):
+    folds_csv = out_dir / 'wf_folds.csv'
+    res['folds'].to_csv(str(folds_csv))
+    equity_csv = out_dir / 'wf_oos_equity.csv'
+    with open(equity_csv, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(['bar', 'equity'])
+        bars = [i for fold in res['folds'] for i in range(fold['test_start'], fold['test_end'])]
+        writer.writerows(zip(bars, res['equity_curve'].tolist()))
+    print(f"Out-of-sample over {len(res['folds'])} folds: total_return={res['total_return']:.4f}, sharpe={res['sharpe']}, max_drawdown={res['max_drawdown']:.4f}")
+    print(f'Saved {folds_csv} and {equity_csv}')
+
+
+WF_COLUMNS = ['avg_sharpe', 'avg_cagr', 'avg_total_return', 'avg_max_drawdown']
+OOS_COLUMNS = ['total_return', 'sharpe', 'sortino', 'cagr', 'max_drawdown', 'win_rate']
+
+
+def save_batch(results: List[Tuple[str, object]], out_dir: Path, options: dict):
+    """Write the consolidated per-symbol outputs of a batch run."""
+    if options['reoptimize']:
+        folds_csv = out_dir / 'wf_batch_folds.csv'
+        summary_csv = out_dir / 'wf_batch_summary.csv'
+        with open(folds_csv, 'w', newline='') as f:
+            writer = csv.writer(f)
+            columns = results[0][1]['folds'].columns
+            writer.writerow(['symbol'] + columns)
+            for symbol, res in results:
+                writer.writerows([symbol] + [row.get(c) for c in columns] for row in res['folds'])
+        with open(summary_csv, 'w', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(['symbol', 'folds'] + OOS_COLUMNS)
+            for symbol, res in results:
+                writer.writerow([symbol, len(res['folds'])] + [res.get(c) for c in OOS_COLUMNS])
+        print(f'Saved {folds_csv} and {summary_csv}')
+        return
+
+    results_csv = out_dir / 'wf_batch_results.csv'
+    top_csv = out_dir / f"wf_batch_top{options['top_n']}.csv"
+    with open(results_csv, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(['symbol', 'short', 'long'] + WF_COLUMNS)
+        for symbol, aggregated in results:
+            writer.writerows([symbol, short, long] + [metrics.get(c) for c in WF_COLUMNS]
+                             for short, long, metrics in aggregated)
+    with open(top_csv, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(['symbol', 'rank', 'short', 'long', 'avg_sharpe'])
+        for symbol, aggregated in results:
+            top = get_top_results(aggregated, top_n=options['top_n'], sort_key='avg_sharpe')
+            writer.writerows([symbol, i, short, long, metrics.get('avg_sharpe')]
+                             for i, (short, long, metrics) in enumerate(top, start=1))
+    print(f'Saved {results_csv} and {top_csv}')
+
+
 def main():
     p = argparse.ArgumentParser(description='Run walk-forward evaluation on price CSV')
-    p.add_argument('--csv', required=True, help='Path to CSV file containing price series (close prices or OHLC)')
+    p.add_argument('--csv', default=None, help='Path to CSV file containing price series (close prices or OHLC)')
+    p.add_argument('--store', default=None, help='Price store directory written by scripts/csv_to_store.py (memory-mapped, used instead of --csv)')
+    p.add_argument('--batch', default=None, help='Directory of symbol CSVs or a glob (quote it), one file per symbol; symbols run in parallel with --n-jobs')
     p.add_argument('--close-col', default=None, help='Name of close column in CSV (default: try Close/close/last column)')
     p.add_argument('--shorts', default='3,5,7', help='Comma-separated shortlist windows (e.g. "3,5,7")')
     p.add_argument('--longs', default='20,30,40', help='Comma-separated long windows (e.g. "20,30,40")')
@@ -39,56 +232,45 @@ def main():
     p.add_argument('--atr-method', choices=['sma', 'wilder'], default='sma', help='ATR calculation method when using --position-sizing atr')
     p.add_argument('--atr-period', type=int, default=14, help='ATR period when using --position-sizing atr')
     p.add_argument('--top-n', type=int, default=5, help='Number of top combos to save')
+    p.add_argument('--n-jobs', type=int, default=1, help='Worker processes for the combo grid, or for the symbols with --batch (-1 = all cores)')
+    p.add_argument('--timeframe', default=None, choices=sorted(TIMEFRAMES), help='With --store: resample the store to this timeframe (cached in the store)')
+    p.add_argument('--incremental', action='store_true', help='Generate signals once per combo and slice per fold (faster)')
+    p.add_argument('--cache', default=None, help='Result cache file (e.g. outputs/.cache/results.sqlite); reruns only compute new folds/combos')
+    p.add_argument('--reoptimize', choices=['anchored', 'rolling'], default=None, help='Select the best combo on each train window (anchored = expanding, rolling = last --train-size bars) and trade it on the next test window')
+    p.add_argument('--sort-key', default='sharpe', help='With --reoptimize: train metric used to select the combo')
     p.add_argument('--out-dir', default='.', help='Directory to save outputs (wf_results.json, wf_topN.csv)')
 
     args = p.parse_args()
-
-    csv_path = Path(args.csv)
-    if not csv_path.exists():
-        raise SystemExit(f'CSV file not found: {csv_path}')
-
-    df = pd.read_csv(csv_path)
-
-    # Determine close series
-    if args.close_col and args.close_col in df.columns:
-        close = df[args.close_col].astype(float).tolist()
-    else:
-        for col in ('Close', 'close', 'close_price'):
-            if col in df.columns:
-                close = df[col].astype(float).tolist()
-                break
-        else:
-            # fallback to last numeric column
-            numeric_cols = [c for c in df.columns if pd.api.types.is_numeric_dtype(df[c])]
-            if not numeric_cols:
-                raise SystemExit('No numeric columns found in CSV to interpret as price/close')
-            close = df[numeric_cols[-1]].astype(float).tolist()
-
-    short_windows = parse_int_list(args.shorts)
-    long_windows = parse_int_list(args.longs)
+    options = vars(args)
 
     out_dir = Path(args.out_dir)
     out_dir.mkdir(parents=True, exist_ok=True)
 
-    print(f'Running walk-forward: shorts={short_windows}, longs={long_windows}, train={args.train_size}, test={args.test_size}, step={args.step or args.test_size}')
+    if args.batch:
+        files = batch_files(args.batch)
+        print(f'Running walk-forward on {len(files)} symbols: shorts={args.shorts}, longs={args.longs}, train={args.train_size}, test={args.test_size}, step={args.step or args.test_size}')
+        save_batch(run_batch(files, options, n_jobs=args.n_jobs), out_dir, options)
+        return
+
+    if args.store:
+        close, highs, lows = load_store_series(args.store, args.timeframe)
+    elif args.csv:
+        close, highs, lows = load_csv_series(args.csv, args.close_col)
+    else:
+        raise SystemExit('One of --csv, --store or --batch is required')
 
-    # detect highs/lows if present to support ATR-based sizing
-    highs = None
-    lows = None
-    if 'High' in df.columns and 'Low' in df.columns:
-        highs = df['High'].astype(float).tolist()
-        lows = df['Low'].astype(float).tolist()
-    elif 'high' in df.columns and 'low' in df.columns:
-        highs = df['high'].astype(float).tolist()
-        lows = df['low'].astype(float).tolist()
+    print(f'Running walk-forward: shorts={parse_int_list(args.shorts)}, longs={parse_int_list(args.longs)}, train={args.train_size}, test={args.test_size}, step={args.step or args.test_size}')
 
-    aggregated = walk_forward_evaluate(close, short_windows=short_windows, long_windows=long_windows, train_size=args.train_size, test_size=args.test_size, step=args.step, position_sizing=args.position_sizing, highs=highs, lows=lows, period=args.atr_period, atr_method=args.atr_method)
+    result = run_walkforward(close, highs, lows, options, n_jobs=args.n_jobs)
+    if args.reoptimize:
+        save_reoptimize(result, out_dir)
+        return
 
     results_json = out_dir / 'wf_results.json'
-    save_walkforward_json(aggregated, filename=str(results_json))
+    save_walkforward_json(result, filename=str(results_json))
 
     top_csv = out_dir / f'wf_top{args.top_n}.csv'
-    save_top_from_walkforward(aggregated, top_n=args.top_n, sort_key='avg_sharpe', filename=str(top_csv))
+    save_top_from_walkforward(result, top_n=args.top_n, sort_key='avg_sharpe', filename=str(top_csv))
 
     print(f'Saved {results_json} and {top_csv}')
 
@@ -1,10 +1,342 @@
+import copy
+import itertools
+import pickle
 from typing import List, Dict, Optional
+
+from src.bot import indicators
+from src.bot.ledger import TradeLedger
+from src.bot.metrics import MetricsAccumulator
 import math
-import statistics
 try:
-    import matplotlib.pyplot as plt
+    import numpy as np
 except Exception:
-    plt = None
+    np = None
+
+
+# cells (bars x columns) per row block of the array simulation; block temporaries
+# stay cache-sized and only the outputs span the whole series
+_BLOCK_CELLS = 1 << 16
+
+
+def _row_blocks(n, m):
+    """(start, stop) bar ranges covering `n` bars of `m` columns in blocks of ~_BLOCK_CELLS cells."""
+    rows = max(64, _BLOCK_CELLS // max(m, 1))
+    return [(a, min(a + rows, n)) for a in range(0, n, rows)]
+
+
+def _positions_from_signals(signals, allow_short: bool = False):
+    """Replay the run-loop state machine as array ops.
+
+    A signal of 1 opens (or keeps) a long, 0 closes the position and, with
+    allow_short, -1 opens (or keeps) a short; any other value leaves the
+    position unchanged. Returns int8 positions (-1/0/1); works column-wise
+    on 2-D signal arrays, one row block at a time.
+    """
+    sig = np.asarray(signals)
+    if sig.ndim == 1:
+        return _positions_from_signals(sig[:, None], allow_short)[:, 0]
+    out = np.empty(sig.shape, dtype=np.int8)
+    held = np.zeros(sig.shape[1], dtype=np.int8)
+    for a, b in _row_blocks(*sig.shape):
+        blk = sig[a:b]
+        events = (blk == 1) | (blk == 0)
+        if allow_short:
+            events |= blk == -1
+        last = np.maximum.accumulate(np.where(events, np.arange(b - a)[:, None], -1), axis=0)
+        latest = np.take_along_axis(np.where(events, blk, 0).astype(np.int8), np.maximum(last, 0), axis=0)
+        # bars before the block's first event keep the position held coming in
+        out[a:b] = np.where(last >= 0, latest, held)
+        held = out[b - 1]
+    return out
+
+
+TIE_BREAKS = ('stop', 'target', 'nearest')
+
+
+def _stop_levels(entry_price, side, stop_loss, take_profit, unit):
+    """Stop/target prices `stop_loss`/`take_profit` units away from the entry fill (None = no level)."""
+    stop = None if stop_loss is None else entry_price - side * stop_loss * unit
+    target = None if take_profit is None else entry_price + side * take_profit * unit
+    return stop, target
+
+
+def _apply_stops(prices, highs, lows, positions, slippage, stop_loss, take_profit, atr, tie_break):
+    """Cut signal positions at intrabar stop-loss/take-profit hits.
+
+    A trade entered at a close is checked from the next bar on: the bar's
+    low/high (the close when highs/lows are missing) touching a level closes
+    it at that level (plus exit slippage). When both levels are inside the
+    same bar `tie_break` decides: 'stop' (pessimistic), 'target' or
+    'nearest' (the level closer to the previous close, i.e. hit first from
+    the open). After a hit the position stays flat until the signal changes.
+
+    Returns (positions, exit_fill) where exit_fill holds the fill price of
+    each stop exit and NaN elsewhere. Levels are `stop_loss`/`take_profit`
+    times the entry fill (atr=None) or times the ATR at the entry bar.
+    """
+    p = np.asarray(prices, dtype=float)
+    hi = (p if highs is None else np.asarray(highs, dtype=float))[:, None]
+    lo = (p if lows is None else np.asarray(lows, dtype=float))[:, None]
+    pos = np.asarray(positions, dtype=np.int8)
+    if pos.ndim == 1:
+        pos = pos[:, None]
+    n = len(p)
+    idx = np.arange(n)[:, None]
+
+    prev = np.zeros_like(pos)
+    prev[1:] = pos[:-1]
+    entries = (pos != prev) & (pos != 0)
+    la = np.maximum(np.maximum.accumulate(np.where(entries, idx, -1), axis=0), 0)
+    # entry bar of the trade held coming into each bar
+    la_held = np.zeros_like(la)
+    la_held[1:] = la[:-1]
+
+    side = prev
+    held = side != 0
+    entry_price = p[la_held] * (1 + side * slippage)
+    unit = entry_price if atr is None else np.asarray(atr, dtype=float)[la_held]
+    stop, target = _stop_levels(entry_price, side, stop_loss, take_profit, unit)
+    adverse = np.where(side > 0, lo, hi)
+    favourable = np.where(side > 0, hi, lo)
+    with np.errstate(invalid='ignore'):
+        sl_hit = held & (side * (stop - adverse) >= 0) if stop is not None else np.zeros_like(held)
+        tp_hit = held & (side * (favourable - target) >= 0) if target is not None else np.zeros_like(held)
+
+    use_stop = sl_hit
+    if target is not None and stop is not None:
+        if tie_break == 'target':
+            use_stop = sl_hit & ~tp_hit
+        elif tie_break == 'nearest':
+            open_ = np.empty(n)
+            open_[0] = p[0]
+            open_[1:] = p[:-1]
+            open_ = open_[:, None]
+            use_stop = sl_hit & (~tp_hit | (np.abs(open_ - stop) <= np.abs(target - open_)))
+    hit = sl_hit | tp_hit
+    if stop is None:
+        level = target
+    elif target is None:
+        level = stop
+    else:
+        level = np.where(use_stop, stop, target)
+
+    last_hit = np.maximum.accumulate(np.where(hit, idx, -1), axis=0)
+    last_hit_prev = np.full_like(last_hit, -1)
+    last_hit_prev[1:] = last_hit[:-1]
+    first = hit & (last_hit_prev <= la_held)
+    stopped = (pos != 0) & (last_hit > la)
+    exit_fill = np.where(first, level * (1 - side * slippage), np.nan)
+    return np.where(stopped, 0, pos).astype(np.int8), exit_fill
+
+
+def _check_stop_args(stop_units, tie_break):
+    if stop_units not in ('pct', 'atr'):
+        raise ValueError(f"Unknown stop_units: {stop_units}")
+    if tie_break not in TIE_BREAKS:
+        raise ValueError(f"Unknown tie_break: {tie_break}")
+
+
+def _simulate(prices, positions, units_factor, initial_capital, commission, slippage, leverage, exit_fill=None,
+              keep_curves=True):
+    """Simulate signed positions (-1/0/1) for one or many signal columns at once.
+
+    `positions` has shape (n,) or (n, m); `units_factor` holds, per bar, the
+    units traded per unit of equity when an entry happens there. Equity only
+    changes on entries (commission) and exits (pnl + commission) and every
+    round trip scales the pre-entry equity, so the whole curve is a
+    cumulative product of per-exit growth factors. A reversal closes the
+    old position and opens the new one on the same bar. `exit_fill`
+    (see _apply_stops) overrides the exit price where it is not NaN.
+
+    Bars are processed in row blocks carrying each column's state, and round
+    trips are only evaluated on exit bars. entries, exits and closed (the
+    equity between trades) are kept for trade ledgers with keep_curves,
+    otherwise they are None and equity is the only (n, m) array.
+    """
+    p = np.asarray(prices, dtype=float)
+    pos = np.asarray(positions, dtype=np.int8)
+    if pos.ndim == 1:
+        pos = pos[:, None]
+    n, m = pos.shape
+    k = units_factor
+    initial_capital = float(initial_capital)
+
+    def round_trip(a, side, t, fill=None):
+        """(growth of pre-entry equity, pnl per unit of pre-entry equity) of trades from bar a to t."""
+        ep = p[a] * (1 + side * slippage)
+        xp = p[t] * (1 - side * slippage)
+        if fill is not None:
+            xp = np.where(np.isnan(fill), xp, fill)
+        keep = 1.0 - k[a] * ep * commission
+        pnl = (xp - ep) * k[a] * (leverage * side)
+        return keep + k[a] * (leverage * side * (xp - ep) - xp * commission), pnl
+
+    # equity kept after the entry commission of a short (first n) or long (last n) opened on each bar
+    entry_keep = np.concatenate([1.0 - k * (p * (1 - slippage)) * commission,
+                                 1.0 - k * (p * (1 + slippage)) * commission])
+
+    equity = np.empty((n, m))
+    closed = entries = exits = None
+    if keep_curves:
+        closed = np.empty((n, m))
+        entries = np.empty((n, m), dtype=bool)
+        exits = np.empty((n, m), dtype=bool)
+
+    # per-column state carried from block to block
+    prev_pos = np.zeros(m, dtype=np.int8)
+    last_entry = np.full(m, -1, dtype=np.intp)
+    growth_prod = np.ones(m)
+    prev_closed = np.full(m, initial_capital)
+    peak = np.full(m, initial_capital)
+    max_drawdown = np.zeros(m)
+    n_exits = np.zeros(m, dtype=np.intp)
+    wins = np.zeros(m, dtype=np.intp)
+
+    for a, b in _row_blocks(n, m):
+        blk = pos[a:b]
+        prev = np.empty_like(blk)
+        prev[0] = prev_pos
+        prev[1:] = blk[:-1]
+        changed = blk != prev
+        ent = changed & (blk != 0)
+        ext = changed & (prev != 0)
+        la = np.where(ent, np.arange(a, b)[:, None], -1)
+        np.maximum(la[0], last_entry, out=la[0])
+        np.maximum.accumulate(la, axis=0, out=la)
+
+        # exits close the trade entered at the previous bar's last entry
+        r, c = np.nonzero(ext)
+        growth, pnl_factor = round_trip(np.where(r > 0, la[r - 1, c], last_entry[c]), prev[r, c], a + r,
+                                        None if exit_fill is None else exit_fill[a + r, c])
+        factor = closed[a:b] if keep_curves else np.empty(blk.shape)
+        factor.fill(1.0)
+        factor[r, c] = growth
+        factor[0] *= growth_prod
+        np.cumprod(factor, axis=0, out=factor)
+        growth_prod = factor[-1].copy()
+        factor *= initial_capital
+        closed_blk = factor
+
+        exit_pnl = pnl_factor * np.where(r > 0, closed_blk[r - 1, c], prev_closed[c])
+        n_exits += np.bincount(c, minlength=m)
+        wins += np.bincount(c[exit_pnl > 0], minlength=m)
+
+        eq = equity[a:b]
+        eq[...] = closed_blk
+        # la is -1 only on bars before any entry, which are flat
+        np.multiply(closed_blk, entry_keep[la + n * (blk > 0)], out=eq, where=blk != 0)
+
+        pk = np.maximum.accumulate(eq, axis=0)
+        np.maximum(pk, peak, out=pk)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            drawdowns = np.where(pk > 0, (pk - eq) / pk, 0.0)
+        np.maximum(max_drawdown, drawdowns.max(axis=0), out=max_drawdown)
+
+        if keep_curves:
+            entries[a:b] = ent
+            exits[a:b] = ext
+        prev_pos = blk[-1]
+        last_entry = la[-1]
+        prev_closed = closed_blk[-1].copy()
+        peak = pk[-1]
+
+    # forced close of positions still open on the last bar
+    is_open = pos[-1] != 0
+    final_growth, final_factor = round_trip(np.maximum(last_entry, 0), pos[-1], n - 1)
+    final_pnl = final_factor * prev_closed
+    final_equity = np.where(is_open, prev_closed * final_growth, equity[-1])
+    final_peak = np.maximum(peak, final_equity)
+    final_dd = np.where(final_peak > 0, (final_peak - final_equity) / np.where(final_peak > 0, final_peak, 1.0), 0.0)
+    max_drawdown = np.where(is_open, np.maximum(max_drawdown, final_dd), max_drawdown)
+    equity[-1] = final_equity
+
+    n_exits += is_open
+    wins += is_open & (final_pnl > 0)
+
+    return {
+        'prices': p, 'units_factor': k, 'slippage': slippage, 'exit_fill': exit_fill,
+        'positions': pos, 'entries': entries, 'exits': exits, 'closed': closed,
+        'equity': equity, 'max_drawdown': max_drawdown, 'is_open': is_open,
+        'n_exits': n_exits, 'wins': wins, 'leverage': leverage,
+    }
+
+
+def _returns(equity, a, b):
+    """Bar returns ending at bars a+1..b (0 where the previous equity is 0) and their validity."""
+    prev = equity[a:b]
+    valid = prev != 0
+    with np.errstate(divide='ignore', invalid='ignore'):
+        rets = np.where(valid, (equity[a + 1:b + 1] - prev) / prev, 0.0)
+    return rets, valid
+
+
+def _equity_metrics(equity, initial_capital, annualization):
+    """Return-based metrics for each equity column, mirroring `Backtester.run`.
+
+    Returns are recomputed per row block in two passes (sums, then squared
+    deviations) instead of being held as an (n, m) matrix.
+    """
+    m = equity.shape[1]
+    blocks = _row_blocks(equity.shape[0] - 1, m)
+    count = np.zeros(m, dtype=np.intp)
+    neg_count = np.zeros(m, dtype=np.intp)
+    total = np.zeros(m)
+    neg_total = np.zeros(m)
+    lo, neg_lo = np.full(m, np.inf), np.full(m, np.inf)
+    hi, neg_hi = np.full(m, -np.inf), np.full(m, -np.inf)
+    for a, b in blocks:
+        rets, valid = _returns(equity, a, b)
+        # invalid returns are 0, so they never count as negative
+        neg = rets < 0
+        neg_rets = np.where(neg, rets, 0.0)
+        count += valid.sum(axis=0)
+        neg_count += neg.sum(axis=0)
+        total += rets.sum(axis=0)
+        neg_total += neg_rets.sum(axis=0)
+        if valid.all():
+            np.minimum(lo, rets.min(axis=0), out=lo)
+            np.maximum(hi, rets.max(axis=0), out=hi)
+        else:
+            np.minimum(lo, np.where(valid, rets, np.inf).min(axis=0), out=lo)
+            np.maximum(hi, np.where(valid, rets, -np.inf).max(axis=0), out=hi)
+        np.minimum(neg_lo, neg_rets.min(axis=0, initial=np.inf, where=neg), out=neg_lo)
+        np.maximum(neg_hi, neg_rets.max(axis=0, initial=-np.inf, where=neg), out=neg_hi)
+    mean = total / np.maximum(count, 1)
+    neg_mean = neg_total / np.maximum(neg_count, 1)
+
+    var = np.zeros(m)
+    neg_var = np.zeros(m)
+    for a, b in blocks:
+        rets, valid = _returns(equity, a, b)
+        dev = rets - mean
+        dev *= dev
+        var += (dev if valid.all() else np.where(valid, dev, 0.0)).sum(axis=0)
+        neg = rets < 0
+        rets -= neg_mean
+        rets *= rets
+        neg_var += np.where(neg, rets, 0.0).sum(axis=0)
+    var /= np.maximum(count, 1)
+    neg_var /= np.maximum(neg_count, 1)
+    # identical returns have exactly zero spread (statistics.pstdev agrees); a
+    # 1-bar curve has no returns: count is 0 and the metrics NaN
+    std = np.where((lo == hi) | (count < 2), 0.0, np.sqrt(var))
+    neg_std = np.where(neg_lo == neg_hi, 0.0, np.sqrt(neg_var))
+
+    root = math.sqrt(annualization)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        sharpe = np.where((count > 0) & (std > 0), mean / std * root, np.nan)
+        sortino = np.where((neg_count > 0) & (neg_std > 0), mean / neg_std * root, np.nan)
+        ann_vol = np.where(count > 0, std * root, np.nan)
+        years = equity.shape[0] / annualization
+        cagr = (equity[-1] / initial_capital) ** (1.0 / years) - 1.0
+    return {
+        'sharpe': sharpe, 'sortino': sortino, 'annual_volatility': ann_vol, 'cagr': cagr,
+    }
+
+
+def _optional(value):
+    value = float(value)
+    return None if math.isnan(value) else value
 
 
 class Backtester:
@@ -14,7 +346,7 @@ class Backtester:
       bt = Backtester(initial_capital=10000, commission=0.0005, slippage=0.0005)
       result = bt.run(prices, signals, risk_per_trade=0.01, leverage=1.0)
 
-    Returns a dict with equity_curve, trades, total_return, max_drawdown
+    Returns a dict with equity_curve, trades (a TradeLedger), total_return, max_drawdown
     """
 
     def __init__(self, initial_capital=10000.0, commission=0.0, slippage=0.0):
@@ -32,195 +364,476 @@ class Backtester:
         lows: Optional[List[float]] = None,
         period: int = 14,
         annualization: int = 252,
-        atr_method: str = 'sma'
+        atr_method: str = 'sma',
+        engine: str = 'python',
+        keep_curves: bool = True,
+        allow_short: bool = False,
+        stop_loss: Optional[float] = None,
+        take_profit: Optional[float] = None,
+        stop_units: str = 'pct',
+        tie_break: str = 'stop'
         ) -> Dict:
-        if not prices or not signals or len(prices) != len(signals):
+        """Backtest `signals` over `prices`: 1 = long, 0 = flat.
+
+        With allow_short=True a signal of -1 goes short (a long/short reversal
+        closes and reopens on the same bar); otherwise -1, like any other
+        value, leaves the position unchanged. Trade units are signed.
+
+        stop_loss/take_profit add intrabar exits at that distance from the
+        entry fill, as a fraction of it (stop_units='pct') or in ATRs at the
+        entry bar (stop_units='atr'). They trigger when a later bar's
+        highs/lows (the close if not given) reach the level, fill at the level
+        and keep the position flat until the signal changes; `tie_break`
+        ('stop', 'target' or 'nearest' to the previous close) decides when
+        both levels fall inside one bar.
+
+        With keep_curves=False metrics are accumulated bar by bar and
+        equity_curve, trades, returns and atr are returned as None, so large
+        grids do not hold per-combo curves in memory.
+        """
+        if engine == 'numpy':
+            return self._run_numpy(prices, signals, risk_per_trade=risk_per_trade, leverage=leverage,
+                                   position_sizing=position_sizing, highs=highs, lows=lows, period=period,
+                                   annualization=annualization, atr_method=atr_method, keep_curves=keep_curves,
+                                   allow_short=allow_short, stop_loss=stop_loss, take_profit=take_profit,
+                                   stop_units=stop_units, tie_break=tie_break)
+        if engine != 'python':
+            raise ValueError(f"Unknown engine: {engine}")
+        if prices is None or signals is None or len(prices) == 0 or len(prices) != len(signals):
             raise ValueError("prices and signals must be non-empty and the same length")
 
-        equity = self.initial_capital
-        equity_curve = []
-        position = 0  # 0 flat, 1 long
-        entry_price = None
-        entry_units = 0.0
-        trades = []
-
-        peak = equity
-        drawdowns = []
-
-        # precompute ATR if requested
-        atr = None
-        if position_sizing == 'atr':
-            # compute TR series and ATR using highs/lows/closes if provided
-            tr = []
-            for j in range(len(prices)):
-                high = highs[j] if highs is not None else prices[j]
-                low = lows[j] if lows is not None else prices[j]
-                prev = prices[j - 1] if j > 0 else prices[j]
-                tr_val = max(high - low, abs(high - prev), abs(low - prev))
-                tr.append(tr_val)
-            atr = [None] * len(tr)
-            if atr_method == 'sma':
-                # simple moving average ATR
-                cum = 0.0
-                for j, t in enumerate(tr):
-                    cum += t
-                    if j >= period:
-                        cum -= tr[j - period]
-                    if j >= period - 1:
-                        atr[j] = cum / period
-                    else:
-                        atr[j] = None
-            elif atr_method == 'wilder':
-                # Wilder's EMA-style ATR
-                # initialize first ATR as simple average of first 'period' TRs when available
-                prev_atr = None
-                for j, t in enumerate(tr):
-                    if j < period - 1:
-                        atr[j] = None
-                        continue
-                    if j == period - 1:
-                        # simple average for first ATR
-                        first_atr = sum(tr[0:period]) / period
-                        atr[j] = first_atr
-                        prev_atr = first_atr
-                    else:
-                        # Wilder smoothing: ATR = (prev_atr*(period-1) + TR) / period
-                        prev_atr = (prev_atr * (period - 1) + t) / period
-                        atr[j] = prev_atr
-            else:
-                raise ValueError(f"Unknown atr_method: {atr_method}")
-
-        for i, (p, s) in enumerate(zip(prices, signals)):
-            # entry
-            if position == 0 and s == 1:
+        state = ResumableBacktest(self.initial_capital, self.commission, self.slippage,
+                                  risk_per_trade=risk_per_trade, leverage=leverage, position_sizing=position_sizing,
+                                  period=period, annualization=annualization, atr_method=atr_method,
+                                  keep_curves=keep_curves, allow_short=allow_short, stop_loss=stop_loss,
+                                  take_profit=take_profit, stop_units=stop_units, tie_break=tie_break)
+        return state.update(prices, signals, highs=highs, lows=lows).result()
+
+    def _run_numpy(self, prices, signals, risk_per_trade=0.01, leverage=1.0, position_sizing='fixed',
+                   highs=None, lows=None, period=14, annualization=252, atr_method='sma',
+                   keep_curves=True, allow_short=False, stop_loss=None, take_profit=None, stop_units='pct',
+                   tie_break='stop') -> Dict:
+        """Array implementation of `run` (engine='numpy').
+
+        Produces the same metrics and trades as the loop; equity_curve,
+        returns and atr are returned as NumPy arrays (atr is NaN where the
+        loop reports None).
+        """
+        if np is None:
+            raise RuntimeError("numpy is required for engine='numpy'")
+        if prices is None or signals is None or len(prices) == 0 or len(prices) != len(signals):
+            raise ValueError("prices and signals must be non-empty and the same length")
+
+        p = np.asarray(prices, dtype=float)
+        stops = dict(stop_loss=stop_loss, take_profit=take_profit, stop_units=stop_units, tie_break=tie_break)
+        atr = self._atr(p, highs, lows, period, atr_method, position_sizing, **stops)
+        units_factor = self._units_factor(p, atr, risk_per_trade, leverage, position_sizing)
+        positions, exit_fill = self._positions(p, signals, highs, lows, atr, allow_short, **stops)
+        sim = _simulate(p, positions, units_factor, self.initial_capital, self.commission, self.slippage, leverage,
+                        exit_fill=exit_fill, keep_curves=keep_curves)
+        metrics = _equity_metrics(sim['equity'], self.initial_capital, annualization)
+        if not keep_curves:
+            return self._column_metrics(sim, metrics, 0)
+        return self._column_result(sim, metrics, 0, atr)
+
+    def run_batch(self, prices, signal_matrix, risk_per_trade: float = 0.01, leverage: float = 1.0,
+                  position_sizing: str = 'fixed', highs=None, lows=None, period: int = 14,
+                  annualization: int = 252, atr_method: str = 'sma', keep_curves: bool = True,
+                  allow_short: bool = False, stop_loss: Optional[float] = None,
+                  take_profit: Optional[float] = None, stop_units: str = 'pct',
+                  tie_break: str = 'stop') -> List[Dict]:
+        """Backtest many signal columns over the same prices in one array pass.
+
+        `signal_matrix` has shape (len(prices), n_columns); returns one
+        `run(..., engine='numpy')` result dict per column. With
+        keep_curves=False only the scalar metrics are kept (equity_curve,
+        trades, returns and atr are None).
+        """
+        if np is None:
+            raise RuntimeError("numpy is required for run_batch")
+        signal_matrix = np.asarray(signal_matrix)
+        if signal_matrix.ndim != 2 or len(prices) == 0 or signal_matrix.shape[0] != len(prices):
+            raise ValueError("signal_matrix must be 2-D with one row per price")
+
+        p = np.asarray(prices, dtype=float)
+        stops = dict(stop_loss=stop_loss, take_profit=take_profit, stop_units=stop_units, tie_break=tie_break)
+        atr = self._atr(p, highs, lows, period, atr_method, position_sizing, **stops)
+        units_factor = self._units_factor(p, atr, risk_per_trade, leverage, position_sizing)
+        positions, exit_fill = self._positions(p, signal_matrix, highs, lows, atr, allow_short, **stops)
+        sim = _simulate(p, positions, units_factor, self.initial_capital, self.commission, self.slippage, leverage,
+                        exit_fill=exit_fill, keep_curves=keep_curves)
+        metrics = _equity_metrics(sim['equity'], self.initial_capital, annualization)
+        if not keep_curves:
+            return [self._column_metrics(sim, metrics, j) for j in range(signal_matrix.shape[1])]
+        return [self._column_result(sim, metrics, j, atr) for j in range(signal_matrix.shape[1])]
+
+    def _atr(self, p, highs, lows, period, atr_method, position_sizing, stop_loss, take_profit, stop_units,
+             tie_break):
+        """ATR array when sizing or stops need it, else None."""
+        _check_stop_args(stop_units, tie_break)
+        uses_stops = stop_loss is not None or take_profit is not None
+        if position_sizing == 'atr' or (uses_stops and stop_units == 'atr'):
+            return indicators.atr(p, highs, lows, period=period, method=atr_method)
+        return None
+
+    def _positions(self, p, signals, highs, lows, atr, allow_short, stop_loss, take_profit, stop_units, tie_break):
+        """Signed positions from the signals, cut by intrabar stops; returns (positions, exit_fill)."""
+        positions = _positions_from_signals(signals, allow_short)
+        if stop_loss is None and take_profit is None:
+            return positions, None
+        return _apply_stops(p, highs, lows, positions, self.slippage, stop_loss, take_profit,
+                            atr if stop_units == 'atr' else None, tie_break)
+
+    def _units_factor(self, p, atr, risk_per_trade, leverage, position_sizing):
+        """Units bought per unit of equity if an entry happens on each bar."""
+        budget = risk_per_trade * leverage
+        with np.errstate(divide='ignore', invalid='ignore'):
+            fixed = np.where(p > 0, budget / p, 0.0)
+            if position_sizing == 'fixed' or atr is None:
+                return fixed
+            sized = np.where(atr > 0, budget / (atr * p), 0.0)
+        return np.where(np.isnan(atr), fixed, sized)
+
+    def _column_result(self, sim, metrics, j, atr=None) -> Dict:
+        """Assemble the `run` result dict for column `j` of a simulation."""
+        equity = sim['equity'][:, j]
+        entries = np.flatnonzero(sim['entries'][:, j])
+        exits = np.flatnonzero(sim['exits'][:, j])
+        if sim['is_open'][j]:
+            exits = np.append(exits, len(equity) - 1)
+
+        # per-trade values, derived from the equity held before each entry;
+        # units are signed (negative for shorts)
+        side = sim['positions'][entries, j]
+        k = sim['units_factor'][entries]
+        start_equity = sim['closed'][entries, j]
+        size = start_equity * k
+        units = side * size
+        entry_price = sim['prices'][entries] * (1 + side * sim['slippage'])
+        exit_price = sim['prices'][exits] * (1 - side * sim['slippage'])
+        if sim['exit_fill'] is not None:
+            # stop/target fills; the forced close on the last bar always fills at the close
+            fill = sim['exit_fill'][exits, j]
+            if sim['is_open'][j]:
+                fill[-1] = np.nan
+            exit_price = np.where(np.isnan(fill), exit_price, fill)
+        entry_comm = size * entry_price * self.commission
+        pnl = (exit_price - entry_price) * units * sim['leverage']
+        exit_comm = size * exit_price * self.commission
+        trades = TradeLedger.from_round_trips(entries, entry_price, units, entry_comm,
+                                              exits, exit_price, pnl, exit_comm)
+
+        rets, valid = _returns(equity[:, None], 0, len(equity) - 1)
+        result = self._column_metrics(sim, metrics, j)
+        result.update({
+            'equity_curve': equity,
+            'trades': trades,
+            'returns': rets[valid],
+            'atr': atr,
+        })
+        return result
+
+    def _column_metrics(self, sim, metrics, j) -> Dict:
+        """Scalar metrics of column `j`; curve/trade keys are present but None."""
+        n_exits = int(sim['n_exits'][j])
+        return {
+            'equity_curve': None,
+            'trades': None,
+            'total_return': (float(sim['equity'][-1, j]) - self.initial_capital) / self.initial_capital,
+            'max_drawdown': float(sim['max_drawdown'][j]),
+            'returns': None,
+            'sharpe': _optional(metrics['sharpe'][j]),
+            'sortino': _optional(metrics['sortino'][j]),
+            'atr': None,
+            'cagr': _optional(metrics['cagr'][j]),
+            'annual_volatility': _optional(metrics['annual_volatility'][j]),
+            'win_rate': int(sim['wins'][j]) / n_exits if n_exits else None,
+            'n_trades': n_exits,
+        }
+
+    def plot_equity(self, equity_curve: List[float], filename: str = 'equity.png'):
+        """Save a plot of the equity curve to `filename`. Requires matplotlib (imported on first use)."""
+        try:
+            import matplotlib.pyplot as plt
+        except Exception:
+            raise RuntimeError("matplotlib is not available")
+        fig, ax = plt.subplots()
+        ax.plot(equity_curve, label='Equity')
+        ax.set_xlabel('Period')
+        ax.set_ylabel('Equity')
+        ax.legend()
+        fig.tight_layout()
+        fig.savefig(filename)
+
+
+class ResumableBacktest:
+    """The `Backtester.run` loop with its state kept between calls.
+
+    Feed bars in any number of `update` calls (e.g. once a day with the new
+    bars) and read `result()` at any point; the result is identical to
+    `Backtester.run` over all bars fed so far. Each update costs O(new bars):
+    position, equity, metrics and the ATR window live on the object, and
+    `save`/`load` persist them between processes.
+
+    Usage:
+      state = ResumableBacktest(10000, commission=0.0005, position_sizing='atr')
+      state.update(prices[:n], signals[:n], highs=highs[:n], lows=lows[:n]).save('bt_state.pkl')
+      ...
+      state = ResumableBacktest.load('bt_state.pkl')
+      result = state.update(prices[n:], signals[n:], highs=highs[n:], lows=lows[n:]).result()
+
+    Signals for new bars must be the ones the strategy produces on the full
+    history (strategies only look back, so earlier signals do not change).
+    """
+
+    def __init__(self, initial_capital: float = 10000.0, commission: float = 0.0, slippage: float = 0.0,
+                 risk_per_trade: float = 0.01, leverage: float = 1.0, position_sizing: str = 'fixed',
+                 period: int = 14, annualization: int = 252, atr_method: str = 'sma', keep_curves: bool = True,
+                 allow_short: bool = False, stop_loss: Optional[float] = None, take_profit: Optional[float] = None,
+                 stop_units: str = 'pct', tie_break: str = 'stop'):
+        _check_stop_args(stop_units, tie_break)
+        self.initial_capital = float(initial_capital)
+        self.commission = float(commission)
+        self.slippage = float(slippage)
+        self.risk_per_trade = risk_per_trade
+        self.leverage = leverage
+        self.position_sizing = position_sizing
+        self.period = period
+        self.annualization = annualization
+        self.atr_method = atr_method
+        self.keep_curves = keep_curves
+        self.allow_short = allow_short
+        self.stop_loss = stop_loss
+        self.take_profit = take_profit
+        self.stop_units = stop_units
+        self.tie_break = tie_break
+
+        self.bars = 0
+        self.equity = self.initial_capital
+        self.position = 0  # 0 flat, 1 long, -1 short
+        self.desired = 0  # position asked for by the last signal (differs from position after a stop)
+        self.entry_price = None
+        self.entry_units = 0.0
+        self.stop_price = None
+        self.target_price = None
+        self.last_price = None
+        self.metrics = MetricsAccumulator(self.initial_capital)
+        uses_stops = stop_loss is not None or take_profit is not None
+        needs_atr = position_sizing == 'atr' or (uses_stops and stop_units == 'atr')
+        self.atr_stream = indicators.ATRStream(period, atr_method) if needs_atr else None
+        self.equity_curve = [] if keep_curves else None
+        self.trades = TradeLedger() if keep_curves else None
+        self.atr = [] if keep_curves and self.atr_stream is not None else None
+
+    def update(self, prices: List[float], signals: List[int], highs: Optional[List[float]] = None,
+               lows: Optional[List[float]] = None) -> 'ResumableBacktest':
+        """Process the next bars; returns self."""
+        if prices is None or signals is None or len(prices) == 0 or len(prices) != len(signals):
+            raise ValueError("prices and signals must be non-empty and the same length")
+        for name, extra in (('highs', highs), ('lows', lows)):
+            if extra is not None and len(extra) != len(prices):
+                raise ValueError(f"{name} must be the same length as prices")
+
+        equity = self.equity
+        position = self.position
+        desired = self.desired
+        entry_price = self.entry_price
+        entry_units = self.entry_units
+        stop_price = self.stop_price
+        target_price = self.target_price
+        prev_close = self.last_price
+        acc = self.metrics
+        trades = self.trades
+        equity_curve = self.equity_curve
+        # ATR at each new bar (None when not needed or during the warm-up)
+        if self.atr_stream is not None:
+            atr_values = self.atr_stream.extend(prices, highs, lows)
+            if self.atr is not None:
+                self.atr.extend(atr_values)
+        else:
+            atr_values = itertools.repeat(None)
+        risk_per_trade = self.risk_per_trade
+        leverage = self.leverage
+        slippage = self.slippage
+        commission = self.commission
+        size_by_atr = self.position_sizing == 'atr'
+
+        allow_short = self.allow_short
+        # the signal that opens a short; without allow_short it falls back to 1 (long)
+        short_signal = -1 if allow_short else 1
+
+        stop_loss = self.stop_loss
+        take_profit = self.take_profit
+        uses_stops = stop_loss is not None or take_profit is not None
+        stop_by_atr = self.stop_units == 'atr'
+        tie_break = self.tie_break
+
+        bars = zip(itertools.count(self.bars), prices, signals, atr_values,
+                   prices if highs is None else highs, prices if lows is None else lows)
+        for i, p, s, current_atr, hi, lo in bars:
+            # intrabar stop-loss / take-profit of the position held into this bar
+            if uses_stops and position != 0:
+                if position > 0:
+                    sl_hit = stop_price is not None and lo <= stop_price
+                    tp_hit = target_price is not None and hi >= target_price
+                else:
+                    sl_hit = stop_price is not None and hi >= stop_price
+                    tp_hit = target_price is not None and lo <= target_price
+                if sl_hit or tp_hit:
+                    use_stop = sl_hit
+                    if sl_hit and tp_hit:
+                        if tie_break == 'target':
+                            use_stop = False
+                        elif tie_break == 'nearest':
+                            use_stop = abs(prev_close - stop_price) <= abs(target_price - prev_close)
+                    level = stop_price if use_stop else target_price
+                    exit_price = level * (1 - position * slippage)
+                    pnl = (exit_price - entry_price) * entry_units * leverage
+                    commission_cost = position * entry_units * exit_price * commission
+                    equity += pnl
+                    equity -= commission_cost
+                    acc.add_trade(pnl)
+                    if trades is not None:
+                        trades.add_exit(i, exit_price, entry_units, pnl, commission_cost)
+                    # flat until the signal changes
+                    position = 0
+                    entry_price = None
+                    entry_units = 0.0
+
+            # 1 asks for a long, 0 for flat, -1 for a short (with allow_short); anything else holds
+            target = s if s == 0 or s == 1 or s == short_signal else desired
+
+            # exit on a flat signal or a reversal
+            if position != 0 and target != position:
+                exit_price = p * (1 - position * slippage)
+                pnl = (exit_price - entry_price) * entry_units * leverage
+                commission_cost = position * entry_units * exit_price * commission
+                equity += pnl
+                equity -= commission_cost
+                acc.add_trade(pnl)
+                if trades is not None:
+                    trades.add_exit(i, exit_price, entry_units, pnl, commission_cost)
+                # reset
+                position = 0
+                entry_price = None
+                entry_units = 0.0
+
+            # entry when the signal asks for a new position
+            if position == 0 and target != 0 and target != desired:
                 # determine units using either fixed risk fraction or ATR-based sizing
-                if position_sizing == 'fixed' or atr is None or atr[i] is None:
+                if not size_by_atr or current_atr is None:
                     # allocate risk_per_trade fraction of equity (simplified)
                     budget = equity * risk_per_trade * leverage
                     entry_units = budget / p if p > 0 else 0.0
                 else:
                     # ATR-based: use risk_per_trade fraction of equity divided by ATR to size position
-                    current_atr = atr[i]
                     # units = (risk_per_trade * equity * leverage) / (atr * price) conservatively
                     if current_atr <= 0:
                         entry_units = 0.0
                     else:
                         entry_units = (risk_per_trade * equity * leverage) / (current_atr * p)
-                entry_price = p * (1 + self.slippage)
-                # commission on buy
-                commission_cost = entry_units * entry_price * self.commission
+                position = target
+                # buys fill above the price, sells below; units are signed
+                entry_price = p * (1 + position * slippage)
+                entry_units = position * entry_units
+                # commission on entry
+                commission_cost = position * entry_units * entry_price * commission
                 equity -= commission_cost
-                position = 1
-                trades.append({'type': 'entry', 'index': i, 'price': entry_price, 'units': entry_units, 'commission': commission_cost})
+                if trades is not None:
+                    trades.add_entry(i, entry_price, entry_units, commission_cost)
+                if uses_stops:
+                    unit = current_atr if stop_by_atr else entry_price
+                    if unit is None:
+                        stop_price = target_price = None
+                    else:
+                        stop_price, target_price = _stop_levels(entry_price, position, stop_loss, take_profit, unit)
 
-            # exit
-            elif position == 1 and s == 0:
-                exit_price = p * (1 - self.slippage)
-                pnl = (exit_price - entry_price) * entry_units * leverage
-                commission_cost = entry_units * exit_price * self.commission
-                equity += pnl
-                equity -= commission_cost
-                trades.append({'type': 'exit', 'index': i, 'price': exit_price, 'units': entry_units, 'pnl': pnl, 'commission': commission_cost})
-                # reset
-                position = 0
-                entry_price = None
-                entry_units = 0.0
+            desired = target
+            prev_close = p
+            if equity_curve is not None:
+                equity_curve.append(equity)
+            acc.update(equity)
+
+        self.bars += len(prices)
+        self.equity = equity
+        self.position = position
+        self.desired = desired
+        self.entry_price = entry_price
+        self.entry_units = entry_units
+        self.stop_price = stop_price
+        self.target_price = target_price
+        self.last_price = prices[-1]
+        return self
+
+    def result(self) -> Dict:
+        """Backtest result for the bars so far, closing any open position at the last price.
 
-            equity_curve.append(equity)
-            if equity > peak:
-                peak = equity
-            drawdowns.append((peak - equity) / peak if peak > 0 else 0.0)
+        The forced close is applied to copies, so later updates continue
+        from the open position.
+        """
+        if self.bars == 0:
+            raise ValueError("no bars have been processed")
+        equity = self.equity
+        acc = self.metrics
+        trades = self.trades
+        equity_curve = self.equity_curve
 
         # close any open position at last price
-        if position == 1 and entry_price is not None:
-            last_price = prices[-1] * (1 - self.slippage)
-            pnl = (last_price - entry_price) * entry_units * leverage
-            commission_cost = entry_units * last_price * self.commission
+        final_equity = None
+        if self.position != 0 and self.entry_price is not None:
+            last_price = self.last_price * (1 - self.position * self.slippage)
+            pnl = (last_price - self.entry_price) * self.entry_units * self.leverage
+            commission_cost = self.position * self.entry_units * last_price * self.commission
             equity += pnl
             equity -= commission_cost
-            trades.append({'type': 'exit', 'index': len(prices) - 1, 'price': last_price, 'units': entry_units, 'pnl': pnl, 'commission': commission_cost})
-            equity_curve[-1] = equity
-            if equity > peak:
-                peak = equity
-            drawdowns.append((peak - equity) / peak if peak > 0 else 0.0)
-
-        total_return = (equity - self.initial_capital) / self.initial_capital
-        max_drawdown = max(drawdowns) if drawdowns else 0.0
+            acc = copy.copy(acc)
+            acc.add_trade(pnl)
+            if trades is not None:
+                trades = trades.copy()
+                trades.add_exit(self.bars - 1, last_price, self.entry_units, pnl, commission_cost)
+            if equity_curve is not None:
+                equity_curve = equity_curve[:-1] + [equity]
+            final_equity = equity
+        elif equity_curve is not None:
+            equity_curve = list(equity_curve)
+            trades = trades.copy()
 
         # compute returns series from equity curve
-        returns = []
-        for k in range(1, len(equity_curve)):
-            prev = equity_curve[k - 1]
-            cur = equity_curve[k]
-            if prev != 0:
-                returns.append((cur - prev) / prev)
-
-        # annualize factor
-        def annualize(mean_ret, ann_factor):
-            return mean_ret * ann_factor
-
-        # Sharpe: use mean(return)/std(return) * sqrt(annualization)
-        sharpe = None
-        sortino = None
-        if returns:
-            mean_r = statistics.mean(returns)
-            std_r = statistics.pstdev(returns) if len(returns) > 1 else 0.0
-            if std_r > 0:
-                sharpe = (mean_r / std_r) * math.sqrt(annualization)
-            # downside deviation for Sortino
-            neg_returns = [r for r in returns if r < 0]
-            if neg_returns:
-                dd = statistics.pstdev(neg_returns)
-                if dd > 0:
-                    sortino = (mean_r / dd) * math.sqrt(annualization)
-
-        # additional metrics
-        cagr = None
-        ann_vol = None
-        win_rate = None
-        n_periods = len(prices)
-        if n_periods > 0:
-            years = n_periods / annualization
-            if years > 0:
-                ending = equity
-                starting = self.initial_capital
-                try:
-                    cagr = (ending / starting) ** (1.0 / years) - 1.0
-                except Exception:
-                    cagr = None
-        if returns:
-            ann_vol = statistics.pstdev(returns) * math.sqrt(annualization) if len(returns) > 1 else 0.0
-
-        # compute win rate from trades (exits contain 'pnl')
-        exit_pnls = [t['pnl'] for t in trades if t.get('type') == 'exit' and 'pnl' in t]
-        if exit_pnls:
-            wins = sum(1 for p in exit_pnls if p > 0)
-            win_rate = wins / len(exit_pnls)
-
-        result = {
+        returns = None
+        if equity_curve is not None:
+            returns = []
+            for k in range(1, len(equity_curve)):
+                prev = equity_curve[k - 1]
+                cur = equity_curve[k]
+                if prev != 0:
+                    returns.append((cur - prev) / prev)
+
+        # Sharpe/Sortino/CAGR/volatility/win rate from the streaming accumulator
+        stats = acc.summary(self.annualization, final_equity=final_equity)
+
+        return {
             'equity_curve': equity_curve,
             'trades': trades,
-            'total_return': total_return,
-            'max_drawdown': max_drawdown,
+            'total_return': stats['total_return'],
+            'max_drawdown': stats['max_drawdown'],
             'returns': returns,
-            'sharpe': sharpe,
-            'sortino': sortino,
-            'atr': atr,
-            'cagr': cagr,
-            'annual_volatility': ann_vol,
-            'win_rate': win_rate,
+            'sharpe': stats['sharpe'],
+            'sortino': stats['sortino'],
+            'atr': list(self.atr) if self.atr is not None else None,
+            'cagr': stats['cagr'],
+            'annual_volatility': stats['annual_volatility'],
+            'win_rate': stats['win_rate'],
+            'n_trades': stats['n_trades'],
         }
 
-        return result
+    def save(self, path: str):
+        with open(path, 'wb') as f:
+            pickle.dump(self, f, protocol=pickle.HIGHEST_PROTOCOL)
 
-    def plot_equity(self, equity_curve: List[float], filename: str = 'equity.png'):
-        """Save a plot of the equity curve to `filename`. Requires matplotlib."""
-        if plt is None:
-            raise RuntimeError("matplotlib is not available")
-        fig, ax = plt.subplots()
-        ax.plot(equity_curve, label='Equity')
-        ax.set_xlabel('Period')
-        ax.set_ylabel('Equity')
-        ax.legend()
-        fig.tight_layout()
-        fig.savefig(filename)
+    @classmethod
+    def load(cls, path: str) -> 'ResumableBacktest':
+        with open(path, 'rb') as f:
+            state = pickle.load(f)
+        if not isinstance(state, cls):
+            raise TypeError(f"{path} does not contain a {cls.__name__}")
+        return state
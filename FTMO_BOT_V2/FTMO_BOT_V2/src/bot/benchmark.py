@@ -0,0 +1,288 @@
+"""Performance benchmarks for the backtester, strategies and optimizer.
+
+Each case runs on synthetic random-walk OHLC series of the requested sizes
+and records wall time, throughput (bars processed per second, counting every
+combo/fold pass) and peak traced memory. `compare` checks a run against a
+stored baseline with a relative tolerance; scripts/benchmark.py is the
+command-line entry point (`make bench`).
+
+`import_costs` times the cold start (a fresh interpreter importing the
+module) of the optimizer, the backtester and the CLIs, which every pool
+worker and script run pays, and `check_imports` gates it on
+IMPORT_BUDGET_SECONDS and LAZY_MODULES (`make bench-imports`).
+"""
+import gc
+import json
+import math
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Sequence
+
+try:
+    import numpy as np
+except Exception:
+    np = None
+
+from src.bot import indicators
+from src.bot.backtest import Backtester
+from src.bot.optimizer import grid_search_ma, walk_forward_evaluate
+from src.bot.strategies import MovingAverageStrategy
+
+DEFAULT_SIZES = (1_000, 10_000, 100_000)
+
+# fast cases are looped until one timing sample takes at least this long; shorter
+# samples (a 1000-bar backtest is ~1 ms) swing by more than the gate's tolerance
+MIN_SAMPLE_SECONDS = 0.2
+# peak-memory growth below this is treated as noise
+MIN_MEMORY_DELTA_MB = 1.0
+
+# cold-start budget per import target, in seconds on top of a bare interpreter
+IMPORT_BUDGET_SECONDS = 0.5
+# loaded only by the functions that need them (plotting, CSV parsing)
+LAZY_MODULES = ('matplotlib', 'pandas')
+# name -> statement run in a fresh interpreter from the repository root
+IMPORT_TARGETS: Dict[str, str] = {
+    'backtest': 'import src.bot.backtest',
+    'optimizer': 'import src.bot.optimizer',
+    'walkforward_cli': "import runpy; runpy.run_path('scripts/walkforward_cli.py', run_name='walkforward_cli')",
+    'benchmark_cli': "import runpy; runpy.run_path('scripts/benchmark.py', run_name='benchmark_cli')",
+}
+REPO_ROOT = Path(__file__).resolve().parents[2]
+
+GRID_SHORTS = [5, 10, 20]
+GRID_LONGS = [50, 100]
+
+
+def synthetic_ohlc(n: int, seed: int = 42) -> Dict[str, list]:
+    """Deterministic random-walk close series with highs/lows around it."""
+    rng = np.random.default_rng(seed)
+    close = 100.0 + np.cumsum(rng.normal(0.0, 0.5, n))
+    close = np.maximum(close, 1.0)
+    spread = rng.random(n)
+    return {
+        'close': close.tolist(),
+        'high': (close + spread).tolist(),
+        'low': (close - spread).tolist(),
+    }
+
+
+def _ma_signals(data):
+    return MovingAverageStrategy(10, 50).generate_signals(data['close'])
+
+
+def _backtest(position_sizing: str, atr_method: str = 'sma') -> Callable:
+    def setup(data):
+        signals = _ma_signals(data)
+        bt = Backtester(initial_capital=10000, commission=0.0005, slippage=0.0002)
+
+        def run():
+            bt.run(data['close'], signals, position_sizing=position_sizing, highs=data['high'], lows=data['low'],
+                   atr_method=atr_method, keep_curves=False)
+        return run, 1
+    return setup
+
+
+def _signals(data):
+    strat = MovingAverageStrategy(10, 50)
+
+    def run():
+        indicators.clear_cache()
+        strat.generate_signals(data['close'])
+    return run, 1
+
+
+def _grid(data):
+    def run():
+        grid_search_ma(data['close'], GRID_SHORTS, GRID_LONGS, keep_curves=False)
+    return run, len(GRID_SHORTS) * len(GRID_LONGS)
+
+
+def _walk_forward(incremental: bool) -> Callable:
+    def setup(data):
+        n = len(data['close'])
+        train, test = n // 2, max(n // 10, 1)
+        folds = (n - train) // test
+
+        def run():
+            indicators.clear_cache()
+            walk_forward_evaluate(data['close'], GRID_SHORTS, GRID_LONGS, train_size=train, test_size=test,
+                                  incremental=incremental)
+        return run, len(GRID_SHORTS) * len(GRID_LONGS) * folds * test / n
+    return setup
+
+
+# name -> setup(data) returning (run, passes): `run()` is timed, and
+# `passes` scales the bar count into bars processed per run
+CASES: Dict[str, Callable] = {
+    'backtest_fixed': _backtest('fixed'),
+    'backtest_atr_sma': _backtest('atr', 'sma'),
+    'backtest_atr_wilder': _backtest('atr', 'wilder'),
+    'ma_generate_signals': _signals,
+    'grid_search_ma': _grid,
+    'walk_forward': _walk_forward(False),
+    'walk_forward_incremental': _walk_forward(True),
+}
+
+
+def _loops(run: Callable) -> int:
+    """Calls per timing sample so that one sample takes at least MIN_SAMPLE_SECONDS."""
+    start = time.perf_counter()
+    run()
+    first = time.perf_counter() - start
+    return max(1, math.ceil(MIN_SAMPLE_SECONDS / first)) if first > 0 else 1
+
+
+def _sample(run: Callable, loops: int) -> float:
+    """Per-call time of one sample of `loops` calls."""
+    gc.collect()
+    start = time.perf_counter()
+    for _ in range(loops):
+        run()
+    return (time.perf_counter() - start) / loops
+
+
+def _peak_memory(run: Callable) -> int:
+    gc.collect()
+    tracemalloc.start()
+    try:
+        run()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def run_suite(sizes: Sequence[int] = DEFAULT_SIZES, cases: Optional[Sequence[str]] = None, repeat: int = 9,
+              memory: bool = True, seed: int = 42, log: Optional[Callable[[str], None]] = None) -> Dict:
+    """Run the selected cases on every size; returns the JSON-ready report.
+
+    Each case's time is the median of `repeat` samples of at least
+    MIN_SAMPLE_SECONDS, sampled round-robin with the other cases of the size.
+    """
+    if np is None:
+        raise RuntimeError('numpy is required for the benchmark suite')
+    names = list(cases or CASES)
+    unknown = [name for name in names if name not in CASES]
+    if unknown:
+        raise ValueError(f"Unknown benchmark case(s): {', '.join(unknown)}")
+
+    results = {}
+    for n in sizes:
+        data = synthetic_ohlc(int(n), seed=seed)
+        runs = {name: CASES[name](data) for name in names}
+        loops = {name: _loops(run) for name, (run, _) in runs.items()}
+        # samples are taken round-robin over the cases, so a slow spell of the
+        # machine spreads over all of them instead of skewing one case's median
+        samples = {name: [] for name in names}
+        for _ in range(max(repeat, 1)):
+            for name, (run, _) in runs.items():
+                samples[name].append(_sample(run, loops[name]))
+        for name, (run, passes) in runs.items():
+            seconds = statistics.median(samples[name])
+            entry = {
+                'bars': int(n),
+                'seconds': seconds,
+                'bars_per_sec': int(n) * passes / seconds if seconds > 0 else None,
+                'peak_mb': _peak_memory(run) / 2 ** 20 if memory else None,
+            }
+            results[f'{name}@{int(n)}'] = entry
+            if log is not None:
+                log(f"{name:<26} {int(n):>10} bars  {seconds:9.4f}s  {entry['bars_per_sec']:14,.0f} bars/s"
+                    + (f"  {entry['peak_mb']:8.1f} MB" if memory else ''))
+
+    return {
+        'meta': {
+            'created': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'machine': platform.machine(),
+            'platform': platform.platform(),
+            'repeat': repeat,
+        },
+        'results': results,
+    }
+
+
+def compare(report: Dict, baseline: Dict, tolerance: float = 0.25) -> List[str]:
+    """Return regressions of `report` against `baseline`.
+
+    A case regresses when its throughput drops by more than `tolerance`
+    (relative) or its peak memory grows by more than `tolerance` (and by at
+    least MIN_MEMORY_DELTA_MB). Cases missing from either side are ignored.
+    """
+    regressions = []
+    for key, base in baseline.get('results', {}).items():
+        cur = report.get('results', {}).get(key)
+        if cur is None:
+            continue
+        if base.get('bars_per_sec') and cur.get('bars_per_sec') is not None:
+            if cur['bars_per_sec'] < base['bars_per_sec'] * (1.0 - tolerance):
+                regressions.append(f"{key}: {cur['bars_per_sec']:,.0f} bars/s vs baseline "
+                                   f"{base['bars_per_sec']:,.0f} (-{1 - cur['bars_per_sec'] / base['bars_per_sec']:.0%})")
+        if base.get('peak_mb') and cur.get('peak_mb') is not None:
+            if (cur['peak_mb'] > base['peak_mb'] * (1.0 + tolerance)
+                    and cur['peak_mb'] - base['peak_mb'] >= MIN_MEMORY_DELTA_MB):
+                regressions.append(f"{key}: peak {cur['peak_mb']:.1f} MB vs baseline {base['peak_mb']:.1f} MB "
+                                   f"(+{cur['peak_mb'] / base['peak_mb'] - 1:.0%})")
+    return regressions
+
+
+def save_report(report: Dict, filename: str):
+    with open(filename, 'w') as f:
+        json.dump(report, f, indent=2, sort_keys=True)
+
+
+def load_report(filename: str) -> Dict:
+    with open(filename) as f:
+        return json.load(f)
+
+
+def _cold_run(statement: str) -> tuple:
+    """Run `statement` in a fresh interpreter; returns (seconds, loaded top-level module names)."""
+    code = statement + "\nimport json, sys\nprint(json.dumps(sorted({m.split('.')[0] for m in sys.modules})))"
+    env = dict(os.environ, PYTHONPATH=str(REPO_ROOT))
+    start = time.perf_counter()
+    out = subprocess.run([sys.executable, '-c', code], cwd=str(REPO_ROOT), env=env, capture_output=True,
+                         text=True, check=True).stdout
+    return time.perf_counter() - start, json.loads(out.strip().splitlines()[-1])
+
+
+def import_costs(targets: Optional[Sequence[str]] = None, repeat: int = 3,
+                 log: Optional[Callable[[str], None]] = None) -> Dict:
+    """Cold-start cost of each IMPORT_TARGETS entry.
+
+    Returns {name: {'seconds', 'lazy_loaded'}}: the fastest of `repeat`
+    fresh-interpreter runs minus that of a bare interpreter, and the
+    LAZY_MODULES the import pulled in.
+    """
+    names = list(targets or IMPORT_TARGETS)
+    unknown = [name for name in names if name not in IMPORT_TARGETS]
+    if unknown:
+        raise ValueError(f"Unknown import target(s): {', '.join(unknown)}")
+    bare = min(_cold_run('pass')[0] for _ in range(max(repeat, 1)))
+    results = {}
+    for name in names:
+        runs = [_cold_run(IMPORT_TARGETS[name]) for _ in range(max(repeat, 1))]
+        seconds = max(min(t for t, _ in runs) - bare, 0.0)
+        results[name] = {'seconds': seconds, 'lazy_loaded': [m for m in LAZY_MODULES if m in runs[-1][1]]}
+        if log is not None:
+            loaded = ', '.join(results[name]['lazy_loaded']) or '-'
+            log(f"{name:<26} {seconds * 1000:8.1f} ms  eager: {loaded}")
+    return results
+
+
+def check_imports(costs: Dict, budget: float = IMPORT_BUDGET_SECONDS) -> List[str]:
+    """Targets over the cold-start `budget` or loading a LAZY_MODULES entry at import time."""
+    problems = []
+    for name, entry in costs.items():
+        if entry['seconds'] > budget:
+            problems.append(f"{name}: import takes {entry['seconds'] * 1000:.0f} ms (budget {budget * 1000:.0f} ms)")
+        if entry['lazy_loaded']:
+            problems.append(f"{name}: imports {', '.join(entry['lazy_loaded'])} at module load")
+    return problems
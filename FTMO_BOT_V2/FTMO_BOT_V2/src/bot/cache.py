@@ -0,0 +1,165 @@
+"""Persistent, content-addressed store for backtest results.
+
+Keys are hashes of everything a result depends on (price-series hash,
+strategy, parameters, costs and sizing; see `make_key`), so a result is
+reused only when it would be recomputed identically. Values are pickled
+and zlib-compressed into a single SQLite file; when the file grows past
+`max_bytes` the least recently used entries are evicted. Several processes
+may share one file (e.g. the walk-forward CLI's --batch workers): it runs in
+WAL mode and writers wait up to BUSY_TIMEOUT_SECONDS for the lock.
+
+Usage:
+  with ResultCache('outputs/.cache/results.sqlite') as cache:
+      results = grid_search_ma(prices, shorts, longs, cache=cache)
+"""
+import functools
+import hashlib
+import json
+import pickle
+import sqlite3
+import time
+import zlib
+from pathlib import Path
+from typing import Dict, Iterable, List, Tuple
+
+# Bump when engine changes alter results, so older entries stop matching.
+CACHE_VERSION = 2
+
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+
+# how long a writer waits for another process holding the database lock
+BUSY_TIMEOUT_SECONDS = 60.0
+
+
+def make_key(*parts) -> str:
+    """Stable hash of JSON-serializable key parts (tuples are treated like lists)."""
+    payload = json.dumps([CACHE_VERSION, parts], sort_keys=True, separators=(',', ':'), default=repr)
+    return hashlib.blake2b(payload.encode('utf-8'), digest_size=20).hexdigest()
+
+
+def _bound_id(value):
+    """Key part of a value bound by a partial: callables by strategy_id, containers element-wise."""
+    if isinstance(value, (list, tuple)):
+        return [_bound_id(v) for v in value]
+    if isinstance(value, dict):
+        return {str(k): _bound_id(v) for k, v in value.items()}
+    if callable(value):
+        return strategy_id(value)
+    return value
+
+
+def strategy_id(strategy_factory) -> str:
+    """Identify a strategy class/factory in cache keys.
+
+    Classes and module-level functions are identified by module and
+    qualified name; a functools.partial also by its bound arguments
+    (recursively). Lambdas, closures, locally defined functions and other
+    callable objects carry state the name does not capture, so they raise
+    ValueError rather than share cache entries.
+    """
+    if isinstance(strategy_factory, functools.partial):
+        return json.dumps({'partial': strategy_id(strategy_factory.func),
+                           'args': _bound_id(list(strategy_factory.args)),
+                           'keywords': _bound_id(strategy_factory.keywords)},
+                          sort_keys=True, separators=(',', ':'), default=repr)
+    module = getattr(strategy_factory, '__module__', None)
+    name = getattr(strategy_factory, '__qualname__', None)
+    if (name is None or '<lambda>' in name or '<locals>' in name
+            or getattr(strategy_factory, '__closure__', None)):
+        raise ValueError(f'cannot cache results of {strategy_factory!r}: use a class, a module-level function '
+                         f'or functools.partial, or run without cache')
+    return f'{module}.{name}'
+
+
+class ResultCache:
+    """SQLite-backed key/value store with size-based LRU eviction."""
+
+    def __init__(self, path: str = 'outputs/.cache/results.sqlite', max_bytes: int = DEFAULT_MAX_BYTES):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = int(max_bytes)
+        self._conn = sqlite3.connect(str(self.path), timeout=BUSY_TIMEOUT_SECONDS)
+        # readers do not block the writer (and vice versa) when processes share the file
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute(
+            'CREATE TABLE IF NOT EXISTS results ('
+            ' key TEXT PRIMARY KEY, value BLOB NOT NULL, size INTEGER NOT NULL, used REAL NOT NULL)'
+        )
+        self._conn.execute('CREATE INDEX IF NOT EXISTS results_used ON results (used)')
+        self._conn.commit()
+        self.hits = 0
+        self.misses = 0
+
+    def close(self):
+        self._conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def __len__(self) -> int:
+        return self._conn.execute('SELECT COUNT(*) FROM results').fetchone()[0]
+
+    def __contains__(self, key: str) -> bool:
+        return self._conn.execute('SELECT 1 FROM results WHERE key = ?', (key,)).fetchone() is not None
+
+    def size_bytes(self) -> int:
+        return self._conn.execute('SELECT COALESCE(SUM(size), 0) FROM results').fetchone()[0]
+
+    def get(self, key: str, default=None):
+        return self.get_many([key]).get(key, default)
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, object]:
+        """Return {key: value} for the keys present; marks them as recently used."""
+        keys = list(dict.fromkeys(keys))
+        found = {}
+        for i in range(0, len(keys), 500):
+            batch = keys[i:i + 500]
+            marks = ','.join('?' * len(batch))
+            rows = self._conn.execute(f'SELECT key, value FROM results WHERE key IN ({marks})', batch)
+            for key, blob in rows:
+                found[key] = pickle.loads(zlib.decompress(blob))
+        if found:
+            now = time.time()
+            self._conn.executemany('UPDATE results SET used = ? WHERE key = ?', [(now, k) for k in found])
+            self._conn.commit()
+        self.hits += len(found)
+        self.misses += len(keys) - len(found)
+        return found
+
+    def put(self, key: str, value):
+        self.put_many([(key, value)])
+
+    def put_many(self, items: Iterable[Tuple[str, object]]):
+        now = time.time()
+        rows = []
+        for key, value in items:
+            blob = zlib.compress(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL))
+            rows.append((key, blob, len(blob), now))
+        if not rows:
+            return
+        self._conn.executemany('INSERT OR REPLACE INTO results (key, value, size, used) VALUES (?, ?, ?, ?)', rows)
+        self._conn.commit()
+        self.evict()
+
+    def evict(self, max_bytes: int = None):
+        """Drop least recently used entries until the stored size is at most `max_bytes`."""
+        limit = self.max_bytes if max_bytes is None else max_bytes
+        excess = self.size_bytes() - limit
+        if excess <= 0:
+            return
+        doomed: List[str] = []
+        for key, size in self._conn.execute('SELECT key, size FROM results ORDER BY used, key'):
+            doomed.append(key)
+            excess -= size
+            if excess <= 0:
+                break
+        self._conn.executemany('DELETE FROM results WHERE key = ?', [(k,) for k in doomed])
+        self._conn.commit()
+
+    def clear(self):
+        self._conn.execute('DELETE FROM results')
+        self._conn.commit()
+        self._conn.execute('VACUUM')
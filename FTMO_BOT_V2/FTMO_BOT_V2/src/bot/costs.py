@@ -0,0 +1,190 @@
+"""Per-symbol trading costs shared by backtests and live sizing.
+
+A `CostModel` holds a symbol's spread and slippage (pips), commission and
+swap (account currency per lot and round trip) plus its contract specs.
+It converts them to:
+- the `commission`/`slippage` fractions of Backtester/optimize
+  (`fractions` per bar, `backtest_kwargs` for a whole series), so grid
+  results include real costs at no extra runtime;
+- the risk per lot and effective reward/risk used to size live orders
+  (`risk_per_lot`, `lot_by_risk`, `rr_effective`), the terms of
+  calc_lot_by_risk in FTMO_GPT_Trader_MAIN.py and rr_effectif in
+  rm_policy.py.
+
+`calibrate_from_journal` fits the costs from the live journal_trades.csv.
+
+Usage:
+  costs = calibrate_from_journal('journal_trades.csv')
+  model = costs.get('EURUSD') or CostModel.for_symbol('EURUSD')
+  table = optimize(prices, MovingAverageStrategy, grid, **model.backtest_kwargs(prices))
+"""
+import csv
+import math
+from typing import Dict, Optional
+
+try:
+    import numpy as np
+except Exception:
+    np = None
+
+# contract specs of the live whitelist (FTMO MT5): pip size, points per pip,
+# contract size and pip value per lot in USD (None: USD is the base
+# currency, so the pip value is contract_size * pip_size / price)
+SYMBOL_SPECS = {
+    'EURUSD': dict(pip_size=0.0001, points_per_pip=10, contract_size=100000, pip_value=10.0),
+    'GBPUSD': dict(pip_size=0.0001, points_per_pip=10, contract_size=100000, pip_value=10.0),
+    'USDJPY': dict(pip_size=0.01, points_per_pip=10, contract_size=100000, pip_value=None),
+    'XAUUSD': dict(pip_size=0.01, points_per_pip=1, contract_size=100, pip_value=1.0),
+    'US100.cash': dict(pip_size=0.01, points_per_pip=1, contract_size=1, pip_value=0.01),
+    'US30.cash': dict(pip_size=0.01, points_per_pip=1, contract_size=1, pip_value=0.01),
+    'BTCUSD': dict(pip_size=0.01, points_per_pip=1, contract_size=1, pip_value=0.01),
+}
+
+# slippage beyond this is a logging error (same guard as the live trader)
+MAX_SLIPPAGE_PIPS = 1000.0
+
+
+class CostModel:
+    """Costs of trading one symbol; see the module docstring."""
+
+    def __init__(self, symbol: str, pip_size: float, contract_size: float, pip_value: Optional[float] = None,
+                 points_per_pip: int = 1, spread_pips: float = 0.0, slippage_pips: float = 0.0,
+                 commission_per_lot: float = 0.0, swap_per_lot: float = 0.0):
+        self.symbol = symbol
+        self.pip_size = float(pip_size)
+        self.contract_size = float(contract_size)
+        self.pip_value = None if pip_value is None else float(pip_value)
+        self.points_per_pip = points_per_pip
+        self.spread_pips = float(spread_pips)
+        self.slippage_pips = float(slippage_pips)
+        self.commission_per_lot = float(commission_per_lot)
+        self.swap_per_lot = float(swap_per_lot)
+
+    @classmethod
+    def for_symbol(cls, symbol: str, **costs) -> 'CostModel':
+        """Model with the SYMBOL_SPECS contract specs of `symbol` and the given costs."""
+        if symbol not in SYMBOL_SPECS:
+            raise KeyError(f'no contract specs for {symbol}; pass pip_size/contract_size to CostModel')
+        return cls(symbol, **dict(SYMBOL_SPECS[symbol], **costs))
+
+    def __repr__(self) -> str:
+        return (f'CostModel({self.symbol!r}, spread_pips={self.spread_pips:g}, slippage_pips={self.slippage_pips:g}, '
+                f'commission_per_lot={self.commission_per_lot:g}, swap_per_lot={self.swap_per_lot:g})')
+
+    def pip_value_per_lot(self, price=None):
+        """Account-currency value of one pip for one lot (needs `price` when USD is the base currency)."""
+        if self.pip_value is not None:
+            return self.pip_value
+        if price is None:
+            raise ValueError(f'{self.symbol}: the pip value depends on the price; pass price')
+        return self.contract_size * self.pip_size / price
+
+    # -- backtests -------------------------------------------------------
+
+    def fractions(self, prices) -> Dict[str, 'np.ndarray']:
+        """Per-bar Backtester cost fractions for trading at `prices`.
+
+        slippage: half the spread plus the slippage, per side, as a fraction
+        of the price. commission: commission and swap per lot, split over
+        both sides, as a fraction of one lot's notional value.
+        """
+        p = np.asarray(prices, dtype=float)
+        notional = self.pip_value_per_lot(p) / self.pip_size * p
+        return {
+            'commission': (self.commission_per_lot + self.swap_per_lot) / 2.0 / notional,
+            'slippage': (self.spread_pips / 2.0 + self.slippage_pips) * self.pip_size / p,
+        }
+
+    def backtest_kwargs(self, prices) -> Dict[str, float]:
+        """`commission`/`slippage` for Backtester, optimize and the search functions, at the median price."""
+        return {name: float(np.median(values)) for name, values in self.fractions(prices).items()}
+
+    # -- live sizing -----------------------------------------------------
+
+    def risk_per_lot(self, stop_pips: float, price: Optional[float] = None) -> float:
+        """Account-currency loss of one lot stopped out `stop_pips` away, costs included."""
+        pip_value = self.pip_value_per_lot(price)
+        return (stop_pips + max(0.0, self.spread_pips) + max(0.0, self.slippage_pips)) * pip_value \
+            + self.commission_per_lot + self.swap_per_lot
+
+    def lot_by_risk(self, equity: float, risk_per_trade: float, stop_pips: float, price: Optional[float] = None,
+                    volume_min: float = 0.01, volume_max: float = 100.0, volume_step: float = 0.01) -> float:
+        """Lots risking `risk_per_trade` (fraction) of equity, floored to the volume step and clamped."""
+        if stop_pips <= 0:
+            return volume_min
+        raw = equity * risk_per_trade / max(1e-9, self.risk_per_lot(stop_pips, price))
+        lot = math.floor(min(max(raw, volume_min), volume_max) / volume_step + 1e-9) * volume_step
+        decimals = 0 if volume_step >= 1 else max(0, int(round(-math.log10(volume_step))))
+        return max(volume_min, min(volume_max, round(lot, decimals)))
+
+    def rr_effective(self, sl_pips: float, tp_rr: float, lot: float, price: Optional[float] = None) -> float:
+        """Reward/risk after costs of a trade with a `tp_rr` * `sl_pips` target (rm_policy.rr_effectif)."""
+        cost_pips = (self.commission_per_lot + self.swap_per_lot) / (self.pip_value_per_lot(price) * max(lot, 1e-9))
+        sl_eff = sl_pips + self.slippage_pips
+        tp_eff = max(tp_rr * sl_pips - self.spread_pips - self.slippage_pips - cost_pips, 0.0)
+        return tp_eff / sl_eff if sl_eff > 0 else 0.0
+
+
+def _number(value) -> Optional[float]:
+    try:
+        x = float(value)
+    except (TypeError, ValueError):
+        return None
+    return x if math.isfinite(x) else None
+
+
+def _median(values, default: float = 0.0) -> float:
+    return float(np.median(values)) if values else default
+
+
+def calibrate_from_journal(path: str, specs: Optional[Dict[str, dict]] = None) -> Dict[str, CostModel]:
+    """Fit a CostModel per symbol from a journal_trades.csv.
+
+    Per symbol (only those with `specs`, default SYMBOL_SPECS) the model
+    takes the median of:
+    - spread_pips_exante;
+    - slippage_pts converted to pips, from filled orders (fill > 0) below
+      MAX_SLIPPAGE_PIPS;
+    - commission and swap divided by lots, from filled orders, as costs
+      (MT5 books charges as negative amounts).
+    Rows where a field is not a number (skipped or failed orders) do not
+    count for that field; rows with a different number of fields than the
+    header are ignored.
+    """
+    if np is None:
+        raise RuntimeError('numpy is required for calibrate_from_journal')
+    specs = SYMBOL_SPECS if specs is None else specs
+    samples: Dict[str, Dict[str, list]] = {}
+    with open(path, newline='', encoding='utf-8') as f:
+        for row in csv.DictReader(f):
+            # rows written with another layout do not line up with the header
+            if None in row or None in row.values():
+                continue
+            symbol = row.get('symbol')
+            if symbol not in specs:
+                continue
+            s = samples.setdefault(symbol, {'spread': [], 'slippage': [], 'commission': [], 'swap': []})
+            spread = _number(row.get('spread_pips_exante'))
+            if spread is not None and spread >= 0:
+                s['spread'].append(spread)
+            fill, slip = _number(row.get('fill')), _number(row.get('slippage_pts'))
+            if fill and fill > 0 and slip is not None:
+                pips = abs(slip) / specs[symbol].get('points_per_pip', 1)
+                if pips <= MAX_SLIPPAGE_PIPS:
+                    s['slippage'].append(pips)
+            lots = _number(row.get('lots'))
+            if fill and fill > 0 and lots and lots > 0:
+                commission, swap = _number(row.get('commission')), _number(row.get('swap'))
+                if commission is not None:
+                    s['commission'].append(abs(commission) / lots)
+                if swap is not None:
+                    s['swap'].append(-swap / lots)
+
+    return {
+        symbol: CostModel(symbol, **dict(specs[symbol],
+                                         spread_pips=_median(s['spread']),
+                                         slippage_pips=_median(s['slippage']),
+                                         commission_per_lot=_median(s['commission']),
+                                         swap_per_lot=_median(s['swap'])))
+        for symbol, s in samples.items()
+    }
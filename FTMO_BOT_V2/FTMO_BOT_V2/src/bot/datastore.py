@@ -0,0 +1,269 @@
+"""Binary OHLCV store: one `.npy` file per column plus a `meta.json`.
+
+Columns are float64 (time as int64 nanoseconds) so they can be opened with
+`np.load(..., mmap_mode='r')` and handed to the optimizer/backtester without
+parsing or copying.
+
+Layout of a store directory:
+  meta.json      {"rows": N, "columns": [...], "source": "prices.csv"}
+  close.npy      float64[N]
+  high.npy       ...
+  resampled/H1/  higher-timeframe aggregate, itself a store (see load_resampled)
+
+`append_store` adds new bars in place and refreshes the cached aggregates.
+"""
+import io
+import json
+import shutil
+from pathlib import Path
+from typing import Dict, List, Optional
+
+try:
+    import numpy as np
+except Exception:
+    np = None
+
+META_FILE = 'meta.json'
+RESAMPLED_DIR = 'resampled'
+
+# timeframe name -> bar length in seconds (names as in the live trader's TIMEFRAMES)
+TIMEFRAMES = {'M1': 60, 'M5': 300, 'M15': 900, 'M30': 1800, 'H1': 3600, 'H4': 14400, 'D1': 86400}
+
+# CSV header (lower-cased) -> store column name
+COLUMN_ALIASES = {
+    'time': 'time', 'date': 'time', 'datetime': 'time', 'timestamp': 'time',
+    'open': 'open', 'high': 'high', 'low': 'low',
+    'close': 'close', 'close_price': 'close', 'last': 'close',
+    'volume': 'volume', 'tick_volume': 'volume', 'vol': 'volume',
+}
+
+
+def _column_map(header: List[str]) -> Dict[str, str]:
+    """Map CSV headers to store columns (first match wins)."""
+    mapping = {}
+    for name in header:
+        target = COLUMN_ALIASES.get(name.strip().lower())
+        if target and target not in mapping.values():
+            mapping[name] = target
+    return mapping
+
+
+def csv_to_store(csv_path: str, store_dir: str, chunksize: int = 1_000_000) -> Dict:
+    """Convert an OHLC(V) CSV into a store directory. Returns the metadata dict.
+
+    Only recognised columns are parsed (see COLUMN_ALIASES), in chunks with
+    explicit float dtypes.
+    """
+    if np is None:
+        raise RuntimeError('numpy is required for the price store')
+    import pandas as pd
+
+    header = list(pd.read_csv(csv_path, nrows=0).columns)
+    mapping = _column_map(header)
+    if 'close' not in mapping.values():
+        raise ValueError(f'No close column found in {csv_path} (headers: {header})')
+    time_col = next((src for src, dst in mapping.items() if dst == 'time'), None)
+    dtypes = {src: 'float64' for src, dst in mapping.items() if dst != 'time'}
+
+    parts = {dst: [] for dst in mapping.values()}
+    for chunk in pd.read_csv(csv_path, usecols=list(mapping), dtype=dtypes, chunksize=chunksize):
+        for src, dst in mapping.items():
+            if dst == 'time':
+                parts[dst].append(pd.to_datetime(chunk[src]).to_numpy(dtype='datetime64[ns]').astype(np.int64))
+            else:
+                parts[dst].append(chunk[src].to_numpy(dtype=np.float64))
+
+    out = Path(store_dir)
+    out.mkdir(parents=True, exist_ok=True)
+    # aggregates of a previous conversion are stale
+    shutil.rmtree(out / RESAMPLED_DIR, ignore_errors=True)
+    rows = 0
+    for name, chunks in parts.items():
+        col = np.concatenate(chunks) if chunks else np.empty(0)
+        rows = len(col)
+        np.save(out / f'{name}.npy', col)
+    meta = {'rows': rows, 'columns': sorted(parts), 'source': str(csv_path), 'time_column': time_col}
+    _write_meta(out, meta)
+    return meta
+
+
+def is_store(path: str) -> bool:
+    return (Path(path) / META_FILE).exists()
+
+
+def load_store(store_dir: str, columns: Optional[List[str]] = None, mmap: bool = True) -> Dict[str, 'np.ndarray']:
+    """Open store columns as read-only memory maps (or in-memory arrays with mmap=False)."""
+    if np is None:
+        raise RuntimeError('numpy is required for the price store')
+    path = Path(store_dir)
+    meta = _read_meta(path)
+    names = columns or meta['columns']
+    missing = [c for c in names if c not in meta['columns']]
+    if missing:
+        raise KeyError(f'columns not in store: {missing}')
+    return {name: np.load(path / f'{name}.npy', mmap_mode='r' if mmap else None) for name in names}
+
+
+def _read_meta(store_dir) -> Dict:
+    with open(Path(store_dir) / META_FILE) as f:
+        return json.load(f)
+
+
+def _write_meta(store_dir, meta: Dict):
+    with open(Path(store_dir) / META_FILE, 'w') as f:
+        json.dump(meta, f, indent=2)
+
+
+def _write_rows(path: Path, values, start: int):
+    """Write `values` into the 1-D .npy at `path` from row `start` on, dropping any rows after them.
+
+    The header is rewritten in place when its size is unchanged (np.save
+    leaves room for the row count to grow), so appends cost O(len(values)).
+    """
+    with open(path, 'r+b') as f:
+        version = np.lib.format.read_magic(f)
+        read_header = np.lib.format.read_array_header_1_0 if version == (1, 0) else np.lib.format.read_array_header_2_0
+        shape, fortran_order, dtype = read_header(f)
+        offset = f.tell()
+        values = np.asarray(values, dtype=dtype)
+        rows = start + len(values)
+        header = {'descr': np.lib.format.dtype_to_descr(dtype), 'fortran_order': False, 'shape': (rows,)}
+        if version == (1, 0):
+            buf = io.BytesIO()
+            np.lib.format.write_array_header_1_0(buf, header)
+            if len(buf.getvalue()) == offset:
+                f.seek(0)
+                f.write(buf.getvalue())
+                f.seek(offset + start * dtype.itemsize)
+                f.write(values.tobytes())
+                f.truncate()
+                return
+    head = np.load(path)[:start]
+    np.save(path, np.concatenate([head, values]))
+
+
+def _timeframe_ns(timeframe) -> int:
+    if timeframe not in TIMEFRAMES:
+        raise ValueError(f"Unknown timeframe {timeframe!r}; expected one of {', '.join(TIMEFRAMES)}")
+    return TIMEFRAMES[timeframe] * 1_000_000_000
+
+
+def resample_ohlcv(columns: Dict[str, 'np.ndarray'], timeframe: str) -> Dict[str, 'np.ndarray']:
+    """Aggregate time-sorted OHLCV columns into `timeframe` bars.
+
+    Bars are labelled by the start of their period (UTC, so D1 is the
+    calendar day): open is the first open, high/low the extremes, close the
+    last close and volume the sum; only columns present are produced. The
+    last bar may still be forming.
+    """
+    if np is None:
+        raise RuntimeError('numpy is required for resampling')
+    if 'time' not in columns:
+        raise ValueError('resampling needs a time column')
+    step = _timeframe_ns(timeframe)
+    time = np.asarray(columns['time'], dtype=np.int64)
+    if len(time) == 0:
+        return {name: np.empty(0, dtype=np.asarray(col).dtype) for name, col in columns.items()}
+    if np.any(time[1:] < time[:-1]):
+        raise ValueError('resampling needs time-sorted bars')
+    bucket = time // step * step
+    starts = np.concatenate([[0], np.flatnonzero(bucket[1:] != bucket[:-1]) + 1])
+    ends = np.concatenate([starts[1:], [len(time)]]) - 1
+
+    out = {'time': bucket[starts]}
+    for name, col in columns.items():
+        col = np.asarray(col)
+        if name == 'open':
+            out[name] = col[starts]
+        elif name == 'high':
+            out[name] = np.maximum.reduceat(col, starts)
+        elif name == 'low':
+            out[name] = np.minimum.reduceat(col, starts)
+        elif name == 'close':
+            out[name] = col[ends]
+        elif name == 'volume':
+            out[name] = np.add.reduceat(col, starts)
+    return out
+
+
+def _resampled_dir(store_dir, timeframe) -> Path:
+    return Path(store_dir) / RESAMPLED_DIR / timeframe
+
+
+def resample_store(store_dir: str, timeframe: str) -> Dict:
+    """Build or bring up to date the cached `timeframe` aggregate of a store. Returns its metadata.
+
+    An existing aggregate is only extended: its last (possibly partial) bar
+    is rebuilt from the base rows of that period onwards.
+    """
+    if np is None:
+        raise RuntimeError('numpy is required for resampling')
+    _timeframe_ns(timeframe)
+    base_meta = _read_meta(store_dir)
+    out = _resampled_dir(store_dir, timeframe)
+    meta = _read_meta(out) if is_store(str(out)) else None
+    if meta is not None and meta['base_rows'] == base_meta['rows']:
+        return meta
+
+    base = load_store(store_dir)
+    if meta is None or meta['rows'] == 0:
+        aggregate = resample_ohlcv(base, timeframe)
+        out.mkdir(parents=True, exist_ok=True)
+        for name, col in aggregate.items():
+            np.save(out / f'{name}.npy', col)
+        keep = 0
+    else:
+        keep = meta['rows'] - 1
+        last_start = np.load(out / 'time.npy', mmap_mode='r')[keep]
+        first = int(np.searchsorted(base['time'], last_start, side='left'))
+        aggregate = resample_ohlcv({name: col[first:] for name, col in base.items()}, timeframe)
+        for name, col in aggregate.items():
+            _write_rows(out / f'{name}.npy', col, keep)
+    meta = {'rows': keep + len(aggregate['time']), 'columns': sorted(aggregate), 'timeframe': timeframe,
+            'base_rows': base_meta['rows']}
+    _write_meta(out, meta)
+    return meta
+
+
+def load_resampled(store_dir: str, timeframe: str, columns: Optional[List[str]] = None,
+                   mmap: bool = True) -> Dict[str, 'np.ndarray']:
+    """Open the `timeframe` aggregate of a store, building or updating the cache first."""
+    resample_store(store_dir, timeframe)
+    return load_store(str(_resampled_dir(store_dir, timeframe)), columns=columns, mmap=mmap)
+
+
+def append_store(store_dir: str, columns: Dict[str, 'np.ndarray']) -> Dict:
+    """Append bars to a store in place and refresh its cached aggregates. Returns the metadata.
+
+    `columns` must hold every store column with equal lengths; with a time
+    column the new bars must come after the stored ones.
+    """
+    if np is None:
+        raise RuntimeError('numpy is required for the price store')
+    path = Path(store_dir)
+    meta = _read_meta(path)
+    if set(columns) != set(meta['columns']):
+        raise ValueError(f"append needs exactly the store columns {meta['columns']}")
+    lengths = {len(col) for col in columns.values()}
+    if len(lengths) != 1:
+        raise ValueError('appended columns must have equal lengths')
+    new_rows = lengths.pop()
+    if new_rows == 0:
+        return meta
+    if 'time' in columns:
+        time = np.asarray(columns['time'], dtype=np.int64)
+        last = np.load(path / 'time.npy', mmap_mode='r')[-1:] if meta['rows'] else time[:0]
+        if np.any(np.diff(time) < 0) or (len(last) and time[0] <= last[0]):
+            raise ValueError('appended bars must be time-sorted and after the last stored bar')
+
+    for name, col in columns.items():
+        _write_rows(path / f'{name}.npy', col, meta['rows'])
+    meta['rows'] += new_rows
+    _write_meta(path, meta)
+
+    cached = path / RESAMPLED_DIR
+    if cached.is_dir():
+        for tf_dir in sorted(cached.iterdir()):
+            if tf_dir.name in TIMEFRAMES and is_store(str(tf_dir)):
+                resample_store(store_dir, tf_dir.name)
+    return meta
@@ -0,0 +1,301 @@
+"""Vectorized technical indicators shared by strategies, backtests and optimizers.
+
+Every indicator returns a read-only float array aligned with the input
+(NaN while the lookback is not yet filled). Results are memoised in a small
+LRU cache keyed by (series hash, indicator, params), so grid searches and
+walk-forward folds that ask for the same indicator reuse one computation.
+The cache is bounded by entry count and by the total bytes of the cached
+arrays (see set_cache_size), so long series do not grow it without limit.
+Pass `key=series_key(values)` when calling repeatedly on the same series to
+skip re-hashing it.
+"""
+import hashlib
+import math
+from collections import OrderedDict, deque
+from typing import Optional
+
+try:
+    import numpy as np
+except Exception:
+    np = None
+
+_CACHE = OrderedDict()
+_CACHE_SIZE = 256
+_CACHE_MAX_BYTES = 256 * 2 ** 20
+_cache_bytes = 0
+
+
+def _evict():
+    global _cache_bytes
+    while _CACHE and (len(_CACHE) > max(_CACHE_SIZE, 0) or _cache_bytes > _CACHE_MAX_BYTES):
+        _, value = _CACHE.popitem(last=False)
+        _cache_bytes -= value.nbytes
+
+
+def set_cache_size(size: Optional[int] = None, max_bytes: Optional[int] = None):
+    """Change the maximum number of cached indicator arrays and/or their total bytes (0 disables caching)."""
+    global _CACHE_SIZE, _CACHE_MAX_BYTES
+    if size is not None:
+        _CACHE_SIZE = int(size)
+    if max_bytes is not None:
+        _CACHE_MAX_BYTES = int(max_bytes)
+    _evict()
+
+
+def clear_cache():
+    global _cache_bytes
+    _CACHE.clear()
+    _cache_bytes = 0
+
+
+def cache_info() -> dict:
+    return {'size': len(_CACHE), 'max_size': _CACHE_SIZE, 'bytes': _cache_bytes, 'max_bytes': _CACHE_MAX_BYTES}
+
+
+def _as_array(values):
+    if np is None:
+        raise RuntimeError('numpy is required for src.bot.indicators')
+    return np.ascontiguousarray(values, dtype=float)
+
+
+def series_key(values) -> str:
+    """Content hash identifying a price series (used as the cache key)."""
+    arr = _as_array(values)
+    digest = hashlib.blake2b(arr.view(np.uint8), digest_size=16).hexdigest()
+    return f'{len(arr)}:{digest}'
+
+
+def prefix_keys(values, ends) -> list:
+    """series_key(values[:end]) for each end in `ends`, hashing the series once."""
+    arr = _as_array(values)
+    hasher = hashlib.blake2b(digest_size=16)
+    keys = {}
+    pos = 0
+    for end in sorted(set(ends)):
+        hasher.update(arr[pos:end].view(np.uint8))
+        pos = end
+        keys[end] = f'{end}:{hasher.hexdigest()}'
+    return [keys[end] for end in ends]
+
+
+def _cached(name: str, params: tuple, key: str, compute):
+    global _cache_bytes
+    if _CACHE_SIZE <= 0 or _CACHE_MAX_BYTES <= 0:
+        return compute()
+    cache_key = (key, name, params)
+    hit = _CACHE.get(cache_key)
+    if hit is not None:
+        _CACHE.move_to_end(cache_key)
+        return hit
+    value = compute()
+    value.setflags(write=False)
+    if value.nbytes > _CACHE_MAX_BYTES:
+        return value
+    _CACHE[cache_key] = value
+    _cache_bytes += value.nbytes
+    _evict()
+    return value
+
+
+def _smooth(x, alpha: float, start: float):
+    """Vectorized y[t] = (1 - alpha) * y[t-1] + alpha * x[t] with y[-1] = start.
+
+    Processed in blocks where the recursion is rewritten as a scaled
+    cumulative sum; the block length keeps the scale factor below 1e12 so
+    precision stays close to the sequential loop.
+    """
+    n = len(x)
+    out = np.empty(n)
+    if n == 0:
+        return out
+    decay = 1.0 - alpha
+    if decay <= 0.0:
+        out[:] = x
+        return out
+    block = n if decay == 1.0 else max(1, min(n, int(12 * math.log(10) / -math.log(decay))))
+    growth = decay ** -np.arange(1, block + 1)
+    prev = start
+    for i in range(0, n, block):
+        chunk = x[i:i + block]
+        g = growth[:len(chunk)]
+        ys = (prev + alpha * np.cumsum(chunk * g)) / g
+        out[i:i + block] = ys
+        prev = ys[-1]
+    return out
+
+
+def _cumsum(values, key):
+    arr = _as_array(values)
+    return _cached('cumsum', (), key, lambda: np.concatenate(([0.0], np.cumsum(arr))))
+
+
+def sma(values, window: int, key: str = None):
+    """Simple moving average."""
+    if window <= 0:
+        raise ValueError("window must be > 0")
+    arr = _as_array(values)
+    key = key or series_key(arr)
+
+    def compute():
+        cum = _cumsum(arr, key)
+        out = np.full(len(arr), np.nan)
+        if window <= len(arr):
+            out[window - 1:] = (cum[window:] - cum[:-window]) / window
+        return out
+    return _cached('sma', (window,), key, compute)
+
+
+def _wilder_like(values, period: int, alpha: float):
+    """Seed with the mean of the first `period` values, then smooth with `alpha`."""
+    out = np.full(len(values), np.nan)
+    if len(values) >= period:
+        seed = float(np.sum(values[:period])) / period
+        out[period - 1] = seed
+        out[period:] = _smooth(values[period:], alpha, seed)
+    return out
+
+
+def ema(values, period: int, key: str = None):
+    """Exponential moving average (alpha = 2 / (period + 1)) seeded with the first SMA."""
+    if period <= 0:
+        raise ValueError("period must be > 0")
+    arr = _as_array(values)
+    key = key or series_key(arr)
+    return _cached('ema', (period,), key, lambda: _wilder_like(arr, period, 2.0 / (period + 1)))
+
+
+def true_range(close, high=None, low=None):
+    """True range; the first bar uses its own close as the previous close."""
+    c = _as_array(close)
+    h = c if high is None else _as_array(high)
+    lo = c if low is None else _as_array(low)
+    prev = np.concatenate((c[:1], c[:-1]))
+    return np.maximum(h - lo, np.maximum(np.abs(h - prev), np.abs(lo - prev)))
+
+
+def atr(close, high=None, low=None, period: int = 14, method: str = 'sma', key: str = None):
+    """Average true range: 'sma' (rolling mean of TR) or 'wilder' (Wilder smoothing).
+
+    A given `key` must identify every series passed (close and any of high/low).
+    """
+    if method not in ('sma', 'wilder'):
+        raise ValueError(f"Unknown atr_method: {method}")
+    if period <= 0:
+        raise ValueError("period must be > 0")
+    c = _as_array(close)
+    if key is None:
+        key = series_key(c)
+        if high is not None:
+            key = f'{key}|h:{series_key(high)}'
+        if low is not None:
+            key = f'{key}|l:{series_key(low)}'
+
+    def compute():
+        tr = true_range(c, high, low)
+        if method == 'wilder':
+            return _wilder_like(tr, period, 1.0 / period)
+        cum = np.concatenate(([0.0], np.cumsum(tr)))
+        out = np.full(len(tr), np.nan)
+        if period <= len(tr):
+            out[period - 1:] = (cum[period:] - cum[:-period]) / period
+        return out
+    return _cached('atr', (period, method, high is not None, low is not None), key, compute)
+
+
+class ATRStream:
+    """Bar-by-bar ATR giving exactly the values of `atr()` on the full series.
+
+    The 'sma' method replays the sequential cumulative sum that `atr()` takes
+    differences of, and 'wilder' replays `_smooth` block by block, so a run
+    resumed from a saved stream matches a full recomputation bit for bit.
+    State is O(period) and picklable.
+    """
+
+    def __init__(self, period: int = 14, method: str = 'sma'):
+        if method not in ('sma', 'wilder'):
+            raise ValueError(f"Unknown atr_method: {method}")
+        if period <= 0:
+            raise ValueError("period must be > 0")
+        self.period = period
+        self.method = method
+        self.bars = 0
+        self.prev_close = None
+        self.value = None
+        if method == 'sma':
+            self._cum = deque([0.0], maxlen=period + 1)
+        else:
+            self._seed = []
+            alpha = 1.0 / period
+            decay = 1.0 - alpha
+            self._alpha = alpha
+            self._growth = None
+            if decay > 0.0:
+                block = max(1, int(12 * math.log(10) / -math.log(decay)))
+                self._growth = (decay ** -np.arange(1, block + 1)).tolist()
+            self._block_pos = 0
+            self._block_start = None
+            self._block_sum = 0.0
+
+    def extend(self, close, high=None, low=None) -> list:
+        """Add a run of bars; returns the ATR at each of them (None during the warm-up)."""
+        update = self.update
+        if high is None and low is None:
+            return [update(c) for c in close]
+        if high is None:
+            return [update(c, None, lo) for c, lo in zip(close, low)]
+        if low is None:
+            return [update(c, h) for c, h in zip(close, high)]
+        return [update(c, h, lo) for c, h, lo in zip(close, high, low)]
+
+    def update(self, close: float, high: float = None, low: float = None) -> Optional[float]:
+        """Add one bar; returns the ATR at that bar (None during the warm-up)."""
+        h = close if high is None else high
+        lo = close if low is None else low
+        prev = close if self.prev_close is None else self.prev_close
+        tr = max(h - lo, max(abs(h - prev), abs(lo - prev)))
+        self.prev_close = close
+        self.bars += 1
+        if self.method == 'sma':
+            self._cum.append(self._cum[-1] + tr)
+            if self.bars >= self.period:
+                self.value = (self._cum[-1] - self._cum[0]) / self.period
+        elif self.bars <= self.period:
+            self._seed.append(tr)
+            if self.bars == self.period:
+                self.value = float(np.sum(np.array(self._seed))) / self.period
+                self._seed = []
+        elif self._growth is None:
+            self.value = tr
+        else:
+            k = self._block_pos
+            if k == 0:
+                self._block_start = self.value
+                self._block_sum = 0.0
+            g = self._growth[k]
+            self._block_sum += tr * g
+            self.value = (self._block_start + self._alpha * self._block_sum) / g
+            self._block_pos = (k + 1) % len(self._growth)
+        return self.value
+
+
+def rsi(values, period: int = 14, key: str = None):
+    """Wilder RSI; the first value is at index `period`."""
+    if period <= 0:
+        raise ValueError("period must be > 0")
+    arr = _as_array(values)
+    key = key or series_key(arr)
+
+    def compute():
+        out = np.full(len(arr), np.nan)
+        if len(arr) <= period:
+            return out
+        delta = np.diff(arr)
+        gains = _wilder_like(np.where(delta > 0, delta, 0.0), period, 1.0 / period)[period - 1:]
+        losses = _wilder_like(np.where(delta < 0, -delta, 0.0), period, 1.0 / period)[period - 1:]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            rs = gains / losses
+            values_ = 100.0 - 100.0 / (1.0 + rs)
+        values_ = np.where(losses == 0, np.where(gains == 0, 50.0, 100.0), values_)
+        out[period:] = values_
+        return out
+    return _cached('rsi', (period,), key, compute)
@@ -0,0 +1,133 @@
+from array import array
+from typing import Dict, Iterator, List
+
+try:
+    import numpy as np
+except Exception:
+    np = None
+
+ENTRY = 0
+EXIT = 1
+
+_COLUMNS = ('kind', 'index', 'price', 'units', 'pnl', 'commission')
+
+
+class TradeLedger:
+    """Columnar record of backtest trades.
+
+    Each row is an entry or an exit; columns are kept in compact typed arrays
+    (`array` for incremental appends, or NumPy arrays when built from a
+    vectorized run). Entry rows carry NaN pnl; units are signed (negative
+    for short trades).
+
+    The ledger behaves like the former list of trade dicts: `len()`,
+    indexing and iteration yield dicts with the same keys, built lazily.
+    """
+
+    __slots__ = _COLUMNS
+
+    def __init__(self):
+        self.kind = array('b')
+        self.index = array('q')
+        self.price = array('d')
+        self.units = array('d')
+        self.pnl = array('d')
+        self.commission = array('d')
+
+    @classmethod
+    def from_round_trips(cls, entry_index, entry_price, units, entry_commission,
+                         exit_index, exit_price, pnl, exit_commission) -> 'TradeLedger':
+        """Build a ledger from aligned per-round-trip arrays (entry row, then exit row)."""
+        ledger = cls.__new__(cls)
+        n = len(entry_index)
+
+        def interleave(a, b, dtype):
+            out = np.empty(2 * n, dtype=dtype)
+            out[0::2] = a
+            out[1::2] = b
+            return out
+
+        ledger.kind = np.tile(np.array([ENTRY, EXIT], dtype=np.int8), n)
+        ledger.index = interleave(entry_index, exit_index, np.int64)
+        ledger.price = interleave(entry_price, exit_price, float)
+        ledger.units = interleave(units, units, float)
+        ledger.pnl = interleave(np.nan, pnl, float)
+        ledger.commission = interleave(entry_commission, exit_commission, float)
+        return ledger
+
+    def copy(self) -> 'TradeLedger':
+        ledger = TradeLedger.__new__(TradeLedger)
+        for name in _COLUMNS:
+            col = getattr(self, name)
+            setattr(ledger, name, array(col.typecode, col) if isinstance(col, array) else col.copy())
+        return ledger
+
+    def add_entry(self, index: int, price: float, units: float, commission: float):
+        self._append(ENTRY, index, price, units, float('nan'), commission)
+
+    def add_exit(self, index: int, price: float, units: float, pnl: float, commission: float):
+        self._append(EXIT, index, price, units, pnl, commission)
+
+    def _append(self, kind, index, price, units, pnl, commission):
+        self.kind.append(kind)
+        self.index.append(index)
+        self.price.append(price)
+        self.units.append(units)
+        self.pnl.append(pnl)
+        self.commission.append(commission)
+
+    def columns(self) -> Dict[str, 'np.ndarray']:
+        """Return every column as a NumPy array (zero-copy for `array` storage)."""
+        return {name: np.asarray(getattr(self, name)) for name in _COLUMNS}
+
+    @property
+    def entries(self) -> Dict[str, 'np.ndarray']:
+        """Columns restricted to entry rows."""
+        return self._select(ENTRY)
+
+    @property
+    def exits(self) -> Dict[str, 'np.ndarray']:
+        """Columns restricted to exit rows."""
+        return self._select(EXIT)
+
+    def _select(self, kind) -> Dict[str, 'np.ndarray']:
+        cols = self.columns()
+        mask = cols.pop('kind') == kind
+        return {name: col[mask] for name, col in cols.items()}
+
+    def exit_pnls(self) -> 'np.ndarray':
+        return self.exits['pnl']
+
+    def to_dicts(self) -> List[dict]:
+        return [self._row(i) for i in range(len(self))]
+
+    def _row(self, i: int) -> dict:
+        row = {
+            'type': 'entry' if self.kind[i] == ENTRY else 'exit',
+            'index': int(self.index[i]),
+            'price': float(self.price[i]),
+            'units': float(self.units[i]),
+        }
+        if self.kind[i] == EXIT:
+            row['pnl'] = float(self.pnl[i])
+        row['commission'] = float(self.commission[i])
+        return row
+
+    def __len__(self) -> int:
+        return len(self.kind)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self._row(j) for j in range(*i.indices(len(self)))]
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError('trade index out of range')
+        return self._row(i)
+
+    def __iter__(self) -> Iterator[dict]:
+        for i in range(len(self)):
+            yield self._row(i)
+
+    def __repr__(self) -> str:
+        return f'TradeLedger({len(self)} rows)'
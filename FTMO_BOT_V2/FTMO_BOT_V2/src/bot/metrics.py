@@ -0,0 +1,122 @@
+import copy
+import math
+from typing import Dict, Optional
+
+
+class MetricsAccumulator:
+    """Online backtest metrics updated once per bar (Welford-style).
+
+    Tracks the mean/variance of step returns, the variance of negative
+    returns (for Sortino), peak equity, max drawdown and trade win count
+    without keeping the equity curve in memory.
+
+    Usage:
+      acc = MetricsAccumulator(initial_equity=10000)
+      for equity in equities:
+          acc.update(equity)
+      acc.add_trade(pnl)
+      stats = acc.summary(annualization=252)
+    """
+
+    __slots__ = ('initial_equity', 'bars', 'last_equity', '_pending', 'peak', 'max_drawdown',
+                 'n', 'mean', 'm2', 'neg_n', 'neg_mean', 'neg_m2', 'exits', 'wins')
+
+    def __init__(self, initial_equity: float):
+        self.initial_equity = float(initial_equity)
+        self.bars = 0
+        self.last_equity = None
+        # equity of the previous bar while the latest return is still open to revision
+        self._pending = None
+        self.peak = self.initial_equity
+        self.max_drawdown = 0.0
+        self.n = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.neg_n = 0
+        self.neg_mean = 0.0
+        self.neg_m2 = 0.0
+        self.exits = 0
+        self.wins = 0
+
+    def update(self, equity: float):
+        """Record the equity at the close of a bar."""
+        self._commit()
+        self._pending = self.last_equity
+        self.last_equity = equity
+        self.bars += 1
+        self._mark(equity)
+
+    def add_trade(self, pnl: float):
+        """Record a closed trade's pnl."""
+        self.exits += 1
+        if pnl > 0:
+            self.wins += 1
+
+    def summary(self, annualization: int = 252, final_equity: Optional[float] = None) -> Dict:
+        """Return the metrics dict; `final_equity` revises the last bar (forced close).
+
+        The accumulator itself is left untouched so updates can continue.
+        """
+        acc = copy.copy(self)
+        if final_equity is not None:
+            acc.last_equity = final_equity
+            acc._mark(final_equity)
+        acc._commit()
+
+        ending = acc.last_equity if acc.last_equity is not None else acc.initial_equity
+        root = math.sqrt(annualization)
+        sharpe = None
+        sortino = None
+        ann_vol = None
+        if acc.n:
+            std = math.sqrt(acc.m2 / acc.n) if acc.n > 1 else 0.0
+            if std > 0:
+                sharpe = (acc.mean / std) * root
+            if acc.neg_n:
+                dd = math.sqrt(acc.neg_m2 / acc.neg_n)
+                if dd > 0:
+                    sortino = (acc.mean / dd) * root
+            ann_vol = std * root
+
+        cagr = None
+        if acc.bars > 0:
+            years = acc.bars / annualization
+            if years > 0:
+                try:
+                    cagr = (ending / acc.initial_equity) ** (1.0 / years) - 1.0
+                except Exception:
+                    cagr = None
+
+        return {
+            'total_return': (ending - acc.initial_equity) / acc.initial_equity,
+            'max_drawdown': acc.max_drawdown,
+            'sharpe': sharpe,
+            'sortino': sortino,
+            'cagr': cagr,
+            'annual_volatility': ann_vol,
+            'win_rate': acc.wins / acc.exits if acc.exits else None,
+            'n_trades': acc.exits,
+        }
+
+    def _mark(self, equity: float):
+        if equity > self.peak:
+            self.peak = equity
+        dd = (self.peak - equity) / self.peak if self.peak > 0 else 0.0
+        if dd > self.max_drawdown:
+            self.max_drawdown = dd
+
+    def _commit(self):
+        prev = self._pending
+        self._pending = None
+        if prev is None or prev == 0:
+            return
+        r = (self.last_equity - prev) / prev
+        self.n += 1
+        delta = r - self.mean
+        self.mean += delta / self.n
+        self.m2 += delta * (r - self.mean)
+        if r < 0:
+            self.neg_n += 1
+            delta = r - self.neg_mean
+            self.neg_mean += delta / self.neg_n
+            self.neg_m2 += delta * (r - self.neg_mean)
@@ -0,0 +1,196 @@
+"""Monte Carlo odds of passing an FTMO challenge from trade outcomes.
+
+Trade returns (net pnl as a fraction of the account) come from a backtest
+result (`trade_returns`) or a trade journal with a pnl column
+(`load_journal`). `simulate_challenge` resamples them into many trading
+paths, all paths of a batch at once as NumPy arrays, and reports how
+often and when each path reaches the profit target or breaches the daily
+or total loss limit.
+
+Usage:
+  res = Backtester(initial_capital=200000).run(prices, signals)
+  odds = simulate_challenge(trade_returns(res, 200000), n_paths=100_000, trades_per_day=2)
+  odds['pass_rate'], odds['breach_days']
+"""
+import csv
+from typing import Dict, Optional, Sequence, Union
+
+try:
+    import numpy as np
+except Exception:
+    np = None
+
+# FTMO limits, as in risk_engine.py, and the phase-1 profit target
+MAX_DAILY_LOSS_PCT = 0.05
+MAX_TOTAL_LOSS_PCT = 0.10
+PROFIT_TARGET_PCT = 0.10
+ACCOUNT_EQUITY_USD = 200000.0
+
+PERCENTILES = (5, 25, 50, 75, 95)
+
+
+def trade_returns(result: Dict, initial_capital: float) -> 'np.ndarray':
+    """Net return of each closed trade on the balance before it closed.
+
+    Accepts a Backtester/ResumableBacktest result or a PortfolioBacktester
+    result (per-symbol ledgers); trades are ordered by exit bar and net of
+    entry and exit commission.
+    """
+    if np is None:
+        raise RuntimeError('numpy is required for trade_returns')
+    ledgers = result['trades']
+    ledgers = list(ledgers.values()) if isinstance(ledgers, dict) else [ledgers]
+    exit_index, net = [], []
+    for ledger in ledgers:
+        entries, exits = ledger.entries, ledger.exits
+        if len(exits['index']) == 0:
+            continue
+        exit_index.append(exits['index'])
+        net.append(exits['pnl'] - exits['commission'] - entries['commission'][:len(exits['index'])])
+    if not net:
+        return np.empty(0)
+    order = np.argsort(np.concatenate(exit_index), kind='stable')
+    net = np.concatenate(net)[order]
+    balance = initial_capital + np.concatenate([[0.0], np.cumsum(net)[:-1]])
+    return net / balance
+
+
+def load_journal(path: str, pnl_column: str = 'pnl', time_column: str = 'ts',
+                 account_equity: float = ACCOUNT_EQUITY_USD) -> Dict[str, 'np.ndarray']:
+    """Read trade returns (pnl / account_equity) and trades per day from a journal CSV.
+
+    Rows whose pnl is empty or not a number are skipped. Returns
+    {'returns', 'trades_per_day'}, the latter counted per calendar date of
+    `time_column` (ISO timestamps) for use as `trades_per_day`.
+    """
+    if np is None:
+        raise RuntimeError('numpy is required for load_journal')
+    with open(path, newline='', encoding='utf-8') as f:
+        reader = csv.DictReader(f)
+        header = reader.fieldnames or []
+        if pnl_column not in header:
+            raise ValueError(f"{path} has no '{pnl_column}' column (columns: {', '.join(header)}); "
+                             f"log closed-trade pnl to simulate from it")
+        pnls, days = [], {}
+        for row in reader:
+            try:
+                pnl = float(row[pnl_column])
+            except (TypeError, ValueError):
+                continue
+            if pnl != pnl:
+                continue
+            pnls.append(pnl)
+            day = (row.get(time_column) or '')[:10]
+            days[day] = days.get(day, 0) + 1
+    return {
+        'returns': np.asarray(pnls, dtype=float) / account_equity,
+        'trades_per_day': np.asarray(list(days.values()), dtype=np.int64),
+    }
+
+
+def _resample(rng, returns, n_paths: int, length: int, block_size: int):
+    """Circular block bootstrap: (n_paths, length) draws in runs of `block_size` consecutive trades."""
+    n_blocks = -(-length // block_size)
+    starts = rng.integers(0, len(returns), size=(n_paths, n_blocks))
+    idx = (starts[:, :, None] + np.arange(block_size)) % len(returns)
+    return returns[idx.reshape(n_paths, -1)[:, :length]]
+
+
+def _first(mask):
+    """Index of the first True per row; the row length when there is none."""
+    return np.where(mask.any(axis=1), mask.argmax(axis=1), mask.shape[1])
+
+
+def simulate_challenge(returns: Sequence[float], n_paths: int = 10000, n_days: int = 30,
+                       trades_per_day: Union[int, Sequence[int]] = 1, block_size: int = 1,
+                       daily_loss: Optional[float] = MAX_DAILY_LOSS_PCT,
+                       total_loss: Optional[float] = MAX_TOTAL_LOSS_PCT,
+                       profit_target: Optional[float] = PROFIT_TARGET_PCT, compound: bool = True,
+                       seed: int = 0, batch_size: int = 20000) -> Dict:
+    """
+    Resample trade returns into `n_paths` challenges of `n_days` trading days.
+
+    Each day takes `trades_per_day` trades (an int, or a sequence of
+    observed daily counts sampled per day). Trades are drawn with
+    replacement in blocks of `block_size` consecutive trades, which keeps
+    streaks when block_size > 1. With `compound` the balance grows by
+    (1 + r) per trade, otherwise by r times the initial balance.
+
+    A path fails at the first trade that leaves the balance `daily_loss`
+    (of the initial balance) below the day's starting balance, or
+    `total_loss` below the initial balance; it passes at the first trade
+    reaching `profit_target`, and stops there. Limits are checked on
+    closed trades; None disables one.
+
+    Returns pass/fail/open rates, the split of failures by limit, and
+    'pass_days'/'breach_days' counts per day (index d = day d + 1) plus
+    percentiles of the return at which paths stopped.
+    """
+    if np is None:
+        raise RuntimeError('numpy is required for simulate_challenge')
+    returns = np.asarray(returns, dtype=float)
+    if len(returns) == 0:
+        raise ValueError("no trade returns to resample")
+    if block_size < 1 or n_days < 1:
+        raise ValueError("block_size and n_days must be >= 1")
+    counts_pool = None if np.ndim(trades_per_day) == 0 else np.asarray(trades_per_day, dtype=np.int64)
+    per_day = int(trades_per_day) if counts_pool is None else int(counts_pool.max())
+    if per_day < 1:
+        raise ValueError("trades_per_day must allow at least one trade")
+    length = n_days * per_day
+    slot = np.arange(per_day)
+    rng = np.random.default_rng(seed)
+
+    passed = failed_daily = failed_total = 0
+    pass_days = np.zeros(n_days, dtype=np.int64)
+    breach_days = np.zeros(n_days, dtype=np.int64)
+    final = []
+    for start in range(0, n_paths, batch_size):
+        n = min(batch_size, n_paths - start)
+        seq = _resample(rng, returns, n, length, block_size)
+        if counts_pool is not None:
+            # spread the sequence over days of sampled sizes; unused slots are no-trade zeros
+            counts = rng.choice(counts_pool, size=(n, n_days))
+            offsets = np.cumsum(counts, axis=1) - counts
+            taken = slot < counts[:, :, None]
+            idx = np.minimum(offsets[:, :, None] + slot, length - 1)
+            seq = np.where(taken, np.take_along_axis(seq, idx.reshape(n, -1), axis=1).reshape(n, n_days, per_day),
+                           0.0).reshape(n, length)
+
+        equity = np.cumprod(1.0 + seq, axis=1) if compound else 1.0 + np.cumsum(seq, axis=1)
+        by_day = equity.reshape(n, n_days, per_day)
+        day_start = np.empty((n, n_days))
+        day_start[:, 0] = 1.0
+        day_start[:, 1:] = by_day[:, :-1, -1]
+
+        never = np.zeros((n, length), dtype=bool)
+        daily = (by_day <= (day_start - daily_loss)[:, :, None]).reshape(n, length) if daily_loss is not None else never
+        total = equity <= 1.0 - total_loss if total_loss is not None else never
+        target = equity >= 1.0 + profit_target if profit_target is not None else never
+        first_daily, first_total, first_target = _first(daily), _first(total), _first(target)
+        first_fail = np.minimum(first_daily, first_total)
+
+        is_pass = first_target < first_fail
+        is_fail = first_fail < first_target
+        is_total = is_fail & (first_total <= first_daily)
+        passed += int(is_pass.sum())
+        failed_total += int(is_total.sum())
+        failed_daily += int((is_fail & ~is_total).sum())
+        pass_days += np.bincount(first_target[is_pass] // per_day, minlength=n_days)
+        breach_days += np.bincount(first_fail[is_fail] // per_day, minlength=n_days)
+        stop = np.minimum(np.minimum(first_fail, first_target), length - 1)
+        final.append(equity[np.arange(n), stop] - 1.0)
+
+    final = np.concatenate(final)
+    failed = failed_daily + failed_total
+    return {
+        'n_paths': n_paths,
+        'pass_rate': passed / n_paths,
+        'fail_rate': failed / n_paths,
+        'open_rate': (n_paths - passed - failed) / n_paths,
+        'daily_breach_rate': failed_daily / n_paths,
+        'total_breach_rate': failed_total / n_paths,
+        'pass_days': pass_days,
+        'breach_days': breach_days,
+        'final_return': {p: float(v) for p, v in zip(PERCENTILES, np.percentile(final, PERCENTILES))},
+    }
@@ -1,48 +1,446 @@
 import csv
+import inspect
 import itertools
-from typing import List, Tuple
+import os
+from concurrent.futures import Executor
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Optional, Tuple
 
 try:
-    import matplotlib.pyplot as plt
     import numpy as np
 except Exception:
-    plt = None
     np = None
 
-from src.bot.strategies import MovingAverageStrategy
+from src.bot import indicators
+from src.bot.cache import ResultCache, make_key, strategy_id
+from src.bot.strategies import MovingAverageStrategy, RSI_Strategy, MACD_Strategy
 from src.bot.backtest import Backtester
+from src.bot.metrics import MetricsAccumulator
+from src.bot.results import ResultTable, TopN, _rank_value, compact
+from src.bot.resultstore import ResultReader, ResultWriter
+
+
+# Data shared with pool workers. Set once per worker by the pool initializer
+# (inherited directly under fork) so tasks only carry their combo chunk.
+_WORKER_DATA = {}
+
+# combos evaluated per block when only the top-N results are kept in full
+TOP_N_BLOCK = 4096
+
+# result fields holding curves/trades with keep_curves and None without
+_CURVE_FIELDS = ('equity_curve', 'trades', 'returns', 'atr')
+
+
+def _init_worker(data: dict):
+    _WORKER_DATA.clear()
+    _WORKER_DATA.update(data)
+
+
+def _call_shared(func, combos, kwargs):
+    return func(_WORKER_DATA, combos, **kwargs)
+
+
+def _call_with_data(func, data, combos, kwargs):
+    return func(data, combos, **kwargs)
+
+
+def _scores(results: list, keep_curves: bool) -> list:
+    """Results of a keep_curves=False scoring pass, shaped like compact() full results
+    (no empty curve fields) when the top rows get rerun with curves."""
+    if not keep_curves:
+        return results
+    return [{key: value for key, value in res.items() if key not in _CURVE_FIELDS} for res in results]
+
+
+def _workers(n_jobs: Optional[int]) -> int:
+    if n_jobs == -1:
+        return os.cpu_count() or 1
+    return n_jobs or 1
+
+
+class _SharedPool:
+    """A process pool whose workers received `data` once through _init_worker.
+
+    Passed as the executor of every block of one blocked run (writer / top_n),
+    so the run starts its workers and ships its price data once, not per block.
+    `workers` is the pool size, used to chunk the combos.
+    """
+
+    def __init__(self, executor: Executor, data: dict, workers: int):
+        self.executor = executor
+        self.data = data
+        self.workers = workers
+
+
+@contextmanager
+def _block_executor(data: dict, n_jobs: Optional[int] = None, executor: Optional[Executor] = None):
+    """Executor shared by all blocks of a run: the caller's `executor` as is,
+    one _SharedPool holding `data` for n_jobs > 1, or None to run serially."""
+    workers = _workers(n_jobs)
+    if executor is not None or workers <= 1:
+        yield executor
+        return
+    # imported here: concurrent.futures.process (and multiprocessing) is only needed for a pool
+    from concurrent.futures import ProcessPoolExecutor
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(data,)) as pool:
+        yield _SharedPool(pool, data, workers)
+
+
+def _run_combos(func, data: dict, combos: list, kwargs: dict, n_jobs: Optional[int] = None,
+                executor: Optional[Executor] = None) -> list:
+    """Evaluate `func(data, combos_chunk, **kwargs)` serially or across workers.
+
+    Combos are split into contiguous chunks and results are concatenated in
+    submission order, so the output matches a serial run exactly.
+    A caller-supplied `executor` receives `data` with each chunk and is assumed
+    to have `n_jobs` workers (one per core when n_jobs is unset); a _SharedPool
+    already holds `data` and knows its size; otherwise a ProcessPoolExecutor
+    with `n_jobs` workers gets it once via its initializer.
+    """
+    workers = _workers(n_jobs)
+    if executor is None and workers <= 1:
+        return func(data, combos, **kwargs)
+
+    shared = False
+    if isinstance(executor, _SharedPool):
+        shared = executor.data is data
+        workers = executor.workers
+        executor = executor.executor
+    elif executor is not None:
+        workers = _workers(n_jobs or -1)
+    n_chunks = min(len(combos), workers * 4) or 1
+    size = -(-len(combos) // n_chunks)
+    chunks = [combos[i:i + size] for i in range(0, len(combos), size)]
+
+    if shared:
+        parts = executor.map(_call_shared, [func] * len(chunks), chunks, [kwargs] * len(chunks))
+        return [item for part in parts for item in part]
+    if executor is not None:
+        parts = executor.map(_call_with_data, [func] * len(chunks), [data] * len(chunks), chunks, [kwargs] * len(chunks))
+        return [item for part in parts for item in part]
+    with _block_executor(data, n_jobs) as pool:
+        return _run_combos(func, data, combos, kwargs, executor=pool)
+
+
+def _series_keys(data: dict) -> list:
+    """Content hashes of the price arrays a result depends on."""
+    return [None if data.get(name) is None else indicators.series_key(data[name]) for name in ('prices', 'highs', 'lows')]
+
+
+def _run_cached(cache: Optional[ResultCache], keys: List[str], func, data: dict, combos: list, kwargs: dict,
+                n_jobs: Optional[int] = None, executor: Optional[Executor] = None) -> list:
+    """_run_combos that serves the results stored under `keys` from `cache` and computes only the rest."""
+    if cache is None:
+        return _run_combos(func, data, combos, kwargs, n_jobs=n_jobs, executor=executor)
+    found = cache.get_many(keys)
+    missing = [i for i, key in enumerate(keys) if key not in found]
+    if missing:
+        computed = _run_combos(func, data, [combos[i] for i in missing], kwargs, n_jobs=n_jobs, executor=executor)
+        fresh = [(keys[i], res) for i, res in zip(missing, computed)]
+        cache.put_many(fresh)
+        found.update(fresh)
+    return [found[key] for key in keys]
+
+
+def _grid_chunk(data: dict, combos: list, initial_capital: float, commission: float, slippage: float,
+                risk_per_trade: float, leverage: float, position_sizing: str, keep_curves: bool = True) -> list:
+    prices = data['prices']
+    bt = Backtester(initial_capital=initial_capital, commission=commission, slippage=slippage)
+    results = []
+    for short, long in combos:
+        strat = MovingAverageStrategy(short_window=short, long_window=long)
+        signals = strat.generate_signals(prices)
+        res = bt.run(prices, signals, risk_per_trade=risk_per_trade, leverage=leverage, position_sizing=position_sizing,
+                     keep_curves=keep_curves)
+        results.append((short, long, res))
+    return results
 
 
 def grid_search_ma(prices: List[float], short_windows: List[int], long_windows: List[int],
                    initial_capital: float = 10000.0, commission: float = 0.0, slippage: float = 0.0,
-                   risk_per_trade: float = 0.01, leverage: float = 1.0, position_sizing: str = 'fixed') -> List[Tuple[int, int, dict]]:
+                   risk_per_trade: float = 0.01, leverage: float = 1.0, position_sizing: str = 'fixed',
+                   n_jobs: Optional[int] = None, executor: Optional[Executor] = None,
+                   keep_curves: bool = True, cache: Optional[ResultCache] = None,
+                   top_n: Optional[int] = None, sort_key: str = 'sharpe',
+                   keep_rest: bool = True) -> List[Tuple[int, int, dict]]:
     """
     Run grid search over combinations of short and long MA windows.
 
+    - n_jobs: number of worker processes (-1 = all cores, default serial)
+    - executor: optional concurrent.futures executor to use instead of a new process pool
+      (combos are chunked for n_jobs workers, or one per core when n_jobs is unset)
+    - keep_curves: set False to keep only scalar metrics per combo (no equity curves/trades)
+    - cache: optional ResultCache; combos already computed on identical prices/settings are not rerun
+    - top_n: keep full results only for the best top_n combos by sort_key (see optimize)
+
     Returns a list of tuples: (short, long, backtest_result)
     """
+    combos = [(s, l) for s, l in itertools.product(short_windows, long_windows) if s < l]
+    kwargs = dict(initial_capital=initial_capital, commission=commission, slippage=slippage,
+                  risk_per_trade=risk_per_trade, leverage=leverage, position_sizing=position_sizing,
+                  keep_curves=keep_curves)
+    data = {'prices': prices}
+    if cache is not None:
+        series = _series_keys(data)
+
+    def run(block, executor=executor, curves=keep_curves):
+        block_kwargs = dict(kwargs, keep_curves=curves)
+        keys = [make_key('grid_search_ma', series, combo, block_kwargs) for combo in block] if cache is not None else []
+        return _run_cached(cache, keys, _grid_chunk, data, block, block_kwargs, n_jobs=n_jobs, executor=executor)
+
+    if top_n is None:
+        return run(combos)
+
+    best = TopN(top_n, sort_key=sort_key, keep_rest=keep_rest)
+    with _block_executor(data, n_jobs, executor) as pool:
+        # blocks are scored without curves; only the final top_n are rerun with them
+        for start in range(0, len(combos), TOP_N_BLOCK):
+            block = combos[start:start + TOP_N_BLOCK]
+            best.extend(block, _scores([res for _, _, res in run(block, pool, curves=False)], keep_curves))
+        if keep_curves:
+            best.rerun(lambda block: [res for _, _, res in run(block, pool)])
+    return best.table(['short', 'long']).to_tuples()
+
+
+def _batched_grid(prices, strategy_cls, combos: list, initial_capital: float, commission: float, slippage: float,
+                  risk_per_trade: float, leverage: float, position_sizing: str, chunk_size: int,
+                  keep_curves: bool) -> list:
+    """Backtest `combos` of `strategy_cls.batch_signals` as 2-D signal columns, chunk by chunk.
+
+    Returns a list of (combo, result) in `combos` order.
+    """
+    if np is None:
+        raise RuntimeError('numpy is required for the batched grid search')
+    if not combos:
+        return []
+    key = indicators.series_key(prices)
+    bt = Backtester(initial_capital=initial_capital, commission=commission, slippage=slippage)
     results = []
+    for i in range(0, len(combos), chunk_size):
+        chunk = combos[i:i + chunk_size]
+        signals = strategy_cls.batch_signals(prices, chunk, key=key)
+        batch = bt.run_batch(prices, signals, risk_per_trade=risk_per_trade, leverage=leverage, position_sizing=position_sizing,
+                             keep_curves=keep_curves)
+        results.extend(zip(chunk, batch))
+    return results
+
+
+def grid_search_ma_batched(prices: List[float], short_windows: List[int], long_windows: List[int],
+                           initial_capital: float = 10000.0, commission: float = 0.0, slippage: float = 0.0,
+                           risk_per_trade: float = 0.01, leverage: float = 1.0, position_sizing: str = 'fixed',
+                           chunk_size: int = 64, keep_curves: bool = True) -> List[Tuple[int, int, dict]]:
+    """
+    Vectorized equivalent of grid_search_ma.
+
+    Every SMA window is computed once and the combos are simulated as columns
+    of a 2-D array, `chunk_size` columns at a time to bound memory.
+
+    Returns a list of tuples: (short, long, backtest_result) in grid_search_ma order
+    """
+    combos = [(s, l) for s, l in itertools.product(short_windows, long_windows) if s < l]
+    results = _batched_grid(prices, MovingAverageStrategy, combos, initial_capital, commission, slippage,
+                            risk_per_trade, leverage, position_sizing, chunk_size, keep_curves)
+    return [(s, l, res) for (s, l), res in results]
+
+
+def grid_search_rsi(prices: List[float], periods: List[int], lowers: List[float], uppers: List[float],
+                    initial_capital: float = 10000.0, commission: float = 0.0, slippage: float = 0.0,
+                    risk_per_trade: float = 0.01, leverage: float = 1.0, position_sizing: str = 'fixed',
+                    chunk_size: int = 64, keep_curves: bool = True) -> List[Tuple[int, float, float, dict]]:
+    """
+    Batched grid search over RSI_Strategy (period, lower, upper); combos with lower >= upper are skipped.
+
+    Returns a list of tuples: (period, lower, upper, backtest_result)
+    """
+    combos = [c for c in itertools.product(periods, lowers, uppers) if c[1] < c[2]]
+    results = _batched_grid(prices, RSI_Strategy, combos, initial_capital, commission, slippage,
+                            risk_per_trade, leverage, position_sizing, chunk_size, keep_curves)
+    return [(p, lo, up, res) for (p, lo, up), res in results]
+
+
+def grid_search_macd(prices: List[float], short_windows: List[int], long_windows: List[int], signal_windows: List[int],
+                     initial_capital: float = 10000.0, commission: float = 0.0, slippage: float = 0.0,
+                     risk_per_trade: float = 0.01, leverage: float = 1.0, position_sizing: str = 'fixed',
+                     chunk_size: int = 64, keep_curves: bool = True) -> List[Tuple[int, int, int, dict]]:
+    """
+    Batched grid search over MACD_Strategy (short, long, signal); combos with short >= long are skipped.
+
+    Returns a list of tuples: (short, long, signal, backtest_result)
+    """
+    combos = [c for c in itertools.product(short_windows, long_windows, signal_windows) if c[0] < c[1]]
+    results = _batched_grid(prices, MACD_Strategy, combos, initial_capital, commission, slippage,
+                            risk_per_trade, leverage, position_sizing, chunk_size, keep_curves)
+    return [(s, l, sig, res) for (s, l, sig), res in results]
+
+
+def _signal_builder(strategy_factory: Callable, param_names: List[str]) -> Callable:
+    """Return f(prices, combos, key) -> (n, len(combos)) signal matrix for a strategy factory.
+
+    Strategy classes whose constructor arguments are exactly `param_names`
+    use their vectorized `batch_signals`; any other factory is called once
+    per combo and its `generate_signals` output stacked as a column.
+    """
+    batch = getattr(strategy_factory, 'batch_signals', None)
+    if inspect.isclass(strategy_factory) and batch is not None:
+        init_params = list(inspect.signature(strategy_factory.__init__).parameters)[1:]
+        if init_params == list(param_names):
+            return lambda prices, combos, key: batch(prices, combos, key=key)
+
+    def build(prices, combos, key):
+        columns = [strategy_factory(**dict(zip(param_names, combo))).generate_signals(prices) for combo in combos]
+        return np.column_stack(columns).astype(np.int8)
+    return build
+
+
+def _param_combos(param_grid: Dict[str, list], constraint: Optional[Callable]) -> Tuple[List[str], list]:
+    names = list(param_grid)
+    combos = [c for c in itertools.product(*param_grid.values())
+              if constraint is None or constraint(**dict(zip(names, c)))]
+    return names, combos
+
+
+def _optimize_chunk(data: dict, combos: list, strategy_factory: Callable, param_names: List[str],
+                    initial_capital: float, commission: float, slippage: float, run_kwargs: dict,
+                    chunk_size: int, keep_curves: bool) -> list:
+    prices = data['prices']
+    key = indicators.series_key(prices)
+    build = _signal_builder(strategy_factory, param_names)
     bt = Backtester(initial_capital=initial_capital, commission=commission, slippage=slippage)
-    for short, long in itertools.product(short_windows, long_windows):
-        if short >= long:
-            continue
-        strat = MovingAverageStrategy(short_window=short, long_window=long)
-        signals = strat.generate_signals(prices)
-        res = bt.run(prices, signals, risk_per_trade=risk_per_trade, leverage=leverage, position_sizing=position_sizing)
-        results.append((short, long, res))
+    results = []
+    for i in range(0, len(combos), chunk_size):
+        chunk = combos[i:i + chunk_size]
+        results.extend(bt.run_batch(prices, build(prices, chunk, key), highs=data.get('highs'), lows=data.get('lows'),
+                                    keep_curves=keep_curves, **run_kwargs))
     return results
 
 
+def optimize(prices: List[float], strategy_factory: Callable, param_grid: Dict[str, list],
+             constraint: Optional[Callable] = None,
+             initial_capital: float = 10000.0, commission: float = 0.0, slippage: float = 0.0,
+             risk_per_trade: float = 0.01, leverage: float = 1.0, position_sizing: str = 'fixed',
+             highs: List[float] = None, lows: List[float] = None, period: int = 14, atr_method: str = 'sma',
+             chunk_size: int = 64, keep_curves: bool = True, allow_short: bool = False,
+             n_jobs: Optional[int] = None, executor: Optional[Executor] = None,
+             cache: Optional[ResultCache] = None, writer: Optional[ResultWriter] = None,
+             top_n: Optional[int] = None, sort_key: str = 'sharpe', keep_rest: bool = True):
+    """
+    Grid search over any strategy.
+
+    - strategy_factory: callable building a Strategy from keyword params (e.g. the class itself);
+      it must be picklable when n_jobs > 1
+    - param_grid: dict of parameter name -> candidate values; combos follow itertools.product order
+    - constraint: optional predicate on the params (e.g. lambda short_window, long_window: short_window < long_window)
+    - allow_short: treat -1 signals as short entries (see Backtester.run)
+    - cache: optional ResultCache keyed by price hash, strategy, params and backtest settings
+    - writer: optional ResultWriter; combos then run in blocks of writer.part_rows that are
+      written as they complete (all through one process pool with n_jobs), and the
+      ResultReader over the store is returned
+    - top_n: combos are scored without curves in blocks of TOP_N_BLOCK and only the best
+      top_n by sort_key are rerun for their full result (curves, trades); the others keep
+      their scalar metrics, or are dropped with keep_rest=False so memory no longer grows
+      with the grid
+
+    Combos are evaluated through the batched backtest (and the process pool when n_jobs/executor is given).
+    Returns a ResultTable with one row per combo.
+    """
+    if np is None:
+        raise RuntimeError('numpy is required for optimize')
+    names, combos = _param_combos(param_grid, constraint)
+    run_kwargs = dict(risk_per_trade=risk_per_trade, leverage=leverage, position_sizing=position_sizing,
+                      period=period, atr_method=atr_method)
+    # only set when enabled, so cache keys of long-only runs are unchanged
+    if allow_short:
+        run_kwargs['allow_short'] = True
+    kwargs = dict(strategy_factory=strategy_factory, param_names=names, initial_capital=initial_capital,
+                  commission=commission, slippage=slippage, run_kwargs=run_kwargs,
+                  chunk_size=chunk_size, keep_curves=keep_curves)
+    data = {'prices': prices, 'highs': highs, 'lows': lows}
+    if cache is not None:
+        series = _series_keys(data)
+        sid = strategy_id(strategy_factory)
+
+    def run(block, executor=executor, curves=keep_curves):
+        keys = []
+        if cache is not None:
+            settings = dict(initial_capital=initial_capital, commission=commission, slippage=slippage,
+                            keep_curves=curves, **run_kwargs)
+            keys = [make_key('optimize', series, sid, dict(zip(names, combo)), settings) for combo in block]
+        return _run_cached(cache, keys, _optimize_chunk, data, block, dict(kwargs, keep_curves=curves),
+                           n_jobs=n_jobs, executor=executor)
+
+    if writer is not None:
+        if top_n is not None:
+            raise ValueError("pass either writer or top_n")
+        with _block_executor(data, n_jobs, executor) as pool:
+            return _write_blocks(writer, names, combos, lambda block: run(block, pool))
+    if top_n is not None:
+        best = TopN(top_n, sort_key=sort_key, keep_rest=keep_rest)
+        with _block_executor(data, n_jobs, executor) as pool:
+            # blocks are scored without curves; only the final top_n are rerun with them
+            for start in range(0, len(combos), TOP_N_BLOCK):
+                block = combos[start:start + TOP_N_BLOCK]
+                best.extend(block, _scores(run(block, pool, curves=False), keep_curves))
+            if keep_curves:
+                best.rerun(lambda block: run(block, pool))
+        return best.table(names)
+    return ResultTable(names, combos, run(combos))
+
+
+def _write_blocks(writer: ResultWriter, names: List[str], combos: list, run: Callable) -> ResultReader:
+    """Evaluate combos in blocks of writer.part_rows, writing each block's results as it completes."""
+    for start in range(0, len(combos), writer.part_rows):
+        block = combos[start:start + writer.part_rows]
+        writer.write(names, block, run(block))
+    return writer.reader()
+
+
+def trade_stats(res: dict) -> dict:
+    """Aggregate closed-trade statistics straight from the result's TradeLedger columns.
+
+    Returns n_trades, wins, win_rate, total_pnl and total_commission. Results
+    produced with keep_curves=False carry no ledger; their counts come from the
+    engine's exit tally and the PnL totals are None.
+    """
+    ledger = res.get('trades')
+    if ledger is None:
+        n_trades = res.get('n_trades')
+        win_rate = res.get('win_rate')
+        wins = round(win_rate * n_trades) if win_rate is not None and n_trades is not None else None
+        return {'n_trades': n_trades, 'wins': wins, 'win_rate': win_rate, 'total_pnl': None, 'total_commission': None}
+    cols = ledger.columns()
+    exits = cols['kind'] == 1
+    pnl = cols['pnl'][exits]
+    n_trades = int(exits.sum())
+    wins = int((pnl > 0).sum())
+    return {
+        'n_trades': n_trades,
+        'wins': wins,
+        'win_rate': wins / n_trades if n_trades else None,
+        'total_pnl': float(pnl.sum()),
+        'total_commission': float(cols['commission'].sum()),
+    }
+
+
 def save_results_csv(results: List[Tuple[int, int, dict]], filename: str = 'grid_results.csv'):
+    if isinstance(results, (ResultTable, ResultReader)):
+        results.to_csv(filename)
+        return
     with open(filename, 'w', newline='') as f:
         writer = csv.writer(f)
-        writer.writerow(['short', 'long', 'total_return', 'sharpe', 'sortino', 'cagr', 'max_drawdown'])
+        # the trade columns follow the original seven so positional readers keep working
+        writer.writerow(['short', 'long', 'total_return', 'sharpe', 'sortino', 'cagr', 'max_drawdown', 'win_rate', 'n_trades', 'total_pnl'])
         for short, long, res in results:
-            writer.writerow([short, long, res.get('total_return'), res.get('sharpe'), res.get('sortino'), res.get('cagr'), res.get('max_drawdown')])
+            stats = trade_stats(res)
+            writer.writerow([short, long, res.get('total_return'), res.get('sharpe'), res.get('sortino'), res.get('cagr'), res.get('max_drawdown'),
+                             res.get('win_rate'), stats['n_trades'], stats['total_pnl']])
 
 
 def plot_heatmap(results: List[Tuple[int, int, dict]], filename: str = 'heatmap.png'):
-    """Plot heatmap of total_return over grid. Requires numpy & matplotlib."""
+    """Plot heatmap of total_return over grid. Requires numpy & matplotlib (imported on first use)."""
+    try:
+        import matplotlib.pyplot as plt
+    except Exception:
+        plt = None
     if plt is None or np is None:
         raise RuntimeError('matplotlib and numpy are required for plotting')
 
@@ -69,7 +467,13 @@ def plot_heatmap(results: List[Tuple[int, int, dict]], filename: str = 'heatmap.
 
 
 def get_top_results(results: List[Tuple[int, int, dict]], top_n: int = 10, sort_key: str = 'sharpe') -> List[Tuple[int, int, dict]]:
-    """Return top_n results sorted by sort_key (descending)."""
+    """Return top_n results sorted by sort_key (descending).
+
+    A ResultTable input returns a ResultTable; a ResultReader is ranked by a
+    scan of the sort column and also returns a ResultTable.
+    """
+    if isinstance(results, (ResultTable, ResultReader)):
+        return results.top(top_n, sort_key=sort_key)
     # flatten and sort
     flat = []
     for short, long, res in results:
@@ -85,6 +489,10 @@ def get_top_results(results: List[Tuple[int, int, dict]], top_n: int = 10, sort_
 
 
 def save_top_csv(top_results: List[Tuple[int, int, dict]], filename: str = 'top_results.csv'):
+    if isinstance(top_results, ResultTable):
+        columns = top_results.param_names + ['sharpe', 'cagr', 'total_return', 'max_drawdown']
+        top_results.to_csv(filename, columns=columns, rank=True)
+        return
     with open(filename, 'w', newline='') as f:
         writer = csv.writer(f)
         writer.writerow(['rank', 'short', 'long', 'sharpe', 'cagr', 'total_return', 'max_drawdown'])
@@ -92,40 +500,79 @@ def save_top_csv(top_results: List[Tuple[int, int, dict]], filename: str = 'top_
             writer.writerow([i, short, long, res.get('sharpe'), res.get('cagr'), res.get('total_return'), res.get('max_drawdown')])
 
 
-def walk_forward_evaluate(prices: List[float], short_windows: List[int], long_windows: List[int],
-                          train_size: int, test_size: int, step: int = None,
-                          position_sizing: str = 'fixed', highs: List[float] = None, lows: List[float] = None,
-                          period: int = 14, atr_method: str = 'sma') -> List[Tuple[int, int, dict]]:
-    """
-    Perform walk-forward (expanding window) evaluation for each MA combo.
-
-    - train_size: initial training window length
-    - test_size: rolling test window length
-    - step: how much to move forward each iteration (default = test_size)
-
-    Returns a list of (short, long, aggregated_metrics)
-    where aggregated_metrics contains averages across folds (avg_sharpe, avg_cagr, avg_total_return).
-    """
-    if step is None:
-        step = test_size
-
-    combos = [(s, l) for s in short_windows for l in long_windows if s < l]
-    # prepare metrics accumulator per combo
-    metrics_acc = {combo: {'sharpe': [], 'cagr': [], 'total_return': [], 'max_drawdown': []} for combo in combos}
-
-    start = 0
+def _walk_forward_folds(n: int, train_size: int, test_size: int, step: int) -> List[Tuple[int, int]]:
+    """Return the (test_start, test_end) bounds of every fold."""
+    folds = []
     end = train_size
-    while end + test_size <= len(prices):
-        train_prices = prices[start:end]
-        test_prices = prices[end:end + test_size]
+    while end + test_size <= n:
+        folds.append((end, end + test_size))
+        end += step
+    return folds
 
-        # evaluate each combo on this split, train on train_prices but using strategy with full history (we'll simulate by generating signals on concatenated series)
-        for s, l in combos:
-            # create strategy and signals using concatenated train+test to get proper indicators
-            from src.bot.strategies import MovingAverageStrategy
-            from src.bot.backtest import Backtester
 
-            combo_prices = train_prices + test_prices
+def _walk_forward_incremental_chunk(data: dict, combos: list, train_size: int, test_size: int, step: int,
+                                    position_sizing: str, period: int, atr_method: str,
+                                    chunk_size: int = 64, strategy_factory: Callable = MovingAverageStrategy,
+                                    param_names: Tuple[str, ...] = ('short_window', 'long_window'),
+                                    folds: Optional[List[Tuple[int, int]]] = None, allow_short: bool = False) -> list:
+    """Incremental variant of _walk_forward_chunk.
+
+    Every fold's window starts at bar 0 and the strategies only look back,
+    so each combo's signals are generated once over the full series and
+    sliced per fold; all combos of a fold are backtested together on views.
+    """
+    prices = np.asarray(data['prices'], dtype=float)
+    highs = data.get('highs')
+    lows = data.get('lows')
+    if highs is not None and lows is not None:
+        highs = np.asarray(highs, dtype=float)
+        lows = np.asarray(lows, dtype=float)
+    else:
+        highs = lows = None
+    if folds is None:
+        folds = _walk_forward_folds(len(prices), train_size, test_size, step)
+    key = indicators.series_key(prices)
+    build = _signal_builder(strategy_factory, list(param_names))
+    bt = Backtester(initial_capital=10000)
+
+    collected = []
+    for i in range(0, len(combos), chunk_size):
+        chunk = combos[i:i + chunk_size]
+        signals = build(prices, chunk, key)
+        accs = [{'sharpe': [], 'cagr': [], 'total_return': [], 'max_drawdown': []} for _ in chunk]
+        for a, b in folds:
+            fold = bt.run_batch(prices[a:b], signals[a:b],
+                                position_sizing=position_sizing,
+                                highs=highs[a:b] if highs is not None else None,
+                                lows=lows[a:b] if lows is not None else None,
+                                period=period, atr_method=atr_method, keep_curves=False, allow_short=allow_short)
+            for acc, res in zip(accs, fold):
+                for metric in acc:
+                    acc[metric].append(res.get(metric))
+        collected.extend(zip(chunk, accs))
+    return collected
+
+
+def _walk_forward_chunk(data: dict, combos: list, train_size: int, test_size: int, step: int,
+                        position_sizing: str, period: int, atr_method: str,
+                        folds: Optional[List[Tuple[int, int]]] = None) -> list:
+    """Collect per-fold metrics for each (short, long) combo in `combos` (all folds unless `folds` is given)."""
+    prices = data['prices']
+    highs = data.get('highs')
+    lows = data.get('lows')
+    if folds is None:
+        folds = _walk_forward_folds(len(prices), train_size, test_size, step)
+    collected = []
+    for s, l in combos:
+        acc = {'sharpe': [], 'cagr': [], 'total_return': [], 'max_drawdown': []}
+        start = 0
+        for end, _ in folds:
+            train_prices = prices[start:end]
+            test_prices = prices[end:end + test_size]
+
+            # create strategy and signals over the train+test window to get proper indicators
+            # (sliced rather than concatenated so NumPy arrays/memmaps work too)
+            combo_prices = prices[start:end + test_size]
             strat = MovingAverageStrategy(short_window=s, long_window=l)
             signals = strat.generate_signals(combo_prices)
 
@@ -143,37 +590,281 @@ def walk_forward_evaluate(prices: List[float], short_windows: List[int], long_wi
                 test_highs = combo_highs[len(train_prices):]
                 test_lows = combo_lows[len(train_prices):]
 
-            res = bt.run(test_prices, test_signals, position_sizing=position_sizing, highs=test_highs, lows=test_lows, period=period, atr_method=atr_method)
+            res = bt.run(test_prices, test_signals, position_sizing=position_sizing, highs=test_highs, lows=test_lows, period=period, atr_method=atr_method,
+                         keep_curves=False)
 
-            metrics_acc[(s, l)]['sharpe'].append(res.get('sharpe'))
-            metrics_acc[(s, l)]['cagr'].append(res.get('cagr'))
-            metrics_acc[(s, l)]['total_return'].append(res.get('total_return'))
-            metrics_acc[(s, l)]['max_drawdown'].append(res.get('max_drawdown'))
+            acc['sharpe'].append(res.get('sharpe'))
+            acc['cagr'].append(res.get('cagr'))
+            acc['total_return'].append(res.get('total_return'))
+            acc['max_drawdown'].append(res.get('max_drawdown'))
+        collected.append(((s, l), acc))
+    return collected
 
-        # move window
-        end += step
+
+def _walk_forward_cached(cache: Optional[ResultCache], chunk_func, data: dict, combos: list, kwargs: dict,
+                         key_parts: list, n_jobs: Optional[int] = None, executor: Optional[Executor] = None) -> list:
+    """Per-fold cached walk-forward: returns [(combo, per-fold metric lists)] like the chunk functions.
+
+    A fold of a combo only depends on the bars up to the fold end, so its
+    cache key hashes that prefix; appending bars leaves earlier folds cached
+    and only the new folds are backtested.
+    """
+    if cache is None:
+        return _run_combos(chunk_func, data, combos, kwargs, n_jobs=n_jobs, executor=executor)
+    folds = _walk_forward_folds(len(data['prices']), kwargs['train_size'], kwargs['test_size'], kwargs['step'])
+    ends = [b for _, b in folds]
+    prefixes = [indicators.prefix_keys(data[name], ends) if data.get(name) is not None else [None] * len(ends)
+                for name in ('prices', 'highs', 'lows')]
+    fold_series = list(zip(*prefixes))
+    keys = [[make_key('walk_forward', key_parts, combo, fold, series) for fold, series in zip(folds, fold_series)]
+            for combo in combos]
+    found = cache.get_many(key for row in keys for key in row)
+
+    # combos grouped by the folds they still need
+    pending = {}
+    for i, row in enumerate(keys):
+        missing = tuple(f for f, key in enumerate(row) if key not in found)
+        if missing:
+            pending.setdefault(missing, []).append(i)
+    for missing, idx in pending.items():
+        sub_kwargs = dict(kwargs, folds=[folds[f] for f in missing])
+        computed = _run_combos(chunk_func, data, [combos[i] for i in idx], sub_kwargs, n_jobs=n_jobs, executor=executor)
+        fresh = []
+        for i, (_, vals) in zip(idx, computed):
+            for j, f in enumerate(missing):
+                fresh.append((keys[i][f], {name: values[j] for name, values in vals.items()}))
+        cache.put_many(fresh)
+        found.update(fresh)
+
+    metrics = ('sharpe', 'cagr', 'total_return', 'max_drawdown')
+    return [(combo, {name: [found[key][name] for key in row] for name in metrics}) for combo, row in zip(combos, keys)]
+
+
+def walk_forward_evaluate(prices: List[float], short_windows: List[int], long_windows: List[int],
+                          train_size: int, test_size: int, step: int = None,
+                          position_sizing: str = 'fixed', highs: List[float] = None, lows: List[float] = None,
+                          period: int = 14, atr_method: str = 'sma',
+                          n_jobs: Optional[int] = None, executor: Optional[Executor] = None,
+                          incremental: bool = False, cache: Optional[ResultCache] = None,
+                          keep_folds: bool = False) -> List[Tuple[int, int, dict]]:
+    """
+    Perform walk-forward (expanding window) evaluation for each MA combo.
+
+    - train_size: initial training window length
+    - test_size: rolling test window length
+    - step: how much to move forward each iteration (default = test_size)
+    - n_jobs / executor: spread combos across worker processes (see grid_search_ma)
+    - incremental: generate each combo's signals once over the whole series and
+      evaluate every fold on array slices (requires numpy, much faster on long series)
+    - cache: optional ResultCache storing per-fold metrics; reruns only compute new folds/combos
+    - keep_folds: also return the per-fold metric lists under 'folds'
+
+    Returns a list of (short, long, aggregated_metrics)
+    where aggregated_metrics contains averages across folds (avg_sharpe, avg_cagr, avg_total_return).
+    Every combo is scored on the test windows only; walk_forward_optimize
+    selects the parameters on each train window instead.
+    """
+    if step is None:
+        step = test_size
+
+    combos = [(s, l) for s in short_windows for l in long_windows if s < l]
+    data = {'prices': prices, 'highs': highs, 'lows': lows}
+    kwargs = dict(train_size=train_size, test_size=test_size, step=step,
+                  position_sizing=position_sizing, period=period, atr_method=atr_method)
+    # metrics accumulator per combo
+    if incremental and np is None:
+        raise RuntimeError('numpy is required for incremental walk-forward')
+    chunk_func = _walk_forward_incremental_chunk if incremental else _walk_forward_chunk
+    key_parts = ['MovingAverageStrategy', chunk_func.__name__, position_sizing, period, atr_method]
+    metrics_acc = dict(_walk_forward_cached(cache, chunk_func, data, combos, kwargs, key_parts,
+                                            n_jobs=n_jobs, executor=executor))
 
     # aggregate metrics
     aggregated = []
-    for combo, vals in metrics_acc.items():
-        def avg(lst):
-            nums = [v for v in lst if v is not None]
-            return sum(nums) / len(nums) if nums else None
-
-        s, l = combo
-        aggregated_metrics = {
-            'avg_sharpe': avg(vals['sharpe']),
-            'avg_cagr': avg(vals['cagr']),
-            'avg_total_return': avg(vals['total_return']),
-            'avg_max_drawdown': avg(vals['max_drawdown'])
-        }
-        aggregated.append((s, l, aggregated_metrics))
+    for (s, l), vals in metrics_acc.items():
+        aggregated.append((s, l, _average_folds(vals, keep_folds)))
 
     return aggregated
 
 
+def _average_folds(vals: dict, keep_folds: bool = False) -> dict:
+    """Average per-fold metric lists into avg_* values (ignoring None); keep_folds adds the lists as 'folds'."""
+    def avg(lst):
+        nums = [v for v in lst if v is not None]
+        return sum(nums) / len(nums) if nums else None
+
+    averaged = {
+        'avg_sharpe': avg(vals['sharpe']),
+        'avg_cagr': avg(vals['cagr']),
+        'avg_total_return': avg(vals['total_return']),
+        'avg_max_drawdown': avg(vals['max_drawdown'])
+    }
+    if keep_folds:
+        averaged['folds'] = {name: list(values) for name, values in vals.items()}
+    return averaged
+
+
+def optimize_walk_forward(prices: List[float], strategy_factory: Callable, param_grid: Dict[str, list],
+                          train_size: int, test_size: int, step: int = None,
+                          constraint: Optional[Callable] = None,
+                          position_sizing: str = 'fixed', highs: List[float] = None, lows: List[float] = None,
+                          period: int = 14, atr_method: str = 'sma', chunk_size: int = 64,
+                          allow_short: bool = False,
+                          n_jobs: Optional[int] = None, executor: Optional[Executor] = None,
+                          cache: Optional[ResultCache] = None, keep_folds: bool = False,
+                          writer: Optional[ResultWriter] = None):
+    """
+    Walk-forward evaluation (see walk_forward_evaluate) over any strategy and parameter grid.
+
+    Signals are generated once per combo over the full series, so the strategy
+    must only use past bars. Returns a ResultTable with avg_sharpe, avg_cagr,
+    avg_total_return and avg_max_drawdown per combo (plus the per-fold lists
+    under 'folds' with keep_folds).
+
+    With a `writer` (ResultWriter), combos run in blocks of writer.part_rows
+    that are written, per-fold metrics included, as they complete (all
+    through one process pool with n_jobs); the ResultReader over the store
+    is returned instead.
+    """
+    if np is None:
+        raise RuntimeError('numpy is required for optimize_walk_forward')
+    if step is None:
+        step = test_size
+    names, combos = _param_combos(param_grid, constraint)
+    data = {'prices': prices, 'highs': highs, 'lows': lows}
+    kwargs = dict(train_size=train_size, test_size=test_size, step=step, position_sizing=position_sizing,
+                  period=period, atr_method=atr_method, chunk_size=chunk_size,
+                  strategy_factory=strategy_factory, param_names=tuple(names))
+    key_parts = [strategy_id(strategy_factory), names, position_sizing, period, atr_method]
+    if allow_short:
+        kwargs['allow_short'] = True
+        key_parts.append('allow_short')
+
+    def run(block, executor=executor):
+        collected = _walk_forward_cached(cache, _walk_forward_incremental_chunk, data, block, kwargs, key_parts,
+                                         n_jobs=n_jobs, executor=executor)
+        return [_average_folds(vals, keep_folds or writer is not None) for _, vals in collected]
+
+    if writer is None:
+        return ResultTable(names, combos, run(combos))
+    with _block_executor(data, n_jobs, executor) as pool:
+        return _write_blocks(writer, names, combos, lambda block: run(block, pool))
+
+
+def _train_scores_chunk(data: dict, combos: list, windows: List[Tuple[int, int]], sort_key: str,
+                        strategy_factory: Callable, param_names: List[str], initial_capital: float,
+                        commission: float, slippage: float, run_kwargs: dict, chunk_size: int) -> list:
+    """`sort_key` of each combo on each (start, end) train window; signals are built once over the series and sliced."""
+    prices = np.asarray(data['prices'], dtype=float)
+    highs, lows = data.get('highs'), data.get('lows')
+    key = indicators.series_key(prices)
+    build = _signal_builder(strategy_factory, param_names)
+    bt = Backtester(initial_capital=initial_capital, commission=commission, slippage=slippage)
+    scores = []
+    for i in range(0, len(combos), chunk_size):
+        chunk = combos[i:i + chunk_size]
+        signals = build(prices, chunk, key)
+        rows = [[] for _ in chunk]
+        for a, b in windows:
+            fold = bt.run_batch(prices[a:b], signals[a:b],
+                                highs=None if highs is None else highs[a:b],
+                                lows=None if lows is None else lows[a:b],
+                                keep_curves=False, **run_kwargs)
+            for row, res in zip(rows, fold):
+                row.append(_rank_value(res, sort_key))
+        scores.extend(rows)
+    return scores
+
+
+def walk_forward_optimize(prices: List[float], strategy_factory: Callable, param_grid: Dict[str, list],
+                          train_size: int, test_size: int, step: int = None, anchored: bool = True,
+                          sort_key: str = 'sharpe', constraint: Optional[Callable] = None,
+                          initial_capital: float = 10000.0, commission: float = 0.0, slippage: float = 0.0,
+                          risk_per_trade: float = 0.01, leverage: float = 1.0, position_sizing: str = 'fixed',
+                          highs: List[float] = None, lows: List[float] = None, period: int = 14,
+                          atr_method: str = 'sma', chunk_size: int = 64, allow_short: bool = False,
+                          annualization: int = 252,
+                          n_jobs: Optional[int] = None, executor: Optional[Executor] = None) -> Dict:
+    """
+    Walk-forward optimization: re-select the parameters on every fold.
+
+    Folds are laid out like walk_forward_evaluate (the first test window
+    starts at bar `train_size`, then every `step` bars). For each fold the
+    whole grid is backtested on the train window, batched like optimize
+    (and across workers with n_jobs/executor), and the combo with the best
+    `sort_key` (ties: grid order) is traded on the test window that follows.
+    - anchored=True: train on every bar before the test window (expanding)
+    - anchored=False: train on the last `train_size` bars only (rolling)
+    Signals are generated over the full series and sliced, so strategies
+    must only use past bars.
+
+    Test windows are traded one after another on the running balance,
+    starting flat and closing at the end of each; a window that overlaps
+    the next is cut at the next fold's start. Returns:
+    - 'folds': ResultTable with the combo chosen per fold, its train_score,
+      the window bounds and the test metrics
+    - 'equity_curve': the stitched out-of-sample equity (NumPy array)
+    - total_return, sharpe, sortino, cagr, max_drawdown, annual_volatility
+      and win_rate of the stitched curve
+    """
+    if np is None:
+        raise RuntimeError('numpy is required for walk_forward_optimize')
+    if step is None:
+        step = test_size
+    names, combos = _param_combos(param_grid, constraint)
+    if not combos:
+        raise ValueError("the parameter grid has no combos")
+    folds = _walk_forward_folds(len(prices), train_size, test_size, step)
+    if not folds:
+        raise ValueError(f"{len(prices)} bars do not fit a train window of {train_size} and a test window of {test_size}")
+    windows = [(0 if anchored else max(0, a - train_size), a) for a, _ in folds]
+    tests = [(a, min(b, folds[k + 1][0]) if k + 1 < len(folds) else b) for k, (a, b) in enumerate(folds)]
+
+    run_kwargs = dict(risk_per_trade=risk_per_trade, leverage=leverage, position_sizing=position_sizing,
+                      period=period, atr_method=atr_method)
+    if allow_short:
+        run_kwargs['allow_short'] = True
+    data = {'prices': prices, 'highs': highs, 'lows': lows}
+    kwargs = dict(windows=windows, sort_key=sort_key, strategy_factory=strategy_factory, param_names=names,
+                  initial_capital=initial_capital, commission=commission, slippage=slippage,
+                  run_kwargs=run_kwargs, chunk_size=chunk_size)
+    scores = np.array(_run_combos(_train_scores_chunk, data, combos, kwargs, n_jobs=n_jobs, executor=executor))
+    best = scores.argmax(axis=0)
+
+    p = np.asarray(prices, dtype=float)
+    build = _signal_builder(strategy_factory, names)
+    key = indicators.series_key(p)
+    acc = MetricsAccumulator(initial_capital)
+    balance = initial_capital
+    curves, chosen, rows = [], [], []
+    for (train_start, train_end), (a, b), k in zip(windows, tests, best):
+        combo = combos[k]
+        signals = build(p, [combo], key)[:, 0]
+        bt = Backtester(initial_capital=balance, commission=commission, slippage=slippage)
+        res = bt.run(p[a:b], signals[a:b], highs=None if highs is None else highs[a:b],
+                     lows=None if lows is None else lows[a:b], annualization=annualization, engine='numpy',
+                     **run_kwargs)
+        for equity in res['equity_curve']:
+            acc.update(float(equity))
+        for pnl in res['trades'].exits['pnl']:
+            acc.add_trade(float(pnl))
+        balance = float(res['equity_curve'][-1])
+        curves.append(res['equity_curve'])
+        score = float(scores[k, len(chosen)])
+        chosen.append(combo)
+        rows.append(dict(train_start=train_start, train_end=train_end, test_start=a, test_end=b,
+                         train_score=score if np.isfinite(score) else None,
+                         **{name: value for name, value in compact(res).items() if name != 'atr'}))
+
+    stats = acc.summary(annualization)
+    return dict(folds=ResultTable(names, chosen, rows), equity_curve=np.concatenate(curves), **stats)
+
+
 def save_walkforward_csv(aggregated_results: List[Tuple[int, int, dict]], filename: str = 'walkforward_results.csv'):
     """Save aggregated walk-forward results to CSV."""
+    if isinstance(aggregated_results, (ResultTable, ResultReader)):
+        aggregated_results.to_csv(filename)
+        return
     with open(filename, 'w', newline='') as f:
         writer = csv.writer(f)
         writer.writerow(['short', 'long', 'avg_sharpe', 'avg_cagr', 'avg_total_return', 'avg_max_drawdown'])
@@ -188,6 +879,12 @@ def save_walkforward_json(aggregated_results: List[Tuple[int, int, dict]], filen
     except Exception:
         raise
 
+    if isinstance(aggregated_results, ResultReader):
+        aggregated_results = aggregated_results.to_table()
+    if isinstance(aggregated_results, ResultTable):
+        aggregated_results.to_json(filename)
+        return
+
     payload = []
     for short, long, metrics in aggregated_results:
         entry = {'short': short, 'long': long}
@@ -200,6 +897,15 @@ def save_walkforward_json(aggregated_results: List[Tuple[int, int, dict]], filen
 
 def save_top_from_walkforward(aggregated_results: List[Tuple[int, int, dict]], top_n: int = 10, sort_key: str = 'avg_sharpe', filename: str = 'wf_top.csv'):
     """Select top-N combos from walk-forward aggregated results and save to CSV."""
+    if isinstance(aggregated_results, (ResultTable, ResultReader)):
+        top = aggregated_results.top(top_n, sort_key=sort_key)
+        with open(filename, 'w', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(['rank'] + top.param_names + [sort_key])
+            for i, (params, val) in enumerate(zip(top.params, top.sort_values(sort_key)), start=1):
+                writer.writerow([i] + list(params) + [val])
+        return
+
     flat = []
     for short, long, metrics in aggregated_results:
         val = metrics.get(sort_key)
@@ -0,0 +1,228 @@
+"""Multi-symbol backtest over one shared account.
+
+`PortfolioBacktester` steps N aligned price/signal columns together, the
+way the live trader runs its symbol whitelist against one FTMO account:
+at most `max_positions` trades are open at once, and equity drawdown caps
+flatten the book (daily) or stop trading for good (total). Each bar is
+processed as vector ops across symbols.
+
+Usage:
+  bt = PortfolioBacktester(initial_capital=200000, commission=0.0005)
+  res = bt.run({'EURUSD': eurusd, 'XAUUSD': xauusd}, {'EURUSD': sig1, 'XAUUSD': sig2}, days=dates)
+"""
+from typing import Dict, List, Optional, Sequence
+
+try:
+    import numpy as np
+except Exception:
+    np = None
+
+from src.bot.ledger import TradeLedger
+from src.bot.metrics import MetricsAccumulator
+
+# defaults of the live trader (scripts/FTMO_GPT_Trader_MAIN.py)
+MAX_SIMUL_TRADES = 2
+MAX_DAILY_DD_STOP = 0.042
+MAX_TOTAL_DD_STOP = 0.095
+
+
+def _forward_fill(values):
+    """Carry the last non-NaN value of each column forward (leading NaNs stay NaN)."""
+    idx = np.where(np.isnan(values), 0, np.arange(len(values))[:, None])
+    np.maximum.accumulate(idx, axis=0, out=idx)
+    return values[idx, np.arange(values.shape[1])]
+
+
+class PortfolioBacktester:
+    """Backtest several symbols against one equity pot with FTMO-style limits."""
+
+    def __init__(self, initial_capital: float = 10000.0, commission: float = 0.0, slippage: float = 0.0):
+        self.initial_capital = float(initial_capital)
+        self.commission = commission
+        self.slippage = slippage
+
+    def run(self,
+            prices: Dict[str, Sequence[float]],
+            signals: Dict[str, Sequence[int]],
+            days: Optional[Sequence] = None,
+            risk_per_trade: float = 0.01,
+            leverage: float = 1.0,
+            max_positions: Optional[int] = MAX_SIMUL_TRADES,
+            max_daily_loss: Optional[float] = MAX_DAILY_DD_STOP,
+            max_total_loss: Optional[float] = MAX_TOTAL_DD_STOP,
+            allow_short: bool = False,
+            annualization: int = 252,
+            keep_curves: bool = True) -> Dict:
+        """
+        Run aligned per-symbol signals against one account.
+
+        prices/signals map symbol -> equal-length series (bar i is the same
+        time for every symbol; NaN marks a bar where the symbol does not
+        trade). Signals follow Backtester.run: 1 long, 0 flat, -1 short with
+        allow_short, anything else holds. Dict order is the priority when
+        more symbols want to enter than `max_positions` allows; an entry
+        refused for lack of a slot waits for the symbol's signal to change.
+
+        Entries are sized like Backtester's fixed sizing on the realized
+        balance; the equity curve and the limits use marked-to-market
+        equity. Drawdown limits are fractions of initial_capital, checked on
+        closes after signal exits:
+        - `max_daily_loss`: equity below the day's opening equity by this much
+          closes every position and blocks entries until the next day.
+        - `max_total_loss`: equity below initial_capital by this much closes
+          every position and stops trading for the rest of the run.
+        `days` gives each bar's trading-day key (e.g. its date); without it
+        every bar is its own day. None disables a limit.
+
+        Returns the Backtester metrics of the portfolio equity curve plus
+        'symbols', per-symbol 'trades' ledgers and 'symbol_pnl',
+        'daily_breaches' (bar indices), 'halted_at' (bar index or None) and
+        'skipped_entries' (entries refused by the position cap).
+        """
+        if np is None:
+            raise RuntimeError('numpy is required for PortfolioBacktester')
+        symbols = list(prices)
+        if not symbols:
+            raise ValueError("no symbols given")
+        if set(signals) != set(symbols):
+            raise ValueError("prices and signals must have the same symbols")
+        p = np.column_stack([np.asarray(prices[s], dtype=float) for s in symbols])
+        sig = np.column_stack([np.asarray(signals[s]) for s in symbols])
+        n, n_sym = p.shape
+        if sig.shape[0] != n or (days is not None and len(days) != n):
+            raise ValueError("prices, signals and days must be aligned (same length)")
+        if n == 0:
+            raise ValueError("no bars given")
+        tradable = ~np.isnan(p)
+        # marking prices; 0 before a symbol's first price, where it cannot be held
+        mark = np.nan_to_num(_forward_fill(p))
+        # signal that opens a short; without allow_short it falls back to 1 (long)
+        short_signal = -1 if allow_short else 1
+        events = (sig == 0) | (sig == 1) | (sig == short_signal)
+        rows = np.arange(n)[:, None]
+        cols = np.arange(n_sym)
+        # position asked for by the latest signal ...
+        last_event = np.maximum.accumulate(np.where(events, rows, -1), axis=0)
+        wanted = np.where(last_event >= 0, sig[np.maximum(last_event, 0), cols], 0).astype(np.int8)
+        # ... and the one already acted on at the previous tradable bar
+        last_bar = np.full((n, n_sym), -1)
+        last_bar[1:] = np.maximum.accumulate(np.where(tradable, rows, -1), axis=0)[:-1]
+        acted = np.where(last_bar >= 0, wanted[np.maximum(last_bar, 0), cols], 0)
+        fresh = (wanted != 0) & (wanted != acted) & tradable
+        new_day = np.ones(n, dtype=bool)
+        if days is not None:
+            day = np.asarray(days)
+            new_day[1:] = day[1:] != day[:-1]
+
+        initial = self.initial_capital
+        slippage = self.slippage
+        commission = self.commission
+        daily_limit = None if max_daily_loss is None else max_daily_loss * initial
+        total_floor = None if max_total_loss is None else initial * (1.0 - max_total_loss)
+        slots = n_sym if max_positions is None else max_positions
+
+        balance = initial
+        position = np.zeros(n_sym, dtype=np.int8)
+        entry_price = np.zeros(n_sym)
+        units = np.zeros(n_sym)
+        trades = [TradeLedger() for _ in symbols]
+        symbol_pnl = np.zeros(n_sym)
+        acc = MetricsAccumulator(initial)
+        equity_curve = [] if keep_curves else None
+        equity = initial
+        day_start = initial
+        blocked = False
+        halted_at = None
+        daily_breaches: List[int] = []
+        skipped = 0
+
+        def close(i, which, fill):
+            nonlocal balance
+            for k in which:
+                side = int(position[k])
+                exit_price = fill[k] * (1 - side * slippage)
+                pnl = (exit_price - entry_price[k]) * units[k] * leverage
+                cost = side * units[k] * exit_price * commission
+                balance += pnl - cost
+                symbol_pnl[k] += pnl - cost
+                acc.add_trade(pnl)
+                trades[k].add_exit(i, exit_price, units[k], pnl, cost)
+            position[which] = 0
+            units[which] = 0.0
+
+        for i in range(n):
+            if new_day[i]:
+                day_start = equity
+                blocked = halted_at is not None
+            if halted_at is None:
+                row = p[i]
+                target = wanted[i]
+                if position.any():
+                    # signal exits and reversals
+                    close(i, np.flatnonzero((position != 0) & (target != position) & tradable[i]), row)
+                    equity = balance + float(np.dot(units, mark[i] - entry_price)) * leverage
+                    breach_total = total_floor is not None and equity <= total_floor
+                    breach_day = daily_limit is not None and not blocked and day_start - equity >= daily_limit
+                    if breach_total or breach_day:
+                        close(i, np.flatnonzero(position != 0), mark[i])
+                        equity = balance
+                        blocked = True
+                        if breach_total:
+                            halted_at = i
+                        else:
+                            daily_breaches.append(i)
+                else:
+                    equity = balance
+
+                wants = fresh[i] & (position == 0)
+                if wants.any():
+                    candidates = np.flatnonzero(wants)
+                    chosen = candidates[:max(slots - int(np.count_nonzero(position)), 0)] if not blocked else []
+                    skipped += len(candidates) - len(chosen)
+                    for k in chosen:
+                        side = int(target[k])
+                        size = balance * risk_per_trade * leverage / row[k] if row[k] > 0 else 0.0
+                        fill = row[k] * (1 + side * slippage)
+                        entry_units = side * size
+                        cost = side * entry_units * fill * commission
+                        balance -= cost
+                        equity -= cost
+                        symbol_pnl[k] -= cost
+                        position[k] = side
+                        entry_price[k] = fill
+                        units[k] = entry_units
+                        trades[k].add_entry(i, fill, entry_units, cost)
+            if equity_curve is not None:
+                equity_curve.append(equity)
+            acc.update(equity)
+
+        # close what is still open at the last known prices
+        final_equity = None
+        if position.any():
+            close(n - 1, np.flatnonzero(position != 0), mark[-1])
+            final_equity = equity = balance
+            if equity_curve is not None:
+                equity_curve[-1] = equity
+
+        stats = acc.summary(annualization, final_equity=final_equity)
+        returns = None
+        if equity_curve is not None:
+            curve = np.asarray(equity_curve)
+            returns = (np.diff(curve) / curve[:-1]).tolist()
+        return {
+            'symbols': symbols,
+            'equity_curve': equity_curve,
+            'trades': dict(zip(symbols, trades)),
+            'symbol_pnl': dict(zip(symbols, symbol_pnl.tolist())),
+            'total_return': stats['total_return'],
+            'max_drawdown': stats['max_drawdown'],
+            'returns': returns,
+            'sharpe': stats['sharpe'],
+            'sortino': stats['sortino'],
+            'cagr': stats['cagr'],
+            'annual_volatility': stats['annual_volatility'],
+            'win_rate': stats['win_rate'],
+            'daily_breaches': daily_breaches,
+            'halted_at': halted_at,
+            'skipped_entries': skipped,
+        }
@@ -0,0 +1,189 @@
+import csv
+import heapq
+import json
+import math
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+
+def _is_metric(value) -> bool:
+    return value is None or (isinstance(value, (int, float)) and not isinstance(value, bool))
+
+
+def _sort_value(value) -> float:
+    if value is None or (isinstance(value, float) and math.isnan(value)):
+        return float('-inf')
+    return value
+
+
+def _rank_value(res: dict, sort_key: str) -> float:
+    """Ranking value of one result: `sort_key`, falling back to the total return when missing."""
+    value = res.get(sort_key)
+    if value is None:
+        fallback = 'total_return' if 'total_return' in res else 'avg_total_return'
+        value = res.get(fallback, float('-inf'))
+    return _sort_value(value)
+
+
+def compact(res: dict) -> dict:
+    """The scalar metrics of a result dict (drops equity curves, returns and trade ledgers)."""
+    return {key: value for key, value in res.items() if _is_metric(value)}
+
+
+class ResultTable:
+    """Optimizer results as a table: one row per parameter combination.
+
+    Columns are the parameter names followed by the scalar metrics found in
+    the result dicts (total_return, sharpe, ... or avg_* for walk-forward).
+    The full result dicts stay available in `results`.
+
+    Usage:
+      table = optimize(prices, MovingAverageStrategy, {'short_window': [3, 5], 'long_window': [20, 30]})
+      table.top(5, sort_key='sharpe').to_csv('top5.csv', rank=True)
+    """
+
+    def __init__(self, param_names: Sequence[str], params: Sequence[Sequence], results: Sequence[dict]):
+        if len(params) != len(results):
+            raise ValueError("params and results must have the same length")
+        self.param_names = list(param_names)
+        self.params = [tuple(p) for p in params]
+        self.results = list(results)
+        metric_names = []
+        for res in self.results:
+            for key, value in res.items():
+                if key not in metric_names and _is_metric(value):
+                    metric_names.append(key)
+        self.metric_names = metric_names
+
+    @property
+    def columns(self) -> List[str]:
+        return self.param_names + self.metric_names
+
+    def column(self, name: str) -> list:
+        if name in self.param_names:
+            i = self.param_names.index(name)
+            return [p[i] for p in self.params]
+        return [res.get(name) for res in self.results]
+
+    def row(self, i: int) -> Dict:
+        row = dict(zip(self.param_names, self.params[i]))
+        row.update((name, self.results[i].get(name)) for name in self.metric_names)
+        return row
+
+    def rows(self) -> List[Dict]:
+        return [self.row(i) for i in range(len(self))]
+
+    def __len__(self) -> int:
+        return len(self.params)
+
+    def __iter__(self) -> Iterator[Dict]:
+        for i in range(len(self)):
+            yield self.row(i)
+
+    def __repr__(self) -> str:
+        return f"ResultTable({len(self)} rows, columns={self.columns})"
+
+    def _fallback_key(self) -> str:
+        return 'total_return' if 'total_return' in self.metric_names else 'avg_total_return'
+
+    def sort_values(self, sort_key: str) -> List[float]:
+        """Values used for ranking: `sort_key`, falling back to the total return when missing."""
+        fallback = self._fallback_key()
+        values = []
+        for res in self.results:
+            value = res.get(sort_key)
+            if value is None:
+                value = res.get(fallback, float('-inf'))
+            values.append(_sort_value(value))
+        return values
+
+    def sorted_indices(self, sort_key: str = 'sharpe', descending: bool = True) -> List[int]:
+        values = self.sort_values(sort_key)
+        return sorted(range(len(self)), key=lambda i: values[i], reverse=descending)
+
+    def sorted(self, sort_key: str = 'sharpe', descending: bool = True) -> 'ResultTable':
+        return self.take(self.sorted_indices(sort_key, descending))
+
+    def top(self, n: int = 10, sort_key: str = 'sharpe') -> 'ResultTable':
+        return self.take(self.sorted_indices(sort_key)[:n])
+
+    def take(self, indices: Sequence[int]) -> 'ResultTable':
+        table = ResultTable.__new__(ResultTable)
+        table.param_names = list(self.param_names)
+        table.params = [self.params[i] for i in indices]
+        table.results = [self.results[i] for i in indices]
+        table.metric_names = list(self.metric_names)
+        return table
+
+    def to_tuples(self) -> List[Tuple]:
+        """Rows as (*params, result) tuples, the shape returned by grid_search_ma."""
+        return [tuple(p) + (res,) for p, res in zip(self.params, self.results)]
+
+    def to_csv(self, filename: str, columns: Optional[List[str]] = None, rank: bool = False):
+        columns = columns or self.columns
+        with open(filename, 'w', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow((['rank'] if rank else []) + columns)
+            for i, row in enumerate(self, start=1):
+                writer.writerow(([i] if rank else []) + [row.get(c) for c in columns])
+
+    def to_json(self, filename: str):
+        with open(filename, 'w') as f:
+            json.dump(self.rows(), f, indent=2)
+
+
+class TopN:
+    """Keep the `n` best results by `sort_key` as combos finish.
+
+    Results pushed out of (or never entering) the top are reduced to their
+    scalar metrics with `keep_rest`, or dropped without it, so only `n`
+    full result dicts (equity curves, trades) are held at a time. Ranking
+    matches ResultTable.top: missing values fall back to the total return,
+    ties keep push order.
+
+    Usage:
+      best = TopN(10, sort_key='sharpe')
+      for params, res in finished:
+          best.push(params, res)
+      best.table(param_names).top(10)
+    """
+
+    def __init__(self, n: int, sort_key: str = 'sharpe', keep_rest: bool = True):
+        if n < 1:
+            raise ValueError("n must be >= 1")
+        self.n = n
+        self.sort_key = sort_key
+        self.keep_rest = keep_rest
+        self._heap: List[Tuple] = []
+        self._rest: List[Tuple] = []
+        self._count = 0
+
+    def __len__(self) -> int:
+        return self._count
+
+    def push(self, params: Sequence, res: dict):
+        # min-heap on (value, -order): the root is the worst kept result, the latest among ties
+        item = (_rank_value(res, self.sort_key), -self._count, tuple(params), res)
+        self._count += 1
+        if len(self._heap) < self.n:
+            heapq.heappush(self._heap, item)
+            return
+        if item[:2] > self._heap[0][:2]:
+            item = heapq.heapreplace(self._heap, item)
+        if self.keep_rest:
+            self._rest.append((-item[1], item[2], compact(item[3])))
+
+    def extend(self, params: Sequence[Sequence], results: Sequence[dict]):
+        for p, res in zip(params, results):
+            self.push(p, res)
+
+    def rerun(self, run: Callable[[List[tuple]], List[dict]]):
+        """Replace the current top `n` results by `run(params)`, e.g. to add the
+        curves and trades of combos that were scored without them. Ranks are kept."""
+        results = run([item[2] for item in self._heap])
+        # same (value, order) at the same positions, so the heap stays valid
+        self._heap = [item[:3] + (res,) for item, res in zip(self._heap, results)]
+
+    def table(self, param_names: Sequence[str]) -> ResultTable:
+        """Every kept row in push order: the top `n` with full results, the rest compact."""
+        rows = sorted([(-order, p, res) for _, order, p, res in self._heap] + self._rest, key=lambda row: row[0])
+        return ResultTable(param_names, [row[1] for row in rows], [row[2] for row in rows])
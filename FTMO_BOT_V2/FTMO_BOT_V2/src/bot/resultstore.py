@@ -0,0 +1,282 @@
+"""Columnar on-disk store for optimizer results.
+
+Results are written in parts as they complete; each part is an
+uncompressed `.npz` holding one array per column, so a reader loads only
+the columns it scans. A store directory holds:
+  schema.json       {"param_names": [...], "metric_names": [...], "parts": [...], "rows": N, ...}
+  part-00000.npz    param__<name>, metric__<name> (float64, NaN = missing),
+                    fold__<metric> (rows x folds, walk-forward with keep_folds),
+                    curve (rows x curve_points float32, equity curves downsampled)
+
+schema.json is rewritten after every part, so a store can be read while a
+run is still writing it.
+
+Usage:
+  with ResultWriter('outputs/grid_store', curve_points=200) as writer:
+      optimize(prices, MovingAverageStrategy, grid, writer=writer)
+  reader = ResultReader('outputs/grid_store')
+  reader.top(10, sort_key='sharpe').to_csv('top10.csv', rank=True)
+"""
+import csv
+import json
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+try:
+    import numpy as np
+except Exception:
+    np = None
+
+from src.bot.results import ResultTable, _is_metric
+
+SCHEMA_FILE = 'schema.json'
+PARAM, METRIC, FOLD, CURVE = 'param__', 'metric__', 'fold__', 'curve'
+
+
+def _downsample(curve, points: int):
+    """`points` evenly spaced samples of a curve, first and last included."""
+    curve = np.asarray(curve, dtype=float)
+    if len(curve) == 0:
+        return np.full(points, np.nan)
+    return curve[np.linspace(0, len(curve) - 1, points).round().astype(np.int64)]
+
+
+def _as_float(values):
+    return np.array([np.nan if v is None else v for v in values], dtype=float)
+
+
+def _ragged(rows: List[list], width: int):
+    out = np.full((len(rows), width), np.nan)
+    for i, row in enumerate(rows):
+        out[i, :len(row)] = _as_float(row)
+    return out
+
+
+class ResultWriter:
+    """Append optimizer results to a columnar store, one part per `part_rows` rows."""
+
+    def __init__(self, path: str, curve_points: int = 0, part_rows: int = 4096):
+        if np is None:
+            raise RuntimeError('numpy is required for ResultWriter')
+        self.path = Path(path)
+        self.path.mkdir(parents=True, exist_ok=True)
+        for old in self.path.glob('part-*.npz'):
+            old.unlink()
+        self.curve_points = int(curve_points)
+        self.part_rows = int(part_rows)
+        self.param_names: Optional[List[str]] = None
+        self.metric_names: List[str] = []
+        self.fold_names: List[str] = []
+        self.parts: List[Dict] = []
+        self.rows = 0
+        self._params: List[tuple] = []
+        self._results: List[dict] = []
+        self._write_schema()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def write(self, param_names: Sequence[str], params: Sequence[Sequence], results: Sequence[dict]):
+        """Buffer rows and write every full part."""
+        if self.param_names is None:
+            self.param_names = list(param_names)
+        elif list(param_names) != self.param_names:
+            raise ValueError(f'parameter names {list(param_names)} differ from {self.param_names}')
+        self._params.extend(tuple(p) for p in params)
+        self._results.extend(results)
+        while len(self._params) >= self.part_rows:
+            self._write_part(self.part_rows)
+
+    def write_table(self, results, param_names: Sequence[str] = ('short', 'long')):
+        """Write a ResultTable or a list of (*params, result) tuples (e.g. from grid_search_ma)."""
+        if isinstance(results, ResultTable):
+            self.write(results.param_names, results.params, results.results)
+        else:
+            self.write(param_names, [row[:-1] for row in results], [row[-1] for row in results])
+
+    def flush(self):
+        if self._params:
+            self._write_part(len(self._params))
+
+    def close(self):
+        self.flush()
+
+    def reader(self) -> 'ResultReader':
+        self.flush()
+        return ResultReader(self.path)
+
+    def _write_part(self, n: int):
+        params, self._params = self._params[:n], self._params[n:]
+        results, self._results = self._results[:n], self._results[n:]
+        arrays = {}
+        for i, name in enumerate(self.param_names):
+            col = np.asarray([p[i] for p in params])
+            arrays[PARAM + name] = col.astype(str) if col.dtype == object else col
+        for res in results:
+            for key, value in res.items():
+                if key not in self.metric_names and _is_metric(value):
+                    self.metric_names.append(key)
+        for name in self.metric_names:
+            arrays[METRIC + name] = _as_float(res.get(name) for res in results)
+        folds = [res.get('folds') or {} for res in results]
+        for fold in folds:
+            self.fold_names.extend(name for name in fold if name not in self.fold_names)
+        for name in self.fold_names:
+            rows = [fold.get(name, []) for fold in folds]
+            arrays[FOLD + name] = _ragged(rows, max(len(r) for r in rows))
+        if self.curve_points:
+            curves = [res.get('equity_curve') for res in results]
+            arrays[CURVE] = np.stack([_downsample([] if c is None else c, self.curve_points)
+                                      for c in curves]).astype(np.float32)
+
+        filename = f'part-{len(self.parts):05d}.npz'
+        np.savez(self.path / filename, **arrays)
+        self.parts.append({'file': filename, 'rows': n})
+        self.rows += n
+        self._write_schema()
+
+    def _write_schema(self):
+        schema = {'param_names': self.param_names or [], 'metric_names': self.metric_names,
+                  'fold_names': self.fold_names, 'curve_points': self.curve_points,
+                  'parts': self.parts, 'rows': self.rows}
+        tmp = self.path / (SCHEMA_FILE + '.tmp')
+        with open(tmp, 'w') as f:
+            json.dump(schema, f, indent=2)
+        tmp.replace(self.path / SCHEMA_FILE)
+
+
+class ResultReader:
+    """Column-wise access to a store written by ResultWriter.
+
+    `column`, `folds` and `curves` read only the requested arrays of each
+    part; `top` ranks by a single column scan and then loads just the
+    winning rows.
+    """
+
+    def __init__(self, path: str):
+        if np is None:
+            raise RuntimeError('numpy is required for ResultReader')
+        self.path = Path(path)
+        with open(self.path / SCHEMA_FILE) as f:
+            schema = json.load(f)
+        self.param_names: List[str] = schema['param_names']
+        self.metric_names: List[str] = schema['metric_names']
+        self.fold_names: List[str] = schema['fold_names']
+        self.curve_points: int = schema['curve_points']
+        self.parts: List[Dict] = schema['parts']
+        self.offsets = np.cumsum([0] + [part['rows'] for part in self.parts])
+
+    def __len__(self) -> int:
+        return int(self.offsets[-1])
+
+    def __repr__(self) -> str:
+        return f"ResultReader({len(self)} rows, params={self.param_names}, metrics={self.metric_names})"
+
+    @property
+    def columns(self) -> List[str]:
+        return self.param_names + self.metric_names
+
+    def _load(self, part: Dict, key: str, rows: int, width: int = 0):
+        """One array of a part; NaN when the part lacks it, 2-D arrays padded to `width` columns."""
+        two_d = key == CURVE or key.startswith(FOLD)
+        with np.load(self.path / part['file']) as data:
+            if key in data.files:
+                arr = data[key]
+                if two_d and arr.shape[1] < width:
+                    arr = np.pad(arr, ((0, 0), (0, width - arr.shape[1])), constant_values=np.nan)
+                return arr
+        return np.full((rows, width) if two_d else rows, np.nan)
+
+    def _scan(self, key: str, width: int = 0):
+        if not self.parts:
+            return np.empty((0, width) if key == CURVE or key.startswith(FOLD) else 0)
+        return np.concatenate([self._load(part, key, part['rows'], width) for part in self.parts])
+
+    def column(self, name: str):
+        """One parameter or metric column over all rows (NaN where a metric is missing)."""
+        if name in self.param_names:
+            return self._scan(PARAM + name)
+        if name in self.metric_names:
+            return self._scan(METRIC + name)
+        raise KeyError(f'no column {name!r}; columns: {self.columns}')
+
+    def folds(self, metric: str):
+        """Per-fold values of a walk-forward metric, shape (rows, folds)."""
+        if metric not in self.fold_names:
+            raise KeyError(f'no per-fold metric {metric!r}; stored: {self.fold_names}')
+        width = 0
+        for part in self.parts:
+            with np.load(self.path / part['file']) as data:
+                width = max(width, data[FOLD + metric].shape[1])
+        return self._scan(FOLD + metric, width)
+
+    def curves(self, indices: Optional[Sequence[int]] = None):
+        """Downsampled equity curves, shape (rows, curve_points)."""
+        if not self.curve_points:
+            raise KeyError('the store has no equity curves (curve_points=0)')
+        if indices is None:
+            return self._scan(CURVE, self.curve_points)
+        rows = self._gather(CURVE, indices)
+        return np.stack(rows) if rows else np.empty((0, self.curve_points), dtype=np.float32)
+
+    def _gather(self, key: str, indices: Sequence[int]) -> list:
+        """Rows `indices` of one array, loading only the parts that hold them."""
+        indices = np.asarray(indices, dtype=np.int64)
+        part_of = np.searchsorted(self.offsets, indices, side='right') - 1
+        out = [None] * len(indices)
+        for p in np.unique(part_of):
+            part = self.parts[p]
+            arr = self._load(part, key, part['rows'])
+            for i in np.flatnonzero(part_of == p):
+                out[i] = arr[indices[i] - self.offsets[p]]
+        return out
+
+    def sorted_indices(self, sort_key: str = 'sharpe', descending: bool = True):
+        """Row order by `sort_key` (missing values fall back to the total return, then rank last)."""
+        values = self.column(sort_key)
+        fallback = 'total_return' if 'total_return' in self.metric_names else 'avg_total_return'
+        if fallback in self.metric_names and fallback != sort_key:
+            values = np.where(np.isnan(values), self.column(fallback), values)
+        values = np.where(np.isnan(values), -np.inf, values)
+        return np.argsort(-values if descending else values, kind='stable')
+
+    def take(self, indices: Sequence[int]) -> ResultTable:
+        """Rows as a ResultTable (metrics and per-fold lists; curves stay on disk)."""
+        indices = list(indices)
+        if not indices:
+            return ResultTable(self.param_names, [], [])
+        params = list(zip(*[[v.item() for v in self._gather(PARAM + name, indices)] for name in self.param_names]))
+        metrics = {name: [v.item() for v in self._gather(METRIC + name, indices)] for name in self.metric_names}
+        folds = {name: [row.tolist() for row in self._gather(FOLD + name, indices)] for name in self.fold_names}
+        results = []
+        for i in range(len(indices)):
+            res = {name: (None if values[i] != values[i] else values[i]) for name, values in metrics.items()}
+            if folds:
+                res['folds'] = {name: [None if v != v else v for v in values[i]] for name, values in folds.items()}
+            results.append(res)
+        return ResultTable(self.param_names, params, results)
+
+    def top(self, n: int = 10, sort_key: str = 'sharpe') -> ResultTable:
+        return self.take(self.sorted_indices(sort_key)[:n])
+
+    def to_table(self) -> ResultTable:
+        return self.take(range(len(self)))
+
+    def to_csv(self, filename: str, columns: Optional[List[str]] = None):
+        """Write the parameter and metric columns to CSV, one part at a time."""
+        columns = columns or self.columns
+        with open(filename, 'w', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(columns)
+            for part in self.parts:
+                cols = []
+                for name in columns:
+                    key = (PARAM if name in self.param_names else METRIC) + name
+                    values = self._load(part, key, part['rows']).tolist()
+                    if name in self.metric_names:
+                        values = [None if v != v else v for v in values]
+                    cols.append(values)
+                writer.writerows(zip(*cols))
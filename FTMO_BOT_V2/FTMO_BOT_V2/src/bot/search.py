@@ -0,0 +1,227 @@
+import math
+import random
+from concurrent.futures import Executor
+from typing import Callable, Dict, List, Optional
+
+try:
+    import numpy as np
+except Exception:
+    np = None
+
+from src.bot.optimizer import _optimize_chunk, _param_combos, _run_combos
+from src.bot.results import ResultTable, _rank_value
+
+
+class _Evaluator:
+    """Backtests combos of one strategy on the first `bars` prices (all when None)."""
+
+    def __init__(self, prices, strategy_factory, param_names, highs, lows, n_jobs, executor, **kwargs):
+        self.prices = prices
+        self.highs = highs
+        self.lows = lows
+        self.n_jobs = n_jobs
+        self.executor = executor
+        self.kwargs = dict(strategy_factory=strategy_factory, param_names=param_names, **kwargs)
+
+    def __call__(self, combos: list, bars: Optional[int] = None, keep_curves: bool = False) -> list:
+        end = len(self.prices) if bars is None else bars
+        data = {
+            'prices': self.prices[:end],
+            'highs': None if self.highs is None else self.highs[:end],
+            'lows': None if self.lows is None else self.lows[:end],
+        }
+        kwargs = dict(self.kwargs, keep_curves=keep_curves)
+        return _run_combos(_optimize_chunk, data, combos, kwargs, n_jobs=self.n_jobs, executor=self.executor)
+
+
+def _run_kwargs(risk_per_trade, leverage, position_sizing, period, atr_method, allow_short) -> dict:
+    kwargs = dict(risk_per_trade=risk_per_trade, leverage=leverage, position_sizing=position_sizing,
+                  period=period, atr_method=atr_method)
+    if allow_short:
+        kwargs['allow_short'] = True
+    return kwargs
+
+
+def _ranked(combos: list, results: list, sort_key: str) -> List[int]:
+    # same ranking as ResultTable.top: a missing sort_key falls back to the total return
+    values = [_rank_value(res, sort_key) for res in results]
+    return sorted(range(len(combos)), key=lambda i: values[i], reverse=True)
+
+
+def _halving(evaluate: _Evaluator, combos: list, n_bars: int, min_bars: int, eta: int, top_n: int,
+             sort_key: str, keep_curves: bool):
+    """One successive-halving bracket: returns (combos, results) of the final, full-length rung."""
+    budgets = []
+    bars = n_bars
+    while bars > min_bars and len(budgets) < 64:
+        budgets.append(bars)
+        bars //= eta
+    budgets.append(max(bars, min_bars))
+    budgets.reverse()
+
+    for bars in budgets[:-1]:
+        if len(combos) <= top_n:
+            break
+        results = evaluate(combos, bars)
+        keep = max(top_n, math.ceil(len(combos) / eta))
+        combos = [combos[i] for i in _ranked(combos, results, sort_key)[:keep]]
+    return combos, evaluate(combos, None, keep_curves=keep_curves)
+
+
+def successive_halving(prices: List[float], strategy_factory: Callable, param_grid: Dict[str, list],
+                       constraint: Optional[Callable] = None, eta: int = 3, min_bars: int = 500,
+                       n_configs: Optional[int] = None, top_n: int = 10, sort_key: str = 'sharpe', seed: int = 0,
+                       initial_capital: float = 10000.0, commission: float = 0.0, slippage: float = 0.0,
+                       risk_per_trade: float = 0.01, leverage: float = 1.0, position_sizing: str = 'fixed',
+                       highs: List[float] = None, lows: List[float] = None, period: int = 14,
+                       atr_method: str = 'sma', chunk_size: int = 64, keep_curves: bool = True,
+                       allow_short: bool = False, n_jobs: Optional[int] = None, executor: Optional[Executor] = None) -> ResultTable:
+    """
+    Successive halving over a strategy's parameter grid.
+
+    Every combo (or `n_configs` sampled at random) is backtested on the first
+    `len(prices) / eta**k` bars; the best 1/eta by `sort_key` move on to a
+    budget eta times larger, until the survivors run on the full series.
+    `min_bars` bounds the shortest prefix and should cover the strategy warm-up.
+
+    Returns the best `top_n` combos as a ResultTable (full-series metrics), like get_top_results.
+    """
+    if np is None:
+        raise RuntimeError('numpy is required for successive_halving')
+    if eta < 2:
+        raise ValueError("eta must be >= 2")
+    names, combos = _param_combos(param_grid, constraint)
+    if n_configs is not None and n_configs < len(combos):
+        combos = random.Random(seed).sample(combos, n_configs)
+    evaluate = _Evaluator(prices, strategy_factory, names, highs, lows, n_jobs, executor,
+                          initial_capital=initial_capital, commission=commission, slippage=slippage,
+                          run_kwargs=_run_kwargs(risk_per_trade, leverage, position_sizing, period, atr_method,
+                                                 allow_short),
+                          chunk_size=chunk_size)
+    combos, results = _halving(evaluate, combos, len(prices), min_bars, eta, top_n, sort_key, keep_curves)
+    return ResultTable(names, combos, results).top(top_n, sort_key=sort_key)
+
+
+def hyperband(prices: List[float], strategy_factory: Callable, param_grid: Dict[str, list],
+              constraint: Optional[Callable] = None, eta: int = 3, min_bars: int = 500,
+              top_n: int = 10, sort_key: str = 'sharpe', seed: int = 0,
+              initial_capital: float = 10000.0, commission: float = 0.0, slippage: float = 0.0,
+              risk_per_trade: float = 0.01, leverage: float = 1.0, position_sizing: str = 'fixed',
+              highs: List[float] = None, lows: List[float] = None, period: int = 14,
+              atr_method: str = 'sma', chunk_size: int = 64, keep_curves: bool = True,
+              allow_short: bool = False, n_jobs: Optional[int] = None, executor: Optional[Executor] = None) -> ResultTable:
+    """
+    Hyperband: several successive-halving brackets trading the number of
+    sampled combos against their starting budget (many combos on short
+    prefixes down to few combos on the full series). Survivors of all
+    brackets are merged and the best `top_n` returned as a ResultTable.
+    """
+    if np is None:
+        raise RuntimeError('numpy is required for hyperband')
+    if eta < 2:
+        raise ValueError("eta must be >= 2")
+    names, combos = _param_combos(param_grid, constraint)
+    evaluate = _Evaluator(prices, strategy_factory, names, highs, lows, n_jobs, executor,
+                          initial_capital=initial_capital, commission=commission, slippage=slippage,
+                          run_kwargs=_run_kwargs(risk_per_trade, leverage, position_sizing, period, atr_method,
+                                                 allow_short),
+                          chunk_size=chunk_size)
+    n_bars = len(prices)
+    s_max = 0
+    while n_bars // eta ** (s_max + 1) >= min_bars:
+        s_max += 1
+
+    rng = random.Random(seed)
+    found = {}
+    for s in range(s_max, -1, -1):
+        n_configs = math.ceil((s_max + 1) / (s + 1) * eta ** s)
+        bracket = combos if n_configs >= len(combos) else rng.sample(combos, n_configs)
+        survivors, results = _halving(evaluate, bracket, n_bars, max(min_bars, n_bars // eta ** s), eta, top_n,
+                                      sort_key, keep_curves)
+        for combo, res in zip(survivors, results):
+            found.setdefault(combo, res)
+    return ResultTable(names, list(found), list(found.values())).top(top_n, sort_key=sort_key)
+
+
+def _encode(combos: list, param_grid: Dict[str, list]):
+    """Map combos to [0, 1]^d using each value's position in its grid list."""
+    positions = [{value: i for i, value in enumerate(values)} for values in param_grid.values()]
+    scale = [max(len(values) - 1, 1) for values in param_grid.values()]
+    return np.array([[pos[v] / sc for v, pos, sc in zip(combo, positions, scale)] for combo in combos], dtype=float)
+
+
+def _kernel_scores(x_seen, y_seen, x_cand, bandwidth: float, explore: float, block: int = 4096):
+    """Nadaraya-Watson prediction plus an exploration bonus where few evaluations are nearby."""
+    spread = float(np.std(y_seen)) or 1.0
+    prior = float(np.mean(y_seen))
+    scores = np.empty(len(x_cand))
+    for i in range(0, len(x_cand), block):
+        part = x_cand[i:i + block]
+        d2 = ((part[:, None, :] - x_seen[None, :, :]) ** 2).sum(axis=2)
+        w = np.exp(-0.5 * d2 / bandwidth ** 2)
+        w_sum = w.sum(axis=1)
+        pred = (w @ y_seen + prior) / (w_sum + 1.0)
+        scores[i:i + block] = pred + explore * spread / np.sqrt(1.0 + w_sum)
+    return scores
+
+
+def surrogate_search(prices: List[float], strategy_factory: Callable, param_grid: Dict[str, list],
+                     constraint: Optional[Callable] = None, n_initial: int = 64, n_iter: int = 10,
+                     batch_size: int = 32, bandwidth: float = 0.15, explore: float = 1.0,
+                     top_n: int = 10, sort_key: str = 'sharpe', seed: int = 0,
+                     initial_capital: float = 10000.0, commission: float = 0.0, slippage: float = 0.0,
+                     risk_per_trade: float = 0.01, leverage: float = 1.0, position_sizing: str = 'fixed',
+                     highs: List[float] = None, lows: List[float] = None, period: int = 14,
+                     atr_method: str = 'sma', chunk_size: int = 64, keep_curves: bool = True,
+                     allow_short: bool = False, n_jobs: Optional[int] = None, executor: Optional[Executor] = None) -> ResultTable:
+    """
+    Surrogate-guided sampling of a parameter grid.
+
+    After `n_initial` random combos, a kernel regression over the grid
+    coordinates (each value's position in its list, scaled to [0, 1]) predicts
+    `sort_key` for the unevaluated combos; each of the `n_iter` rounds
+    backtests the `batch_size` combos with the best prediction plus an
+    `explore`-weighted bonus for sparsely sampled regions.
+
+    Returns the best `top_n` evaluated combos as a ResultTable, like get_top_results.
+    """
+    if np is None:
+        raise RuntimeError('numpy is required for surrogate_search')
+    names, combos = _param_combos(param_grid, constraint)
+    evaluate = _Evaluator(prices, strategy_factory, names, highs, lows, n_jobs, executor,
+                          initial_capital=initial_capital, commission=commission, slippage=slippage,
+                          run_kwargs=_run_kwargs(risk_per_trade, leverage, position_sizing, period, atr_method,
+                                                 allow_short),
+                          chunk_size=chunk_size)
+    rng = random.Random(seed)
+    order = list(range(len(combos)))
+    rng.shuffle(order)
+    batch = order[:n_initial]
+    pending = np.ones(len(combos), dtype=bool)
+    coords = _encode(combos, param_grid)
+
+    seen, results = [], []
+    for _ in range(n_iter + 1):
+        if not batch:
+            break
+        pending[batch] = False
+        seen.extend(batch)
+        results.extend(evaluate([combos[i] for i in batch]))
+
+        candidates = np.flatnonzero(pending)
+        if len(candidates) == 0:
+            break
+        y = np.array([_rank_value(res, sort_key) for res in results])
+        finite = np.isfinite(y)
+        if not finite.any():
+            batch = [int(i) for i in candidates[:batch_size]]
+            continue
+        y = np.where(finite, y, y[finite].min())
+        scores = _kernel_scores(coords[seen], y, coords[candidates], bandwidth, explore)
+        best = np.argsort(-scores, kind='stable')[:batch_size]
+        batch = [int(i) for i in candidates[best]]
+
+    top = ResultTable(names, [combos[i] for i in seen], results).top(top_n, sort_key=sort_key)
+    if keep_curves:
+        top = ResultTable(names, top.params, evaluate(top.params, None, keep_curves=True))
+    return top
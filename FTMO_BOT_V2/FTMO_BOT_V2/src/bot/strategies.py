@@ -1,3 +1,30 @@
+import math
+
+try:
+    import numpy as np
+except Exception:
+    np = None
+
+from src.bot import indicators
+
+
+def sma_table(prices, windows, key=None):
+    """Compute the simple moving average for every window from one cumulative sum.
+
+    Returns a dict window -> float array (NaN until the window is full).
+    """
+    key = key or indicators.series_key(prices)
+    return {window: indicators.sma(prices, window, key=key) for window in set(windows)}
+
+
+def _latch(events, values):
+    """Hold the value of the most recent event bar (0 before the first event), column-wise."""
+    idx = np.arange(events.shape[0])[:, None]
+    last = np.maximum.accumulate(np.where(events, idx, -1), axis=0)
+    held = np.take_along_axis(values, np.maximum(last, 0), axis=0)
+    return ((last >= 0) & held).astype(np.int8)
+
+
 class Strategy:
     def __init__(self, name):
         self.name = name
@@ -13,20 +40,9 @@ class MovingAverageStrategy(Strategy):
         self.long_window = long_window
 
     def _sma(self, series, window):
-        """Compute simple moving average for a list-like of numbers."""
-        if window <= 0:
-            raise ValueError("window must be > 0")
-        sma = []
-        cum = 0.0
-        for i, v in enumerate(series):
-            cum += v
-            if i >= window:
-                cum -= series[i - window]
-            if i >= window - 1:
-                sma.append(cum / window)
-            else:
-                sma.append(None)
-        return sma
+        """Compute simple moving average for a list-like of numbers (None until the window is full)."""
+        sma = indicators.sma(series, window)
+        return [None if math.isnan(v) else v for v in sma.tolist()]
 
     def generate_signals(self, prices):
         """
@@ -68,6 +84,28 @@ class MovingAverageStrategy(Strategy):
             prev_long = l
         return signals
 
+    @staticmethod
+    def batch_signals(prices, combos, smas=None, key=None):
+        """Generate signals for many (short, long) pairs at once.
+
+        Returns an int8 array of shape (len(prices), len(combos)) whose columns
+        match `generate_signals` for each pair. `smas` may hold a precomputed
+        `sma_table` covering every window in `combos`; `key` is the prices'
+        `indicators.series_key`.
+        """
+        if smas is None:
+            smas = sma_table(prices, [w for combo in combos for w in combo], key=key)
+        n = len(prices)
+        short = np.column_stack([smas[s] for s, _ in combos])
+        long = np.column_stack([smas[l] for _, l in combos])
+        first = np.array([max(s, l) - 1 for s, l in combos])
+        idx = np.arange(n)[:, None]
+        valid = idx >= first
+        # position follows the sign of short - long and holds on ties;
+        # a tie on the first comparable bar starts flat
+        events = valid & ((short != long) | (idx == first))
+        return _latch(events, short > long)
+
     def execute(self, data):
         """Expect data to be a list-like of prices. Return generated signals."""
         prices = data
@@ -75,25 +113,70 @@ class MovingAverageStrategy(Strategy):
 
 
 class RSI_Strategy(Strategy):
-    def __init__(self, period):
+    """Long when RSI drops below `lower` (oversold), flat once it rises above `upper`."""
+
+    def __init__(self, period, lower=30.0, upper=70.0):
         super().__init__("RSI Strategy")
         self.period = period
+        self.lower = lower
+        self.upper = upper
+
+    def generate_signals(self, prices):
+        """Signals: 1 -> long, 0 -> flat. Position is held while RSI stays between the thresholds."""
+        if prices is None or len(prices) == 0:
+            return []
+        return self.batch_signals(prices, [(self.period, self.lower, self.upper)])[:, 0].tolist()
+
+    @staticmethod
+    def batch_signals(prices, combos, key=None):
+        """Signals for many (period, lower, upper) triples as an int8 (len(prices), len(combos)) array."""
+        key = key or indicators.series_key(prices)
+        rsi = np.column_stack([indicators.rsi(prices, period, key=key) for period, _, _ in combos])
+        lower = np.array([c[1] for c in combos], dtype=float)
+        upper = np.array([c[2] for c in combos], dtype=float)
+        oversold = rsi < lower
+        return _latch(oversold | (rsi > upper), oversold)
 
     def execute(self, data):
-        # Implement RSI logic here
-        pass
+        """Expect data to be a list-like of prices. Return generated signals."""
+        return self.generate_signals(data)
 
 
 class MACD_Strategy(Strategy):
+    """Long while the MACD line (EMA short - EMA long) is above its signal line."""
+
     def __init__(self, short_window, long_window, signal_window):
         super().__init__("MACD Strategy")
         self.short_window = short_window
         self.long_window = long_window
         self.signal_window = signal_window
 
+    def generate_signals(self, prices):
+        """Signals: 1 -> long, 0 -> flat. Ties between MACD and signal keep the position."""
+        if prices is None or len(prices) == 0:
+            return []
+        combo = (self.short_window, self.long_window, self.signal_window)
+        return self.batch_signals(prices, [combo])[:, 0].tolist()
+
+    @staticmethod
+    def batch_signals(prices, combos, key=None):
+        """Signals for many (short, long, signal) triples as an int8 (len(prices), len(combos)) array."""
+        key = key or indicators.series_key(prices)
+        n = len(prices)
+        macd = np.full((n, len(combos)), np.nan)
+        line = np.full((n, len(combos)), np.nan)
+        for j, (short, long, signal) in enumerate(combos):
+            m = indicators.ema(prices, short, key=key) - indicators.ema(prices, long, key=key)
+            start = max(short, long) - 1
+            macd[:, j] = m
+            if start < n:
+                line[start:, j] = indicators.ema(m[start:], signal)
+        valid = ~np.isnan(line)
+        return _latch(valid & (macd != line), macd > line)
+
     def execute(self, data):
-        # Implement MACD logic here
-        pass
+        """Expect data to be a list-like of prices. Return generated signals."""
+        return self.generate_signals(data)
 
 
 class StrategyA(Strategy):
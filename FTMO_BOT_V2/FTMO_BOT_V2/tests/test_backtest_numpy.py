@@ -0,0 +1,117 @@
+import math
+import random
+
+import pytest
+
+from src.bot.strategies import MovingAverageStrategy
+from src.bot.backtest import Backtester
+
+
+def make_noisy_prices(length=400, seed=7):
+    rng = random.Random(seed)
+    prices = [100.0]
+    for _ in range(length - 1):
+        prices.append(prices[-1] * (1 + rng.gauss(0.0005, 0.01)))
+    return prices
+
+
+def assert_same(a, b):
+    if a is None or b is None:
+        assert a is b
+    else:
+        assert math.isclose(a, b, rel_tol=1e-9, abs_tol=1e-12)
+
+
+@pytest.mark.parametrize('kwargs', [
+    {},
+    {'position_sizing': 'atr'},
+    {'position_sizing': 'atr', 'atr_method': 'wilder', 'leverage': 2.0},
+])
+def test_numpy_engine_matches_loop(kwargs):
+    prices = make_noisy_prices()
+    signals = MovingAverageStrategy(short_window=3, long_window=15).generate_signals(prices)
+    bt = Backtester(initial_capital=10000.0, commission=0.0005, slippage=0.0002)
+
+    loop = bt.run(prices, signals, risk_per_trade=0.5, **kwargs)
+    fast = bt.run(prices, signals, risk_per_trade=0.5, engine='numpy', **kwargs)
+
+    for key in ('total_return', 'max_drawdown', 'sharpe', 'sortino', 'cagr', 'annual_volatility', 'win_rate'):
+        assert_same(loop[key], fast[key])
+    assert len(loop['equity_curve']) == len(fast['equity_curve'])
+    for x, y in zip(loop['equity_curve'], fast['equity_curve']):
+        assert_same(x, y)
+    assert [t['index'] for t in loop['trades']] == [t['index'] for t in fast['trades']]
+    for x, y in zip(loop['trades'], fast['trades']):
+        assert_same(x['units'], y['units'])
+        assert_same(x.get('pnl'), y.get('pnl'))
+
+
+def test_numpy_engine_forces_final_close():
+    prices = make_noisy_prices(length=50)
+    signals = [0] * 40 + [1] * 10
+    bt = Backtester(initial_capital=10000.0, commission=0.001, slippage=0.001)
+
+    loop = bt.run(prices, signals)
+    fast = bt.run(prices, signals, engine='numpy')
+
+    assert fast['trades'][-1]['index'] == len(prices) - 1
+    assert_same(loop['equity_curve'][-1], fast['equity_curve'][-1])
+    assert_same(loop['max_drawdown'], fast['max_drawdown'])
+
+
+@pytest.mark.parametrize('signal', [0, 1])
+def test_single_bar_matches_loop(signal):
+    bt = Backtester(initial_capital=10000.0, commission=0.001, slippage=0.001)
+    loop = bt.run([100.0], [signal])
+    fast = bt.run([100.0], [signal], engine='numpy')
+    batch = bt.run_batch([100.0], [[signal, 1 - signal]], keep_curves=False)[0]
+    for key in ('total_return', 'max_drawdown', 'sharpe', 'sortino', 'cagr', 'annual_volatility', 'win_rate'):
+        assert_same(loop[key], fast[key])
+        assert_same(loop[key], batch[key])
+    assert list(fast['equity_curve']) == loop['equity_curve']
+    assert list(fast['returns']) == loop['returns'] == []
+
+
+def test_incremental_walk_forward_with_one_bar_test_windows():
+    from src.bot.optimizer import walk_forward_evaluate
+
+    prices = make_noisy_prices(length=60)
+    fast = walk_forward_evaluate(prices, [3], [10], train_size=50, test_size=1, incremental=True)
+    loop = walk_forward_evaluate(prices, [3], [10], train_size=50, test_size=1)
+    assert [m for _, _, m in fast] == [m for _, _, m in loop]
+
+
+@pytest.mark.parametrize('kwargs', [
+    {},
+    {'allow_short': True, 'position_sizing': 'atr'},
+    {'allow_short': True, 'stop_loss': 0.01, 'take_profit': 0.02},
+])
+def test_row_blocks_match_loop(monkeypatch, kwargs):
+    from src.bot import backtest
+
+    # 64-bar row blocks, so trades and drawdowns span block boundaries
+    monkeypatch.setattr(backtest, '_BLOCK_CELLS', 1)
+    prices = make_noisy_prices(length=500)
+    rng = random.Random(5)
+    columns = [[rng.choice([-1, 0, 1, 1, 2]) for _ in range(5)] for _ in range(3)]
+    signals = [[col[(i // 13) % 5] for col in columns] for i in range(len(prices))]
+    bt = Backtester(initial_capital=10000.0, commission=0.0005, slippage=0.0002)
+    batch = bt.run_batch(prices, signals, risk_per_trade=0.5, **kwargs)
+    scalars = bt.run_batch(prices, signals, risk_per_trade=0.5, keep_curves=False, **kwargs)
+    for j, (fast, metrics) in enumerate(zip(batch, scalars)):
+        loop = bt.run(prices, [row[j] for row in signals], risk_per_trade=0.5, **kwargs)
+        for key in ('total_return', 'max_drawdown', 'sharpe', 'sortino', 'cagr', 'annual_volatility', 'win_rate'):
+            assert_same(loop[key], fast[key])
+            assert fast[key] == metrics[key]
+        for x, y in zip(loop['equity_curve'], fast['equity_curve']):
+            assert_same(x, y)
+        for x, y in zip(loop['returns'], fast['returns']):
+            assert_same(x, y)
+        assert [t['index'] for t in loop['trades']] == [t['index'] for t in fast['trades']]
+        for x, y in zip(loop['trades'], fast['trades']):
+            assert_same(x.get('pnl'), y.get('pnl'))
+
+
+def test_unknown_engine_raises():
+    with pytest.raises(ValueError):
+        Backtester().run([1.0, 2.0], [0, 1], engine='rust')
@@ -0,0 +1,70 @@
+import math
+import random
+
+import pytest
+
+from src.bot.backtest import Backtester, ResumableBacktest
+from src.bot.strategies import MovingAverageStrategy
+
+
+def make_ohlc(n=600, seed=13):
+    rng = random.Random(seed)
+    close = [100.0]
+    for _ in range(n - 1):
+        close.append(close[-1] + rng.gauss(0.02, 1.0))
+    highs = [c + rng.random() for c in close]
+    lows = [c - rng.random() for c in close]
+    return close, highs, lows
+
+
+def same_result(a, b):
+    assert a.keys() == b.keys()
+    for key in a:
+        if key == 'trades':
+            assert (a[key] is None) == (b[key] is None)
+            if a[key] is not None:
+                assert repr(a[key].to_dicts()) == repr(b[key].to_dicts())
+        else:
+            assert repr(a[key]) == repr(b[key]), key
+
+
+@pytest.mark.parametrize('position_sizing,atr_method', [('fixed', 'sma'), ('atr', 'sma'), ('atr', 'wilder')])
+@pytest.mark.parametrize('keep_curves', [True, False])
+def test_resumed_run_identical_to_full_run(tmp_path, position_sizing, atr_method, keep_curves):
+    close, highs, lows = make_ohlc()
+    signals = MovingAverageStrategy(5, 20).generate_signals(close)
+    settings = dict(risk_per_trade=0.02, leverage=2.0, position_sizing=position_sizing, atr_method=atr_method,
+                    keep_curves=keep_curves)
+    full = Backtester(10000, commission=0.0005, slippage=0.0002).run(close, signals, highs=highs, lows=lows,
+                                                                     **settings)
+
+    state = ResumableBacktest(10000, commission=0.0005, slippage=0.0002, **settings)
+    path = str(tmp_path / 'state.pkl')
+    bounds = [0, 7, 250, 251, 430, len(close)]
+    for a, b in zip(bounds, bounds[1:]):
+        state.update(close[a:b], signals[a:b], highs=highs[a:b], lows=lows[a:b])
+        state.result()  # reading a result must not disturb the state
+        state.save(path)
+        state = ResumableBacktest.load(path)
+    same_result(state.result(), full)
+
+
+def test_result_does_not_close_the_live_position():
+    close, _, _ = make_ohlc(100)
+    signals = [1] * 100
+    state = ResumableBacktest(10000).update(close[:50], signals[:50])
+    mid = state.result()
+    assert len(mid['trades']) == 2
+    assert state.position == 1 and len(state.trades) == 1
+    final = state.update(close[50:], signals[50:]).result()
+    assert len(final['trades']) == 2
+    assert math.isclose(final['total_return'],
+                        Backtester(10000).run(close, signals)['total_return'], rel_tol=0, abs_tol=0)
+
+
+def test_update_validates_lengths():
+    state = ResumableBacktest(10000)
+    with pytest.raises(ValueError):
+        state.update([1.0, 2.0], [1])
+    with pytest.raises(ValueError):
+        state.result()
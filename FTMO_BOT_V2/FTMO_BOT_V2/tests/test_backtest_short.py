@@ -0,0 +1,91 @@
+import math
+import random
+
+import pytest
+
+from src.bot.backtest import Backtester
+from src.bot.optimizer import optimize
+
+
+def make_prices(n=400, seed=21):
+    rng = random.Random(seed)
+    prices = [100.0]
+    for _ in range(n - 1):
+        prices.append(max(1.0, prices[-1] + rng.gauss(0.0, 1.0)))
+    return prices
+
+
+def random_signals(n, seed=4):
+    rng = random.Random(seed)
+    return [rng.choice([1, 1, 0, -1, -1, 2]) for _ in range(n)]
+
+
+def close(a, b):
+    return math.isclose(a, b, rel_tol=1e-9, abs_tol=1e-12)
+
+
+def test_short_trade_pnl_slippage_and_commission():
+    prices = [100.0, 90.0, 80.0]
+    bt = Backtester(initial_capital=10000, commission=0.001, slippage=0.01)
+    res = bt.run(prices, [-1, -1, 0], risk_per_trade=0.5, allow_short=True)
+    entry, exit_ = res['trades']
+    units = 10000 * 0.5 / 100.0
+    assert entry['price'] == pytest.approx(99.0)  # sell below the price
+    assert entry['units'] == pytest.approx(-units)
+    assert exit_['price'] == pytest.approx(80.8)  # buy back above the price
+    assert exit_['pnl'] == pytest.approx((99.0 - 80.8) * units)
+    assert entry['commission'] == pytest.approx(units * 99.0 * 0.001)
+    assert exit_['commission'] == pytest.approx(units * 80.8 * 0.001)
+    assert res['win_rate'] == 1.0
+
+
+def test_minus_one_is_ignored_without_allow_short():
+    prices = make_prices()
+    signals = random_signals(len(prices))
+    long_only = [s if s != -1 else 2 for s in signals]
+    bt = Backtester(initial_capital=10000, commission=0.0005, slippage=0.0002)
+    assert repr(bt.run(prices, signals)) == repr(bt.run(prices, long_only))
+
+
+@pytest.mark.parametrize('position_sizing', ['fixed', 'atr'])
+def test_engines_agree_on_long_short_signals(position_sizing):
+    prices = make_prices()
+    signals = random_signals(len(prices))
+    bt = Backtester(initial_capital=10000, commission=0.0005, slippage=0.0002)
+    kwargs = dict(risk_per_trade=0.05, leverage=2.0, position_sizing=position_sizing, allow_short=True)
+    loop = bt.run(prices, signals, **kwargs)
+    vec = bt.run(prices, signals, engine='numpy', **kwargs)
+
+    assert any(t['units'] < 0 for t in loop['trades'])
+    assert len(loop['trades']) == len(vec['trades'])
+    for a, b in zip(loop['trades'], vec['trades']):
+        assert a['type'] == b['type'] and a['index'] == b['index']
+        for key in ('price', 'units', 'commission', 'pnl'):
+            if key in a:
+                assert close(a[key], b[key]), key
+    for a, b in zip(loop['equity_curve'], vec['equity_curve']):
+        assert close(a, b)
+    for key in ('total_return', 'max_drawdown', 'sharpe', 'sortino', 'cagr', 'win_rate'):
+        assert close(loop[key], vec[key]), key
+
+
+def test_reversal_closes_and_reopens_on_the_same_bar():
+    prices = [100.0, 101.0, 102.0, 99.0, 98.0]
+    res = Backtester(initial_capital=10000).run(prices, [1, 1, -1, -1, 0], allow_short=True)
+    rows = [(t['type'], t['index'], t['units'] > 0) for t in res['trades']]
+    assert rows == [('entry', 0, True), ('exit', 2, True), ('entry', 2, False), ('exit', 4, False)]
+
+
+def test_optimize_allow_short_uses_short_signals():
+    class Constant:
+        def __init__(self, side):
+            self.side = side
+
+        def generate_signals(self, prices):
+            return [self.side] * len(prices)
+
+    falling = [100.0 - 0.1 * i for i in range(300)]
+    table = optimize(falling, Constant, {'side': [1, -1]}, allow_short=True)
+    long_res, short_res = table.results
+    assert long_res['total_return'] < 0 < short_res['total_return']
+    assert optimize(falling, Constant, {'side': [-1]}).results[0]['total_return'] == 0.0
@@ -0,0 +1,112 @@
+import math
+import random
+
+import pytest
+
+from src.bot.backtest import Backtester
+
+
+def make_ohlc(n=500, seed=8):
+    rng = random.Random(seed)
+    prices = [100.0]
+    for _ in range(n - 1):
+        prices.append(max(1.0, prices[-1] + rng.gauss(0.0, 1.0)))
+    highs = [p + rng.random() * 1.5 for p in prices]
+    lows = [p - rng.random() * 1.5 for p in prices]
+    return prices, highs, lows
+
+
+def random_signals(n, seed=3):
+    rng = random.Random(seed)
+    return [rng.choice([1, 1, 1, 0, -1, -1, 2, 2]) for _ in range(n)]
+
+
+def close(a, b):
+    return math.isclose(a, b, rel_tol=1e-9, abs_tol=1e-12)
+
+
+def assert_engines_agree(loop, vec):
+    assert len(loop['trades']) == len(vec['trades'])
+    for a, b in zip(loop['trades'], vec['trades']):
+        assert a['type'] == b['type'] and a['index'] == b['index']
+        for key in ('price', 'units', 'commission', 'pnl'):
+            if key in a:
+                assert close(a[key], b[key]), key
+    for a, b in zip(loop['equity_curve'], vec['equity_curve']):
+        assert close(a, b)
+    for key in ('total_return', 'max_drawdown', 'sharpe', 'win_rate'):
+        assert close(loop[key], vec[key]), key
+
+
+@pytest.mark.parametrize('tie_break', ['stop', 'target', 'nearest'])
+@pytest.mark.parametrize('stop_units,stop_loss,take_profit', [('pct', 0.01, 0.02), ('atr', 1.5, 2.5),
+                                                               ('pct', 0.015, None), ('atr', None, 2.0)])
+def test_engines_agree_with_stops(stop_units, stop_loss, take_profit, tie_break):
+    prices, highs, lows = make_ohlc()
+    signals = random_signals(len(prices))
+    bt = Backtester(initial_capital=10000, commission=0.0005, slippage=0.0002)
+    kwargs = dict(risk_per_trade=0.05, highs=highs, lows=lows, allow_short=True, stop_loss=stop_loss,
+                  take_profit=take_profit, stop_units=stop_units, tie_break=tie_break)
+    loop = bt.run(prices, signals, **kwargs)
+    vec = bt.run(prices, signals, engine='numpy', **kwargs)
+    plain = bt.run(prices, signals, risk_per_trade=0.05, highs=highs, lows=lows, allow_short=True)
+
+    assert len(loop['trades']) != len(plain['trades']) or loop['total_return'] != plain['total_return']
+    assert_engines_agree(loop, vec)
+
+
+def test_stop_fills_at_level_and_waits_for_a_new_signal():
+    prices = [100.0, 100.0, 99.0, 99.0, 101.0, 101.0]
+    highs = [100.5, 100.5, 99.5, 99.5, 101.5, 101.5]
+    lows = [99.5, 99.5, 97.0, 98.5, 100.5, 100.5]
+    signals = [1, 1, 1, 2, 1, 0]
+    bt = Backtester(initial_capital=10000, slippage=0.001)
+    for engine in ('python', 'numpy'):
+        res = bt.run(prices, signals, highs=highs, lows=lows, stop_loss=0.02, engine=engine)
+        rows = [(t['type'], t['index']) for t in res['trades']]
+        # stopped on bar 2; the held signals on bars 2-4 do not re-enter
+        assert rows == [('entry', 0), ('exit', 2)], engine
+        stop = 100.0 * 1.001 * 0.98
+        assert res['trades'][1]['price'] == pytest.approx(stop * 0.999)
+
+
+def test_reentry_after_the_signal_changes():
+    prices = [100.0, 100.0, 99.0, 99.0, 101.0, 101.0]
+    highs = [100.5, 100.5, 99.5, 99.5, 101.5, 101.5]
+    lows = [99.5, 99.5, 97.0, 98.5, 100.5, 100.5]
+    res = Backtester(initial_capital=10000).run(prices, [1, 1, 1, 0, 1, 1], highs=highs, lows=lows, stop_loss=0.02)
+    rows = [(t['type'], t['index']) for t in res['trades']]
+    assert rows == [('entry', 0), ('exit', 2), ('entry', 4), ('exit', 5)]
+
+
+@pytest.mark.parametrize('tie_break,expected', [('stop', 98.0), ('target', 103.0), ('nearest', 98.0)])
+def test_tie_break_when_both_levels_are_inside_the_bar(tie_break, expected):
+    prices = [100.0, 100.0, 100.0]
+    highs = [100.0, 104.0, 100.0]
+    lows = [100.0, 97.0, 100.0]
+    bt = Backtester(initial_capital=10000)
+    for engine in ('python', 'numpy'):
+        res = bt.run(prices, [1, 1, 1], highs=highs, lows=lows, stop_loss=0.02, take_profit=0.03,
+                     tie_break=tie_break, engine=engine)
+        assert res['trades'][1]['index'] == 1
+        assert res['trades'][1]['price'] == pytest.approx(expected), engine
+
+
+def test_short_stop_is_above_entry():
+    prices = [100.0, 100.0, 100.0]
+    highs = [100.0, 101.5, 100.0]
+    lows = [100.0, 99.5, 100.0]
+    for engine in ('python', 'numpy'):
+        res = Backtester(initial_capital=10000).run(prices, [-1, -1, -1], highs=highs, lows=lows, stop_loss=0.01,
+                                                    allow_short=True, engine=engine)
+        exit_ = res['trades'][1]
+        assert exit_['index'] == 1 and exit_['price'] == pytest.approx(101.0)
+        assert exit_['pnl'] < 0
+
+
+def test_invalid_stop_arguments():
+    bt = Backtester()
+    with pytest.raises(ValueError):
+        bt.run([1.0, 2.0], [1, 1], stop_loss=0.1, stop_units='pips')
+    with pytest.raises(ValueError):
+        bt.run([1.0, 2.0], [1, 1], stop_loss=0.1, tie_break='first')
@@ -0,0 +1,32 @@
+from src.bot.benchmark import IMPORT_TARGETS, check_imports, compare, import_costs, run_suite
+
+
+def test_run_suite_reports_every_case():
+    report = run_suite(sizes=[500], cases=['backtest_fixed', 'grid_search_ma'], repeat=1)
+    assert set(report['results']) == {'backtest_fixed@500', 'grid_search_ma@500'}
+    for entry in report['results'].values():
+        assert entry['bars'] == 500
+        assert entry['seconds'] > 0
+        assert entry['bars_per_sec'] > 0
+        assert entry['peak_mb'] >= 0
+    assert compare(report, report) == []
+
+
+def test_compare_flags_slowdown_and_memory_growth():
+    baseline = {'results': {'a@1000': {'bars_per_sec': 1000.0, 'peak_mb': 10.0},
+                            'b@1000': {'bars_per_sec': 1000.0, 'peak_mb': 10.0}}}
+    report = {'results': {'a@1000': {'bars_per_sec': 800.0, 'peak_mb': 12.0},
+                          'b@1000': {'bars_per_sec': 500.0, 'peak_mb': 20.0}}}
+    regressions = compare(report, baseline, tolerance=0.25)
+    assert len(regressions) == 2
+    assert all(line.startswith('b@1000') for line in regressions)
+
+
+def test_cold_imports_stay_lazy_and_within_budget():
+    costs = import_costs(repeat=2)
+    assert set(costs) == set(IMPORT_TARGETS)
+    assert check_imports(costs) == []
+    # the gate reports both kinds of problem
+    problems = check_imports({'x': {'seconds': 2.0, 'lazy_loaded': ['pandas']}}, budget=0.5)
+    assert problems == ['x: import takes 2000 ms (budget 500 ms)', 'x: imports pandas at module load']
+
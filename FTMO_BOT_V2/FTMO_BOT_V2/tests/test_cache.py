@@ -0,0 +1,114 @@
+import random
+import sqlite3
+from functools import partial
+
+import pytest
+
+from src.bot.cache import ResultCache, make_key, strategy_id
+from src.bot.optimizer import grid_search_ma, optimize, walk_forward_evaluate
+from src.bot.strategies import RSI_Strategy
+
+
+def make_noisy_prices(n=400, seed=7):
+    rng = random.Random(seed)
+    prices = [100.0]
+    for _ in range(n - 1):
+        prices.append(prices[-1] + rng.gauss(0.05, 1.0))
+    return prices
+
+
+def test_cache_roundtrip_and_eviction(tmp_path):
+    with ResultCache(str(tmp_path / 'c.sqlite'), max_bytes=10_000) as cache:
+        cache.put('a', {'x': [1.0, 2.0]})
+        assert cache.get('a') == {'x': [1.0, 2.0]}
+        assert cache.get('missing') is None
+        assert make_key('a', (1, 2), {'b': 0.1}) == make_key('a', [1, 2], {'b': 0.1})
+        assert make_key('a', 1) != make_key('a', 2)
+
+        cache.put_many((f'k{i}', random.Random(i).randbytes(3000)) for i in range(10))
+        assert cache.size_bytes() <= 10_000
+        assert 'k9' in cache
+        assert 'k0' not in cache
+
+
+def test_grid_search_cache_reuses_results(tmp_path):
+    prices = make_noisy_prices()
+    path = str(tmp_path / 'c.sqlite')
+    with ResultCache(path) as cache:
+        first = grid_search_ma(prices, [3, 5], [20, 30], cache=cache, keep_curves=False)
+        assert cache.misses == 4 and cache.hits == 0
+    with ResultCache(path) as cache:
+        # widened range: only the new combos are computed
+        second = grid_search_ma(prices, [3, 5, 8], [20, 30], cache=cache, keep_curves=False)
+        assert cache.hits == 4 and cache.misses == 2
+        assert second[:4] == first
+        assert second == grid_search_ma(prices, [3, 5, 8], [20, 30], keep_curves=False)
+
+        table = optimize(prices, RSI_Strategy, {'period': [7, 14], 'lower': [30.0], 'upper': [70.0]}, cache=cache)
+        again = optimize(prices, RSI_Strategy, {'period': [7, 14], 'lower': [30.0], 'upper': [70.0]}, cache=cache)
+        assert [r['sharpe'] for r in again.results] == [r['sharpe'] for r in table.results]
+        assert again.results[0]['trades'].to_dicts() == table.results[0]['trades'].to_dicts()
+
+
+def test_walk_forward_cache_computes_only_new_folds(tmp_path):
+    prices = make_noisy_prices(500)
+    kwargs = dict(short_windows=[3, 5], long_windows=[20, 30], train_size=200, test_size=50)
+    with ResultCache(str(tmp_path / 'c.sqlite')) as cache:
+        walk_forward_evaluate(prices[:400], cache=cache, **kwargs)
+        assert cache.misses == 4 * 4
+        appended = walk_forward_evaluate(prices, cache=cache, **kwargs)
+        # 4 old folds per combo are hits, the 2 new folds are computed
+        assert cache.hits == 4 * 4
+        assert cache.misses == 4 * 4 + 4 * 2
+    assert appended == walk_forward_evaluate(prices, **kwargs)
+
+
+def test_partials_key_on_bound_arguments(tmp_path):
+    prices = make_noisy_prices()
+    grid = {'period': [7, 14]}
+    narrow, wide = partial(RSI_Strategy, lower=30.0, upper=70.0), partial(RSI_Strategy, lower=10.0, upper=90.0)
+    assert strategy_id(narrow) != strategy_id(wide)
+    assert strategy_id(narrow) == strategy_id(partial(RSI_Strategy, lower=30.0, upper=70.0))
+    assert strategy_id(RSI_Strategy) == 'src.bot.strategies.RSI_Strategy'
+    with ResultCache(str(tmp_path / 'c.sqlite')) as cache:
+        optimize(prices, narrow, grid, cache=cache, keep_curves=False)
+        cached = optimize(prices, wide, grid, cache=cache, keep_curves=False)
+        assert cache.hits == 0
+    fresh = optimize(prices, wide, grid, keep_curves=False)
+    assert [r['total_return'] for r in cached.results] == [r['total_return'] for r in fresh.results]
+
+
+def test_lambdas_and_closures_are_not_cached(tmp_path):
+    level = 100.0
+
+    def local_factory(period):
+        return RSI_Strategy(period, level, 90.0)
+
+    with ResultCache(str(tmp_path / 'c.sqlite')) as cache:
+        for factory in (lambda period: RSI_Strategy(period), local_factory, partial(lambda period: None)):
+            with pytest.raises(ValueError):
+                optimize(make_noisy_prices(), factory, {'period': [7]}, cache=cache)
+
+
+
+def _hammer_cache(path, worker):
+    with ResultCache(path, max_bytes=200_000) as cache:
+        for i in range(40):
+            cache.put_many((f'{worker}-{i}-{j}', random.Random(i * 10 + j).randbytes(2000)) for j in range(10))
+            cache.get_many(f'{w}-{i}-{j}' for w in range(4) for j in range(10))
+    return worker
+
+
+def test_processes_can_share_one_cache_file(tmp_path):
+    from concurrent.futures import ProcessPoolExecutor
+
+    path = str(tmp_path / 'shared.sqlite')
+    with ProcessPoolExecutor(max_workers=4) as pool:
+        assert list(pool.map(_hammer_cache, [path] * 4, range(4))) == [0, 1, 2, 3]
+    # no 'database is locked' in any worker, and the shared eviction kept the bound
+    with ResultCache(path, max_bytes=200_000) as cache:
+        assert 0 < cache.size_bytes() <= 200_000
+        cache.put('after', [1, 2])
+        assert cache.get('after') == [1, 2]
+    with sqlite3.connect(path) as conn:
+        assert conn.execute('PRAGMA journal_mode').fetchone()[0] == 'wal'
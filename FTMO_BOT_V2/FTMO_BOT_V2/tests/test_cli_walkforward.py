@@ -59,3 +59,93 @@ def test_walkforward_cli_creates_outputs(tmp_path):
     with open(top_csv) as f:
         lines = f.read().strip().splitlines()
     assert len(lines) >= 2
+
+
+def test_walkforward_cli_reoptimize_writes_folds(tmp_path):
+    import os
+
+    csv_path = tmp_path / 'prices.csv'
+    with open(csv_path, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(['Date', 'Close'])
+        for i in range(300):
+            writer.writerow([i, f'{100 + 5 * ((i // 25) % 2) + 0.1 * i:.2f}'])
+
+    repo_root = Path(__file__).resolve().parent.parent
+    env = dict(os.environ, PYTHONPATH=str(repo_root))
+    cmd = [sys.executable, 'scripts/walkforward_cli.py', '--csv', str(csv_path), '--out-dir', str(tmp_path),
+           '--shorts', '3,5', '--longs', '20,30', '--train-size', '100', '--test-size', '50', '--reoptimize', 'rolling']
+    completed = subprocess.run(cmd, cwd=repo_root, capture_output=True, text=True, env=env)
+    assert completed.returncode == 0, f'CLI failed: {completed.stdout}\n{completed.stderr}'
+
+    with open(tmp_path / 'wf_folds.csv') as f:
+        folds = list(csv.DictReader(f))
+    assert [(r['train_start'], r['test_start']) for r in folds] == [('0', '100'), ('50', '150'), ('100', '200'), ('150', '250')]
+    with open(tmp_path / 'wf_oos_equity.csv') as f:
+        equity = list(csv.reader(f))
+    assert equity[0] == ['bar', 'equity'] and equity[1][0] == '100' and len(equity) == 201
+
+
+def _run_cli(args, cwd):
+    import os
+
+    repo_root = Path(__file__).resolve().parent.parent
+    env = dict(os.environ, PYTHONPATH=str(repo_root))
+    completed = subprocess.run([sys.executable, 'scripts/walkforward_cli.py'] + args, cwd=repo_root,
+                               capture_output=True, text=True, env=env)
+    assert completed.returncode == 0, f'CLI failed: {completed.stdout}\n{completed.stderr}'
+
+
+def test_walkforward_cli_batch_consolidates_symbols(tmp_path):
+    import random
+
+    import pytest
+
+    from src.bot.optimizer import walk_forward_evaluate
+
+    data_dir = tmp_path / 'symbols'
+    data_dir.mkdir()
+    closes = {}
+    for k, (symbol, header) in enumerate([('EURUSD', ['time', 'open', 'high', 'low', 'close', 'volume', 'comment']),
+                                          ('XAUUSD', ['Date', 'Open', 'High', 'Low', 'Close']),
+                                          ('US30', ['ts', 'price'])]):
+        rng = random.Random(k)
+        price, rows, close = 100.0, [], []
+        for i in range(260):
+            price += rng.gauss(0.05, 1.0)
+            close.append(round(price, 4))
+            values = {'high': price + 0.5, 'low': price - 0.5, 'open': price, 'volume': 10}
+            rows.append([i if name in ('time', 'Date', 'ts') else 'x' if name == 'comment'
+                         else round(price, 4) if name.lower() in ('close', 'price')
+                         else values[name.lower()] for name in header])
+        closes[symbol] = close
+        with open(data_dir / f'{symbol}.csv', 'w', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(header)
+            writer.writerows(rows)
+    (data_dir / 'notes.txt').write_text('not a symbol')
+
+    out_dir = tmp_path / 'out'
+    _run_cli(['--batch', str(data_dir), '--n-jobs', '2', '--out-dir', str(out_dir), '--shorts', '3,5',
+              '--longs', '20,30', '--train-size', '100', '--test-size', '50', '--top-n', '2'], tmp_path)
+
+    with open(out_dir / 'wf_batch_results.csv') as f:
+        rows = list(csv.DictReader(f))
+    assert [r['symbol'] for r in rows] == ['EURUSD'] * 4 + ['US30'] * 4 + ['XAUUSD'] * 4
+    for symbol, close in closes.items():
+        expected = walk_forward_evaluate(close, [3, 5], [20, 30], train_size=100, test_size=50)
+        got = [r for r in rows if r['symbol'] == symbol]
+        for r, (short, long, metrics) in zip(got, expected):
+            assert (int(r['short']), int(r['long'])) == (short, long)
+            assert float(r['avg_total_return']) == pytest.approx(metrics['avg_total_return'])
+    with open(out_dir / 'wf_batch_top2.csv') as f:
+        top = list(csv.DictReader(f))
+    assert [(r['symbol'], r['rank']) for r in top] == [(s, str(i)) for s in ('EURUSD', 'US30', 'XAUUSD') for i in (1, 2)]
+
+    _run_cli(['--batch', str(data_dir / '*USD.csv'), '--reoptimize', 'anchored', '--out-dir', str(out_dir),
+              '--shorts', '3,5', '--longs', '20,30', '--train-size', '100', '--test-size', '50'], tmp_path)
+    with open(out_dir / 'wf_batch_summary.csv') as f:
+        summary = list(csv.DictReader(f))
+    assert [(r['symbol'], r['folds']) for r in summary] == [('EURUSD', '3'), ('XAUUSD', '3')]
+    with open(out_dir / 'wf_batch_folds.csv') as f:
+        assert sum(1 for _ in csv.DictReader(f)) == 6
@@ -0,0 +1,57 @@
+import numpy as np
+import pytest
+
+from src.bot.backtest import Backtester
+from src.bot.costs import CostModel, calibrate_from_journal
+
+HEADER = 'ts,symbol,side,entry_req,fill,sl,tp,lots,risk_pct,spread_pips_exante,slippage_pts,ticket,retcode,commission,swap,comment\n'
+
+
+def test_fractions_and_backtest_kwargs():
+    model = CostModel.for_symbol('EURUSD', spread_pips=1.0, slippage_pips=0.2, commission_per_lot=7.0)
+    prices = np.array([1.0, 1.25, 1.5])
+    fr = model.fractions(prices)
+    # half spread + slippage = 0.7 pips per side; $3.5 per side of a 100k lot
+    np.testing.assert_allclose(fr['slippage'], 0.00007 / prices)
+    np.testing.assert_allclose(fr['commission'], 3.5 / (100000 * prices))
+    kwargs = model.backtest_kwargs(prices)
+    assert kwargs == {'commission': pytest.approx(3.5 / 125000), 'slippage': pytest.approx(0.00007 / 1.25)}
+    assert Backtester(**kwargs).run([1.25, 1.25], [1, 0])['total_return'] < 0
+
+    # USD-based pair: the pip value depends on the price, the notional does not
+    jpy = CostModel.for_symbol('USDJPY', commission_per_lot=7.0)
+    np.testing.assert_allclose(jpy.fractions([150.0, 100.0])['commission'], 3.5 / 100000)
+    with pytest.raises(ValueError):
+        jpy.risk_per_lot(20)
+
+
+def test_live_sizing_matches_the_trader_formulas():
+    model = CostModel.for_symbol('EURUSD', spread_pips=1.0, slippage_pips=0.2, commission_per_lot=7.0)
+    # calc_lot_by_risk: (stop + spread + slippage) * pip value + commission per lot
+    assert model.risk_per_lot(20) == pytest.approx(21.2 * 10 + 7)
+    assert model.lot_by_risk(200000, 0.01, 20) == pytest.approx(9.13)  # 2000 / 219 floored to 0.01
+    assert model.lot_by_risk(200000, 0.5, 20) == 100.0
+    assert model.lot_by_risk(200000, 0.01, 0) == 0.01
+    # rm_policy.rr_effectif
+    comm_pips = 7.0 / (10 * 2.0)
+    assert model.rr_effective(20, 2, lot=2.0) == pytest.approx((40 - 1.0 - 0.2 - comm_pips) / 20.2)
+
+
+def test_calibrate_from_journal(tmp_path):
+    path = tmp_path / 'journal_trades.csv'
+    path.write_text(
+        HEADER
+        + 'T1,EURUSD,BUY,1.1,1.1001,1.09,1.12,2.0,0.5,0.2,3.0,1,10009,-10.0,-2.0,x\n'
+        + 'T2,EURUSD,SELL,1.1,1.0999,1.11,1.08,1.0,0.5,0.4,1.0,2,10009,-6.0,0.0,x\n'
+        + 'T3,EURUSD,BUY,1.1,0.0,1.09,1.12,1.0,0.5,0.3,110000.0,0,10027,0.0,0.0,x\n'
+        + 'T4,EURUSD,ERROR,"symbol_select(EURUSD) failed",,,,,,,,,,,\n'
+        + 'T5,US30.cash,buy,limit,45850.0,45700.0,46100.0,18.98,1.4999,10044,0,0,error\n'
+        + 'T6,FOO,BUY,1,1,1,1,1,1,5,5,1,1,1,1,x\n')
+    costs = calibrate_from_journal(str(path))
+    assert set(costs) == {'EURUSD'}
+    m = costs['EURUSD']
+    assert m.spread_pips == pytest.approx(0.3)
+    # points -> pips on filled orders only (T3 was not filled)
+    assert m.slippage_pips == pytest.approx(0.2)
+    assert m.commission_per_lot == pytest.approx(5.5)
+    assert m.swap_per_lot == pytest.approx(0.5)
@@ -0,0 +1,58 @@
+import csv
+import math
+
+import numpy as np
+
+from src.bot.backtest import Backtester
+from src.bot.datastore import csv_to_store, is_store, load_store
+from src.bot.optimizer import grid_search_ma_batched, walk_forward_evaluate
+from src.bot.strategies import MovingAverageStrategy
+
+
+def write_ohlc_csv(path, n=300):
+    price = 100.0
+    with open(path, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(['Date', 'Open', 'High', 'Low', 'Close', 'Volume'])
+        for i in range(n):
+            c = price + ((i * 7) % 11 - 5) * 0.3
+            writer.writerow([f'2025-01-01 00:{i % 60:02d}:00', f'{price:.2f}', f'{c + 0.5:.2f}', f'{c - 0.5:.2f}', f'{c:.2f}', i])
+            price += 0.2
+
+
+def test_csv_round_trip_to_memmap(tmp_path):
+    csv_path = tmp_path / 'prices.csv'
+    write_ohlc_csv(csv_path)
+    store = tmp_path / 'store'
+
+    meta = csv_to_store(str(csv_path), str(store), chunksize=64)
+    assert meta['rows'] == 300
+    assert is_store(str(store))
+
+    cols = load_store(str(store))
+    assert set(cols) == {'time', 'open', 'high', 'low', 'close', 'volume'}
+    assert isinstance(cols['close'], np.memmap)
+    assert cols['close'].dtype == np.float64
+    with open(csv_path) as f:
+        expected = [float(row['Close']) for row in csv.DictReader(f)]
+    assert cols['close'].tolist() == expected
+
+
+def test_optimizer_and_backtester_accept_memmaps(tmp_path):
+    csv_path = tmp_path / 'prices.csv'
+    write_ohlc_csv(csv_path)
+    csv_to_store(str(csv_path), str(tmp_path / 'store'))
+    cols = load_store(str(tmp_path / 'store'), columns=['close', 'high', 'low'])
+    close = cols['close']
+    as_list = close.tolist()
+
+    signals = MovingAverageStrategy(short_window=3, long_window=20).generate_signals(close)
+    res = Backtester().run(close, signals)
+    assert math.isclose(res['total_return'], Backtester().run(as_list, signals)['total_return'])
+
+    kwargs = dict(short_windows=[3, 5], long_windows=[20, 30], train_size=100, test_size=50)
+    from_map = walk_forward_evaluate(close, highs=cols['high'], lows=cols['low'], incremental=True, **kwargs)
+    from_list = walk_forward_evaluate(as_list, highs=cols['high'].tolist(), lows=cols['low'].tolist(), **kwargs)
+    assert [(s, l) for s, l, _ in from_map] == [(s, l) for s, l, _ in from_list]
+
+    assert len(grid_search_ma_batched(close, [3, 5], [20, 30])) == 4
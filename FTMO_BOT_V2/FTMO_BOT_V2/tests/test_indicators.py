@@ -0,0 +1,131 @@
+import math
+import random
+
+from src.bot import indicators
+
+
+def make_prices(n=500, seed=5):
+    rng = random.Random(seed)
+    prices = [100.0]
+    for _ in range(n - 1):
+        prices.append(prices[-1] + rng.gauss(0, 1))
+    return prices
+
+
+def wilder(values, period):
+    out = [None] * len(values)
+    prev = sum(values[:period]) / period
+    out[period - 1] = prev
+    for i in range(period, len(values)):
+        prev = (prev * (period - 1) + values[i]) / period
+        out[i] = prev
+    return out
+
+
+def assert_series(actual, expected):
+    assert len(actual) == len(expected)
+    for a, e in zip(actual.tolist(), expected):
+        if e is None:
+            assert math.isnan(a)
+        else:
+            assert math.isclose(a, e, rel_tol=1e-9)
+
+
+def test_sma_and_ema_match_loops():
+    prices = make_prices()
+    expected_sma = [None] * 9 + [sum(prices[i - 9:i + 1]) / 10 for i in range(9, len(prices))]
+    assert_series(indicators.sma(prices, 10), expected_sma)
+
+    alpha = 2.0 / 11
+    expected_ema = [None] * 9 + [sum(prices[:10]) / 10]
+    for p in prices[10:]:
+        expected_ema.append(expected_ema[-1] + alpha * (p - expected_ema[-1]))
+    assert_series(indicators.ema(prices, 10), expected_ema)
+
+
+def test_wilder_atr_and_rsi_match_loops():
+    prices = make_prices()
+    highs = [p + 0.7 for p in prices]
+    lows = [p - 0.4 for p in prices]
+    tr = [max(h - l, abs(h - c), abs(l - c)) for h, l, c in zip(highs, lows, [prices[0]] + prices[:-1])]
+    assert_series(indicators.atr(prices, highs, lows, period=14, method='wilder'), wilder(tr, 14))
+
+    deltas = [b - a for a, b in zip(prices, prices[1:])]
+    gains = wilder([max(d, 0.0) for d in deltas], 14)
+    losses = wilder([max(-d, 0.0) for d in deltas], 14)
+    expected = [None] * 14 + [100 - 100 / (1 + g / l) for g, l in zip(gains[13:], losses[13:])]
+    assert_series(indicators.rsi(prices, 14), expected)
+
+
+def test_results_are_cached_by_content():
+    indicators.clear_cache()
+    prices = make_prices()
+    first = indicators.sma(prices, 20)
+    again = indicators.sma(list(prices), 20)
+    assert again is first
+    assert not first.flags.writeable
+    assert indicators.sma(prices[:-1], 20) is not first
+
+    indicators.set_cache_size(1)
+    try:
+        indicators.sma(prices, 5)
+        assert indicators.cache_info()['size'] == 1
+    finally:
+        indicators.set_cache_size(256)
+
+
+def test_cache_is_bounded_by_bytes():
+    indicators.clear_cache()
+    prices = make_prices(1000)
+    info = indicators.cache_info()
+    assert info['bytes'] == 0 and info['max_bytes'] > 0
+    limit = indicators.cache_info()['max_bytes']
+    indicators.set_cache_size(max_bytes=3 * 8000)
+    try:
+        for window in (5, 10, 20, 30):
+            indicators.sma(prices, window)
+        info = indicators.cache_info()
+        # the cumulative sum (8008 bytes) and the oldest SMAs were evicted to stay under 24000 bytes
+        assert info['bytes'] <= 24000 and info['size'] == 2
+        assert indicators.sma(prices, 30) is indicators.sma(prices, 30)
+        # an array larger than the whole budget is returned but not kept
+        indicators.set_cache_size(max_bytes=4000)
+        assert indicators.cache_info()['size'] == 0 and indicators.cache_info()['bytes'] == 0
+        assert indicators.sma(prices, 5) is not indicators.sma(prices, 5)
+        assert indicators.cache_info()['bytes'] == 0
+    finally:
+        indicators.set_cache_size(max_bytes=limit)
+        indicators.clear_cache()
+
+
+def test_atr_cache_tells_high_and_low_apart():
+    close = make_prices(200)
+    highs = [c + 1.5 for c in close]
+    lows = [c - 2.5 for c in close]
+    indicators.clear_cache()
+    for _ in range(2):
+        # every call after the first finds entries of the other combinations cached
+        for h, lo in ((None, None), (highs, None), (None, lows), (highs, lows)):
+            expected = indicators.ATRStream(14).extend(close, h, lo)
+            assert_series(indicators.atr(close, h, lo, period=14), expected)
+    assert indicators.atr(close, highs, None)[-1] != indicators.atr(close, None, lows)[-1]
+
+    from src.bot.backtest import Backtester
+    bt = Backtester()
+    for h, lo in ((highs, None), (None, lows)):
+        res = bt.run(close, [1] * 200, position_sizing='atr', highs=h, lows=lo, engine='numpy')
+        ref = bt.run(close, [1] * 200, position_sizing='atr', highs=h, lows=lo)
+        assert res['total_return'] == ref['total_return']
+
+
+def test_atr_stream_matches_atr_exactly():
+    close = make_prices(800)
+    highs = [c + 0.5 + (i % 7) * 0.1 for i, c in enumerate(close)]
+    lows = [c - 0.4 - (i % 5) * 0.1 for i, c in enumerate(close)]
+    for method in ('sma', 'wilder'):
+        for period in (1, 14, 30):
+            expected = indicators.atr(close, highs, lows, period=period, method=method).tolist()
+            stream = indicators.ATRStream(period, method)
+            got = stream.extend(close[:300], highs[:300], lows[:300])
+            got += [stream.update(c, h, lo) for c, h, lo in zip(close[300:], highs[300:], lows[300:])]
+            assert [None if math.isnan(v) else v for v in expected] == got
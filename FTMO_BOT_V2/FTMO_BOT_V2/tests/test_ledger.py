@@ -0,0 +1,68 @@
+import csv
+import math
+
+from src.bot.backtest import Backtester
+from src.bot.ledger import TradeLedger
+from src.bot.optimizer import grid_search_ma, grid_search_ma_batched, save_results_csv, trade_stats
+from src.bot.strategies import MovingAverageStrategy
+
+
+def make_prices(n=300):
+    return [100 + i * 0.2 + ((i * 7) % 11 - 5) * 0.6 for i in range(n)]
+
+
+def test_ledger_behaves_like_list_of_dicts():
+    ledger = TradeLedger()
+    ledger.add_entry(3, 101.0, 2.0, 0.1)
+    ledger.add_exit(9, 105.0, 2.0, 8.0, 0.1)
+
+    assert len(ledger) == 2
+    assert ledger[0] == {'type': 'entry', 'index': 3, 'price': 101.0, 'units': 2.0, 'commission': 0.1}
+    assert ledger[-1]['pnl'] == 8.0
+    assert [t['type'] for t in ledger] == ['entry', 'exit']
+    assert ledger.to_dicts() == list(ledger)
+    assert ledger.exits['index'].tolist() == [9]
+    assert ledger.entries['price'].tolist() == [101.0]
+
+
+def test_engines_produce_same_ledger():
+    prices = make_prices()
+    signals = MovingAverageStrategy(short_window=3, long_window=12).generate_signals(prices)
+    bt = Backtester(initial_capital=10000, commission=0.0005, slippage=0.0002)
+    loop = bt.run(prices, signals, risk_per_trade=0.5)['trades']
+    fast = bt.run(prices, signals, risk_per_trade=0.5, engine='numpy')['trades']
+
+    assert isinstance(loop, TradeLedger) and isinstance(fast, TradeLedger)
+    a, b = loop.columns(), fast.columns()
+    assert a['kind'].tolist() == b['kind'].tolist()
+    assert a['index'].tolist() == b['index'].tolist()
+    for x, y in zip(loop.exit_pnls(), fast.exit_pnls()):
+        assert math.isclose(x, y, rel_tol=1e-9)
+
+
+def test_trade_stats_reads_ledger_columns():
+    prices = make_prices()
+    (_, _, res), = grid_search_ma(prices, short_windows=[3], long_windows=[12])
+    stats = trade_stats(res)
+    pnls = [t['pnl'] for t in res['trades'] if t['type'] == 'exit']
+    assert stats['n_trades'] == len(pnls)
+    assert math.isclose(stats['win_rate'], res['win_rate'])
+    assert math.isclose(stats['total_pnl'], sum(pnls))
+
+
+def test_trade_count_survives_keep_curves_false(tmp_path):
+    prices = make_prices()
+    full = grid_search_ma(prices, short_windows=[3, 5], long_windows=[12, 20])
+    for search in (grid_search_ma, grid_search_ma_batched):
+        compact = search(prices, short_windows=[3, 5], long_windows=[12, 20], keep_curves=False)
+        for (_, _, a), (_, _, b) in zip(full, compact):
+            assert b['trades'] is None
+            assert trade_stats(b)['n_trades'] == trade_stats(a)['n_trades'] == b['n_trades']
+            assert trade_stats(b)['wins'] == trade_stats(a)['wins']
+
+    path = tmp_path / 'grid.csv'
+    save_results_csv(compact, str(path))
+    with open(path, newline='') as f:
+        header, *rows = list(csv.reader(f))
+    assert header[:7] == ['short', 'long', 'total_return', 'sharpe', 'sortino', 'cagr', 'max_drawdown']
+    assert all(row[header.index('n_trades')] != '' for row in rows)
@@ -0,0 +1,61 @@
+import math
+import random
+import statistics
+
+from src.bot.backtest import Backtester
+from src.bot.metrics import MetricsAccumulator
+from src.bot.strategies import MovingAverageStrategy
+
+
+def make_prices(n=300, seed=11):
+    rng = random.Random(seed)
+    prices = [100.0]
+    for _ in range(n - 1):
+        prices.append(prices[-1] * (1 + rng.gauss(0.0005, 0.01)))
+    return prices
+
+
+def test_accumulator_matches_batch_statistics():
+    equities = [10000 + ((i * 37) % 23 - 11) * 15.0 + i for i in range(200)]
+    acc = MetricsAccumulator(initial_equity=10000)
+    for e in equities:
+        acc.update(e)
+
+    returns = [(b - a) / a for a, b in zip(equities, equities[1:])]
+    neg = [r for r in returns if r < 0]
+    stats = acc.summary(annualization=252)
+    expected_sharpe = statistics.mean(returns) / statistics.pstdev(returns) * math.sqrt(252)
+    expected_sortino = statistics.mean(returns) / statistics.pstdev(neg) * math.sqrt(252)
+    assert math.isclose(stats['sharpe'], expected_sharpe, rel_tol=1e-9)
+    assert math.isclose(stats['sortino'], expected_sortino, rel_tol=1e-9)
+
+    peak = 10000
+    max_dd = 0.0
+    for e in equities:
+        peak = max(peak, e)
+        max_dd = max(max_dd, (peak - e) / peak)
+    assert math.isclose(stats['max_drawdown'], max_dd)
+
+
+def test_summary_with_final_equity_does_not_mutate():
+    acc = MetricsAccumulator(initial_equity=100)
+    for e in (100, 101, 99, 102):
+        acc.update(e)
+    before = acc.summary()
+    revised = acc.summary(final_equity=90)
+    assert acc.summary() == before
+    assert revised['total_return'] < before['total_return']
+    assert revised['max_drawdown'] > before['max_drawdown']
+
+
+def test_run_without_curves_keeps_metrics():
+    prices = make_prices()
+    signals = MovingAverageStrategy(short_window=3, long_window=12).generate_signals(prices)
+    bt = Backtester(initial_capital=10000, commission=0.0005, slippage=0.0002)
+    full = bt.run(prices, signals, risk_per_trade=0.5)
+
+    for engine in ('python', 'numpy'):
+        lean = bt.run(prices, signals, risk_per_trade=0.5, engine=engine, keep_curves=False)
+        assert lean['equity_curve'] is None and lean['trades'] is None and lean['returns'] is None
+        for key in ('total_return', 'max_drawdown', 'sharpe', 'sortino', 'cagr', 'win_rate'):
+            assert math.isclose(full[key], lean[key], rel_tol=1e-9)
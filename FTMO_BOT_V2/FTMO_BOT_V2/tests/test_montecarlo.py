@@ -0,0 +1,89 @@
+import random
+
+import numpy as np
+import pytest
+
+from src.bot.backtest import Backtester
+from src.bot.montecarlo import load_journal, simulate_challenge, trade_returns
+from src.bot.portfolio import PortfolioBacktester
+
+
+def make_prices(n=600, seed=11):
+    rng = random.Random(seed)
+    prices = [100.0]
+    for _ in range(n - 1):
+        prices.append(max(1.0, prices[-1] + rng.gauss(0.0, 1.0)))
+    return prices
+
+
+def test_trade_returns_compound_to_backtest_return():
+    prices = make_prices()
+    rng = random.Random(3)
+    signals = [rng.choice([1, 0, -1, 2, 2]) for _ in prices]
+    res = Backtester(initial_capital=10000, commission=0.0005, slippage=0.0002).run(
+        prices, signals, risk_per_trade=0.2, allow_short=True)
+    r = trade_returns(res, 10000)
+    assert len(r) == len(res['trades']) // 2
+    assert np.prod(1 + r) - 1 == pytest.approx(res['total_return'])
+
+
+def test_trade_returns_from_portfolio_result():
+    prices = make_prices()
+    signals = [1 if i % 20 < 10 else 0 for i in range(len(prices))]
+    res = PortfolioBacktester(initial_capital=10000).run({'A': prices, 'B': prices[::-1]},
+                                                         {'A': signals, 'B': signals}, max_daily_loss=None,
+                                                         max_total_loss=None)
+    r = trade_returns(res, 10000)
+    assert len(r) == sum(len(t) for t in res['trades'].values()) // 2
+    assert np.prod(1 + r) - 1 == pytest.approx(res['total_return'])
+
+
+def test_deterministic_outcomes():
+    # every trade wins 1%: the 10% target is reached on trade 10 (day 5 at two trades a day)
+    odds = simulate_challenge([0.01], n_paths=100, n_days=30, trades_per_day=2, compound=False)
+    assert odds['pass_rate'] == 1.0 and odds['fail_rate'] == 0.0
+    assert odds['pass_days'][4] == 100 and odds['pass_days'].sum() == 100
+    assert odds['final_return'][50] == pytest.approx(0.10)
+
+    # three 2% losses in a day breach the 5% daily limit on day 1
+    odds = simulate_challenge([-0.02], n_paths=50, n_days=5, trades_per_day=3, compound=False)
+    assert odds['daily_breach_rate'] == 1.0 and odds['breach_days'][0] == 50
+
+    # one 2% loss a day hits the 10% total limit on day 5
+    odds = simulate_challenge([-0.02], n_paths=50, n_days=10, trades_per_day=1, compound=False)
+    assert odds['total_breach_rate'] == 1.0 and odds['breach_days'][4] == 50
+
+    odds = simulate_challenge([0.001], n_paths=10, n_days=5)
+    assert odds['open_rate'] == 1.0
+
+
+def test_rates_are_consistent_and_seeded():
+    rng = np.random.default_rng(0)
+    returns = rng.normal(0.002, 0.01, 300)
+    kwargs = dict(n_paths=5000, n_days=20, trades_per_day=[1, 2, 3], block_size=4, batch_size=1500, seed=7)
+    a = simulate_challenge(returns, **kwargs)
+    b = simulate_challenge(returns, **kwargs)
+    assert a['pass_rate'] == b['pass_rate'] and a['final_return'] == b['final_return']
+    assert a['pass_rate'] + a['fail_rate'] + a['open_rate'] == pytest.approx(1.0)
+    assert a['fail_rate'] == pytest.approx(a['daily_breach_rate'] + a['total_breach_rate'])
+    assert a['pass_days'].sum() == round(a['pass_rate'] * 5000)
+    assert a['breach_days'].sum() == round(a['fail_rate'] * 5000)
+
+
+def test_load_journal(tmp_path):
+    path = tmp_path / 'journal.csv'
+    path.write_text('ts,symbol,pnl\n'
+                    '2025-09-10T10:00:00+00:00,EURUSD,2000\n'
+                    '2025-09-10T12:00:00+00:00,GBPUSD,-1000\n'
+                    '2025-09-11T09:00:00+00:00,ENV_CHECK,\n'
+                    '2025-09-11T10:00:00+00:00,XAUUSD,500\n')
+    journal = load_journal(str(path), account_equity=100000)
+    assert journal['returns'].tolist() == [0.02, -0.01, 0.005]
+    assert journal['trades_per_day'].tolist() == [2, 1]
+
+
+def test_load_journal_requires_a_pnl_column(tmp_path):
+    path = tmp_path / 'journal_trades.csv'
+    path.write_text('ts,symbol,side,fill\n2025-09-10T10:00:00+00:00,EURUSD,BUY,1.17\n')
+    with pytest.raises(ValueError, match="no 'pnl' column"):
+        load_journal(str(path))
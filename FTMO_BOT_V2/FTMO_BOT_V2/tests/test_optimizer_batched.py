@@ -0,0 +1,35 @@
+import math
+import random
+
+from src.bot.optimizer import grid_search_ma, grid_search_ma_batched
+from src.bot.strategies import MovingAverageStrategy
+
+
+def make_noisy_prices(n=300, seed=3):
+    rng = random.Random(seed)
+    prices = [100.0]
+    for _ in range(n - 1):
+        prices.append(prices[-1] + rng.gauss(0.05, 1.0))
+    return prices
+
+
+def test_batch_signals_match_generate_signals():
+    prices = make_noisy_prices()
+    combos = [(3, 10), (5, 20), (8, 40)]
+    matrix = MovingAverageStrategy.batch_signals(prices, combos)
+    for j, (s, l) in enumerate(combos):
+        expected = MovingAverageStrategy(short_window=s, long_window=l).generate_signals(prices)
+        assert matrix[:, j].tolist() == expected
+
+
+def test_grid_search_batched_matches_serial():
+    prices = make_noisy_prices()
+    kwargs = dict(short_windows=[3, 5, 30], long_windows=[10, 20], commission=0.0005, slippage=0.0002)
+    serial = grid_search_ma(prices, **kwargs)
+    batched = grid_search_ma_batched(prices, chunk_size=2, **kwargs)
+
+    assert [(s, l) for s, l, _ in serial] == [(s, l) for s, l, _ in batched]
+    for (_, _, a), (_, _, b) in zip(serial, batched):
+        assert math.isclose(a['total_return'], b['total_return'], rel_tol=1e-9, abs_tol=1e-12)
+        assert math.isclose(a['max_drawdown'], b['max_drawdown'], rel_tol=1e-9, abs_tol=1e-12)
+        assert len(a['trades']) == len(b['trades'])
@@ -0,0 +1,83 @@
+import csv
+import math
+import random
+
+from src.bot.optimizer import (grid_search_rsi, optimize, optimize_walk_forward, save_results_csv,
+                               walk_forward_evaluate)
+from src.bot.results import ResultTable
+from src.bot.strategies import MovingAverageStrategy, RSI_Strategy
+
+
+def make_noisy_prices(n=300, seed=5):
+    rng = random.Random(seed)
+    prices = [100.0]
+    for _ in range(n - 1):
+        prices.append(prices[-1] + rng.gauss(0.05, 1.0))
+    return prices
+
+
+class ThresholdStrategy:
+    """Strategy without batch_signals: long above a fixed level."""
+
+    def __init__(self, level):
+        self.level = level
+
+    def generate_signals(self, prices):
+        return [1 if p > self.level else 0 for p in prices]
+
+
+def test_optimize_matches_grid_search_rsi():
+    prices = make_noisy_prices()
+    grid = {'period': [7, 14], 'lower': [25.0, 30.0], 'upper': [70.0]}
+    table = optimize(prices, RSI_Strategy, grid, commission=0.0005)
+    expected = grid_search_rsi(prices, grid['period'], grid['lower'], grid['upper'], commission=0.0005)
+    assert isinstance(table, ResultTable)
+    assert table.param_names == ['period', 'lower', 'upper']
+    assert table.params == [row[:3] for row in expected]
+    for res, row in zip(table.results, expected):
+        assert math.isclose(res['total_return'], row[3]['total_return'], rel_tol=1e-12, abs_tol=1e-15)
+
+
+def test_optimize_generic_factory_matches_single_runs():
+    from src.bot.backtest import Backtester
+
+    prices = make_noisy_prices()
+    table = optimize(prices, ThresholdStrategy, {'level': [95.0, 100.0, 105.0]}, keep_curves=False)
+    bt = Backtester(initial_capital=10000.0)
+    for (level,), res in zip(table.params, table.results):
+        ref = bt.run(prices, ThresholdStrategy(level).generate_signals(prices))
+        assert math.isclose(res['total_return'], ref['total_return'], rel_tol=1e-9, abs_tol=1e-12)
+        assert res['equity_curve'] is None
+
+
+def test_optimize_constraint_and_top(tmp_path):
+    prices = make_noisy_prices()
+    grid = {'short_window': [3, 5, 30], 'long_window': [10, 20]}
+    table = optimize(prices, MovingAverageStrategy, grid,
+                     constraint=lambda short_window, long_window: short_window < long_window)
+    assert table.params == [(3, 10), (3, 20), (5, 10), (5, 20)]
+
+    top = table.top(2, sort_key='sharpe')
+    sharpes = sorted((v for v in table.column('sharpe') if v is not None), reverse=True)
+    assert top.column('sharpe') == sharpes[:2]
+
+    out = tmp_path / 'grid.csv'
+    save_results_csv(table, str(out))
+    with open(out) as f:
+        rows = list(csv.DictReader(f))
+    assert [(int(r['short_window']), int(r['long_window'])) for r in rows] == table.params
+
+
+def test_optimize_walk_forward_matches_ma_walk_forward():
+    prices = make_noisy_prices(400)
+    grid = {'short_window': [3, 5], 'long_window': [20, 30]}
+    table = optimize_walk_forward(prices, MovingAverageStrategy, grid, train_size=200, test_size=50)
+    reference = walk_forward_evaluate(prices, grid['short_window'], grid['long_window'],
+                                      train_size=200, test_size=50, incremental=True)
+    assert table.params == [(s, l) for s, l, _ in reference]
+    for res, (_, _, ref) in zip(table.results, reference):
+        for key in ('avg_sharpe', 'avg_total_return', 'avg_max_drawdown'):
+            if ref[key] is None:
+                assert res[key] is None
+            else:
+                assert math.isclose(res[key], ref[key], rel_tol=1e-12, abs_tol=1e-15)
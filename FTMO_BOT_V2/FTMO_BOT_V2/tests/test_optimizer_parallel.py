@@ -0,0 +1,57 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from src.bot.optimizer import grid_search_ma, save_results_csv, walk_forward_evaluate, save_walkforward_json
+
+
+def make_prices(n=300):
+    return [100 + i * 0.2 + ((i * 7) % 11 - 5) * 0.3 for i in range(n)]
+
+
+def test_parallel_grid_search_is_byte_identical(tmp_path):
+    prices = make_prices()
+    kwargs = dict(short_windows=[3, 5, 7], long_windows=[15, 20, 30], commission=0.0005, slippage=0.0002)
+    serial = grid_search_ma(prices, **kwargs)
+    parallel = grid_search_ma(prices, n_jobs=2, **kwargs)
+
+    save_results_csv(serial, filename=str(tmp_path / 'serial.csv'))
+    save_results_csv(parallel, filename=str(tmp_path / 'parallel.csv'))
+    assert (tmp_path / 'serial.csv').read_bytes() == (tmp_path / 'parallel.csv').read_bytes()
+
+
+def test_walk_forward_with_executor_keeps_order(tmp_path):
+    prices = make_prices(250)
+    kwargs = dict(short_windows=[3, 5], long_windows=[20, 30], train_size=100, test_size=30)
+    serial = walk_forward_evaluate(prices, **kwargs)
+    with ThreadPoolExecutor(max_workers=3) as pool:
+        threaded = walk_forward_evaluate(prices, executor=pool, **kwargs)
+    pooled = walk_forward_evaluate(prices, n_jobs=2, **kwargs)
+
+    save_walkforward_json(serial, filename=str(tmp_path / 'serial.json'))
+    save_walkforward_json(threaded, filename=str(tmp_path / 'threaded.json'))
+    save_walkforward_json(pooled, filename=str(tmp_path / 'pooled.json'))
+    assert (tmp_path / 'serial.json').read_bytes() == (tmp_path / 'threaded.json').read_bytes()
+    assert (tmp_path / 'serial.json').read_bytes() == (tmp_path / 'pooled.json').read_bytes()
+
+
+class _CountingPool(ThreadPoolExecutor):
+    """Thread pool that records how many chunks each map call received."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.chunks = []
+
+    def map(self, fn, *iterables, **kwargs):
+        iterables = [list(it) for it in iterables]
+        self.chunks.append(len(iterables[0]))
+        return super().map(fn, *iterables, **kwargs)
+
+
+def test_caller_executor_is_chunked_by_n_jobs():
+    prices = make_prices()
+    kwargs = dict(short_windows=[2, 3, 4, 5], long_windows=[15, 20, 30, 40])
+    serial = grid_search_ma(prices, **kwargs)
+    with _CountingPool(max_workers=5) as pool:
+        threaded = grid_search_ma(prices, executor=pool, n_jobs=2, **kwargs)
+
+    assert pool.chunks == [8]
+    assert [(s, l, r['sharpe']) for s, l, r in threaded] == [(s, l, r['sharpe']) for s, l, r in serial]
@@ -1,4 +1,12 @@
-from src.bot.optimizer import grid_search_ma, get_top_results
+import random
+
+import numpy as np
+import pytest
+
+from src.bot import optimizer
+from src.bot.optimizer import grid_search_ma, get_top_results, optimize
+from src.bot.results import TopN
+from src.bot.strategies import MovingAverageStrategy
 
 
 def make_prices(n=200):
@@ -17,5 +25,99 @@ def test_get_top_results():
         assert metrics[i] <= metrics[i - 1]
 
 
+
+def make_noisy_prices(n=300, seed=3):
+    rng = random.Random(seed)
+    prices = [100.0]
+    for _ in range(n - 1):
+        prices.append(prices[-1] + rng.gauss(0.05, 1.0))
+    return prices
+
+
+def test_optimize_top_n_keeps_only_best_results_in_full(monkeypatch):
+    monkeypatch.setattr(optimizer, 'TOP_N_BLOCK', 4)
+    prices = make_noisy_prices()
+    grid = {'short_window': [2, 3, 5, 8], 'long_window': [10, 20, 30]}
+    full = optimize(prices, MovingAverageStrategy, grid)
+    table = optimize(prices, MovingAverageStrategy, grid, top_n=3, sort_key='sharpe')
+    assert table.params == full.params
+    assert table.column('sharpe') == full.column('sharpe')
+    best = full.top(3, sort_key='sharpe')
+    assert table.top(3, sort_key='sharpe').params == best.params
+    kept = {p for p, res in zip(table.params, table.results) if 'equity_curve' in res}
+    assert kept == set(best.params)
+
+    only = optimize(prices, MovingAverageStrategy, grid, top_n=3, sort_key='sharpe', keep_rest=False)
+    assert only.params == [p for p in full.params if p in kept]
+    assert all(res['equity_curve'] is not None for res in only.results)
+
+
+def test_grid_search_ma_top_n_matches_get_top_results(monkeypatch):
+    monkeypatch.setattr(optimizer, 'TOP_N_BLOCK', 5)
+    prices = make_noisy_prices()
+    full = grid_search_ma(prices, [2, 3, 5, 8], [10, 20, 30])
+    rows = grid_search_ma(prices, [2, 3, 5, 8], [10, 20, 30], top_n=2, sort_key='total_return', keep_rest=False)
+    top = get_top_results(full, top_n=2, sort_key='total_return')
+    assert {row[:2] for row in rows} == {row[:2] for row in top}
+    assert rows[0][2]['trades'] is not None
+
+
+def test_top_n_scores_blocks_without_curves(monkeypatch):
+    import concurrent.futures
+
+    monkeypatch.setattr(optimizer, 'TOP_N_BLOCK', 4)
+    with_curves = []
+    chunk = optimizer._optimize_chunk
+
+    def counting_chunk(data, combos, **kwargs):
+        if kwargs['keep_curves']:
+            with_curves.extend(combos)
+        return chunk(data, combos, **kwargs)
+
+    monkeypatch.setattr(optimizer, '_optimize_chunk', counting_chunk)
+    prices = make_noisy_prices()
+    grid = {'short_window': [2, 3, 5, 8], 'long_window': [10, 20, 30]}
+    full = optimize(prices, MovingAverageStrategy, grid)
+    with_curves.clear()
+    table = optimize(prices, MovingAverageStrategy, grid, top_n=3, sort_key='sharpe')
+    # only the final top 3 are backtested with curves, and get the same curves as a full run
+    best = full.top(3, sort_key='sharpe')
+    assert sorted(with_curves) == sorted(best.params)
+    assert table.columns == full.columns
+    top = table.top(3, sort_key='sharpe')
+    for got, want in zip(top.results, best.results):
+        np.testing.assert_allclose(got['equity_curve'], want['equity_curve'])
+        assert got['trades'] is not None
+
+    started = []
+
+    class CountingPool(concurrent.futures.ProcessPoolExecutor):
+        def __init__(self, *args, **kwargs):
+            started.append(self)
+            super().__init__(*args, **kwargs)
+
+    monkeypatch.setattr(concurrent.futures, 'ProcessPoolExecutor', CountingPool)
+    monkeypatch.setattr(optimizer, '_optimize_chunk', chunk)
+    pooled = optimize(prices, MovingAverageStrategy, grid, top_n=3, sort_key='sharpe', n_jobs=2)
+    assert len(started) == 1 and pooled.top(3, sort_key='sharpe').params == best.params
+    rows = grid_search_ma(prices, [2, 3, 5, 8], [10, 20, 30], top_n=2, n_jobs=2)
+    assert len(started) == 2 and len(rows) == 12
+
+
+def test_top_n_ties_and_fallback():
+    best = TopN(2, sort_key='sharpe')
+    best.extend([(1,), (2,), (3,), (4,)], [{'sharpe': 1.0, 'equity_curve': [1]},
+                                           {'sharpe': None, 'total_return': 5.0, 'equity_curve': [2]},
+                                           {'sharpe': 1.0, 'equity_curve': [3]},
+                                           {'sharpe': 0.5, 'equity_curve': [4]}])
+    table = best.table(['p'])
+    assert len(best) == 4 and table.params == [(1,), (2,), (3,), (4,)]
+    # (2,) ranks first through the total-return fallback; of the tied (1,) and (3,) the earlier one stays
+    assert [res.get('equity_curve') for res in table.results] == [[1], [2], None, None]
+    assert table.top(2).params == [(2,), (1,)]
+    with pytest.raises(ValueError):
+        TopN(0)
+
+
 if __name__ == '__main__':
     test_get_top_results()
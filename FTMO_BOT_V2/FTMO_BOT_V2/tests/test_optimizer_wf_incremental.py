@@ -0,0 +1,45 @@
+import math
+
+from src.bot.optimizer import walk_forward_evaluate
+
+
+def make_prices(n=400):
+    return [100 + i * 0.1 + ((i * 13) % 17 - 8) * 0.4 for i in range(n)]
+
+
+def test_incremental_walk_forward_matches_full():
+    prices = make_prices()
+    highs = [p + 0.5 for p in prices]
+    lows = [p - 0.5 for p in prices]
+    kwargs = dict(short_windows=[3, 5], long_windows=[20, 30], train_size=100, test_size=40, step=30,
+                  position_sizing='atr', highs=highs, lows=lows)
+    full = walk_forward_evaluate(prices, **kwargs)
+    fast = walk_forward_evaluate(prices, incremental=True, **kwargs)
+
+    assert [(s, l) for s, l, _ in full] == [(s, l) for s, l, _ in fast]
+    for (_, _, a), (_, _, b) in zip(full, fast):
+        assert a.keys() == b.keys()
+        for key in a:
+            if a[key] is None:
+                assert b[key] is None
+            else:
+                assert math.isclose(a[key], b[key], rel_tol=1e-9, abs_tol=1e-12)
+
+
+def test_incremental_walk_forward_on_consecutive_series():
+    from src.bot import indicators
+
+    indicators.clear_cache()
+    # more combos than the 64-combo chunk, so later chunks must still find the right SMAs
+    kwargs = dict(short_windows=list(range(2, 12)), long_windows=list(range(12, 30)), train_size=100,
+                  test_size=40)
+    for prices in (make_prices(), [200 - p * 0.5 + (i % 7) for i, p in enumerate(make_prices())]):
+        full = walk_forward_evaluate(prices, **kwargs)
+        fast = walk_forward_evaluate(prices, incremental=True, **kwargs)
+        assert len(fast) == 180
+        for (_, _, a), (_, _, b) in zip(full, fast):
+            for key in a:
+                if a[key] is None:
+                    assert b[key] is None
+                else:
+                    assert math.isclose(a[key], b[key], rel_tol=1e-9, abs_tol=1e-12)
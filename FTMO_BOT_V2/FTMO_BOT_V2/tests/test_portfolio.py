@@ -0,0 +1,93 @@
+import math
+import random
+
+import pytest
+
+from src.bot.backtest import Backtester
+from src.bot.portfolio import PortfolioBacktester
+
+
+def make_prices(n=400, seed=5):
+    rng = random.Random(seed)
+    prices = [100.0]
+    for _ in range(n - 1):
+        prices.append(max(1.0, prices[-1] + rng.gauss(0.0, 1.0)))
+    return prices
+
+
+def random_signals(n, seed=2):
+    rng = random.Random(seed)
+    return [rng.choice([1, 0, -1, 2, 2]) for _ in range(n)]
+
+
+def test_single_symbol_without_limits_matches_backtester():
+    prices = make_prices()
+    signals = random_signals(len(prices))
+    kwargs = dict(risk_per_trade=0.1, leverage=2.0, allow_short=True)
+    single = Backtester(initial_capital=10000, commission=0.0005, slippage=0.0002).run(prices, signals, **kwargs)
+    book = PortfolioBacktester(initial_capital=10000, commission=0.0005, slippage=0.0002).run(
+        {'X': prices}, {'X': signals}, max_daily_loss=None, max_total_loss=None, **kwargs)
+
+    assert len(book['trades']['X']) == len(single['trades'])
+    for a, b in zip(book['trades']['X'], single['trades']):
+        assert a['type'] == b['type'] and a['index'] == b['index']
+        for key in ('price', 'units', 'commission', 'pnl'):
+            if key in a:
+                assert math.isclose(a[key], b[key], rel_tol=1e-9, abs_tol=1e-12), key
+    assert book['total_return'] == pytest.approx(single['total_return'])
+    assert book['symbol_pnl']['X'] == pytest.approx(single['equity_curve'][-1] - 10000)
+
+
+def test_position_cap_uses_symbol_order_and_waits_for_a_new_signal():
+    flat = [100.0] * 6
+    prices = {'A': flat, 'B': flat, 'C': flat}
+    signals = {'A': [1, 1, 0, 2, 2, 2], 'B': [1, 1, 1, 1, 1, 1], 'C': [2, 1, 1, 0, 1, 2]}
+    res = PortfolioBacktester(initial_capital=10000).run(prices, signals, max_positions=2)
+    entries = {s: [t['index'] for t in res['trades'][s] if t['type'] == 'entry'] for s in prices}
+    # C is refused on bar 1 (A and B hold both slots) and not re-entered while its signal stays 1
+    assert entries == {'A': [0], 'B': [0], 'C': [4]}
+    assert res['skipped_entries'] == 1
+
+
+def test_daily_loss_flattens_and_blocks_until_next_day():
+    prices = {'A': [100.0, 100.0, 95.0, 96.0, 97.0, 98.0], 'B': [50.0] * 6}
+    signals = {'A': [1, 1, 1, 1, 1, 1], 'B': [2, 2, 2, 1, 1, 1]}
+    days = [1, 1, 1, 1, 2, 2]
+    res = PortfolioBacktester(initial_capital=10000).run(prices, signals, days=days, risk_per_trade=1.0,
+                                                         max_daily_loss=0.04, max_total_loss=None)
+    assert res['daily_breaches'] == [2]
+    assert res['halted_at'] is None
+    a = [(t['type'], t['index']) for t in res['trades']['A']]
+    assert a == [('entry', 0), ('exit', 2)]
+    # B's entry on bar 3 is blocked for the day; its signal never changes afterwards
+    assert len(res['trades']['B']) == 0
+    assert res['equity_curve'][2:] == pytest.approx([9500.0] * 4)
+
+
+def test_total_loss_halts_trading():
+    prices = {'A': [100.0, 98.0, 96.0, 94.0, 92.0, 110.0], 'B': [10.0, 10.0, 10.0, 10.0, 10.0, 10.0]}
+    signals = {'A': [1, 1, 1, 1, 1, 1], 'B': [2, 2, 2, 2, 2, 1]}
+    res = PortfolioBacktester(initial_capital=10000).run(prices, signals, risk_per_trade=1.0, max_daily_loss=None,
+                                                         max_total_loss=0.07)
+    assert res['halted_at'] == 4
+    assert len(res['trades']['B']) == 0
+    assert res['equity_curve'][-1] == pytest.approx(9200.0)
+    assert res['total_return'] == pytest.approx(-0.08)
+
+
+def test_nan_bars_are_not_traded_but_marked():
+    prices = {'A': [100.0, 110.0, 120.0, 130.0], 'B': [float('nan'), 10.0, float('nan'), 12.0]}
+    signals = {'A': [1, 2, 2, 0], 'B': [1, 2, 0, 2]}
+    res = PortfolioBacktester(initial_capital=1000).run(prices, signals, risk_per_trade=0.5)
+    b = [(t['type'], t['index'], t['price']) for t in res['trades']['B']]
+    # B enters once it trades and the flat signal on a closed bar is applied at its next price
+    assert b == [('entry', 1, 10.0), ('exit', 3, 12.0)]
+    assert not any(math.isnan(e) for e in res['equity_curve'])
+
+
+def test_mismatched_inputs_raise():
+    bt = PortfolioBacktester()
+    with pytest.raises(ValueError):
+        bt.run({'A': [1.0, 2.0]}, {'B': [1, 1]})
+    with pytest.raises(ValueError):
+        bt.run({'A': [1.0, 2.0]}, {'A': [1]})
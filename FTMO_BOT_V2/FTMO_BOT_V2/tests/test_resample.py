@@ -0,0 +1,105 @@
+import numpy as np
+import pytest
+
+from src.bot.datastore import (RESAMPLED_DIR, append_store, csv_to_store, load_resampled, load_store,
+                               resample_ohlcv)
+
+MINUTE = 60 * 10 ** 9
+START = np.datetime64('2025-01-06T00:00', 'ns').astype(np.int64)
+
+
+def m1_bars(n, start=0, seed=0):
+    rng = np.random.default_rng(seed)
+    close = 100 + np.cumsum(rng.normal(0, 0.1, n + start))[start:]
+    return {
+        'time': START + (np.arange(n) + start) * MINUTE,
+        'open': close - 0.05,
+        'high': close + rng.random(n),
+        'low': close - rng.random(n),
+        'close': close,
+        'volume': rng.integers(1, 100, n).astype(float),
+    }
+
+
+def write_csv(path, bars):
+    stamps = bars['time'].astype('datetime64[ns]').astype(str)
+    rows = zip(stamps, bars['open'], bars['high'], bars['low'], bars['close'], bars['volume'])
+    with open(path, 'w') as f:
+        f.write('Date,Open,High,Low,Close,Volume\n')
+        f.writelines(','.join(map(str, row)) + '\n' for row in rows)
+
+
+def reference(bars, minutes):
+    """Loop-based OHLCV aggregation."""
+    out = {k: [] for k in bars}
+    step = minutes * MINUTE
+    for i, t in enumerate(bars['time']):
+        b = t // step * step
+        if not out['time'] or out['time'][-1] != b:
+            out['time'].append(b)
+            out['open'].append(bars['open'][i])
+            out['high'].append(bars['high'][i])
+            out['low'].append(bars['low'][i])
+            out['volume'].append(0.0)
+            out['close'].append(None)
+        out['high'][-1] = max(out['high'][-1], bars['high'][i])
+        out['low'][-1] = min(out['low'][-1], bars['low'][i])
+        out['close'][-1] = bars['close'][i]
+        out['volume'][-1] += bars['volume'][i]
+    return {k: np.asarray(v) for k, v in out.items()}
+
+
+@pytest.mark.parametrize('timeframe,minutes', [('M5', 5), ('H1', 60), ('D1', 1440)])
+def test_resample_matches_reference(timeframe, minutes):
+    bars = m1_bars(3000)
+    # a gap (e.g. a closed market) must not create empty bars
+    keep = np.ones(3000, dtype=bool)
+    keep[1000:1500] = False
+    bars = {k: v[keep] for k, v in bars.items()}
+    out = resample_ohlcv(bars, timeframe)
+    expected = reference(bars, minutes)
+    for name in bars:
+        np.testing.assert_array_equal(out[name], expected[name])
+
+
+def test_resample_rejects_unknown_timeframe_and_unsorted_bars():
+    bars = m1_bars(10)
+    with pytest.raises(ValueError):
+        resample_ohlcv(bars, 'W2')
+    with pytest.raises(ValueError):
+        resample_ohlcv({k: v[::-1] for k, v in bars.items()}, 'M5')
+
+
+def test_cached_aggregates_follow_appends(tmp_path):
+    full = m1_bars(2000)
+    write_csv(tmp_path / 'm1.csv', {k: v[:1234] for k, v in full.items()})
+    store = tmp_path / 'store'
+    csv_to_store(str(tmp_path / 'm1.csv'), str(store))
+
+    h1 = load_resampled(str(store), 'H1')
+    np.testing.assert_allclose(h1['close'], resample_ohlcv(load_store(str(store)), 'H1')['close'])
+    assert (store / RESAMPLED_DIR / 'H1' / 'close.npy').exists()
+    load_resampled(str(store), 'M5')
+
+    base = load_store(str(store), mmap=False)
+    for lo, hi in ((1234, 1300), (1300, 1301), (1301, 2000)):
+        append_store(str(store), {k: v[lo:hi] for k, v in full.items()})
+    merged = load_store(str(store))
+    assert len(merged['close']) == 2000
+    np.testing.assert_array_equal(merged['close'][:1234], base['close'])
+
+    for timeframe in ('H1', 'M5'):
+        cached = load_resampled(str(store), timeframe)
+        fresh = resample_ohlcv(load_store(str(store)), timeframe)
+        for name in fresh:
+            np.testing.assert_allclose(cached[name], fresh[name])
+
+
+def test_append_rejects_overlapping_bars(tmp_path):
+    bars = m1_bars(100)
+    write_csv(tmp_path / 'm1.csv', bars)
+    csv_to_store(str(tmp_path / 'm1.csv'), str(tmp_path / 'store'))
+    with pytest.raises(ValueError):
+        append_store(str(tmp_path / 'store'), {k: v[-5:] for k, v in bars.items()})
+    with pytest.raises(ValueError):
+        append_store(str(tmp_path / 'store'), {'close': [1.0]})
@@ -0,0 +1,143 @@
+import csv
+import math
+import random
+
+import numpy as np
+import pytest
+
+from src.bot.optimizer import get_top_results, grid_search_ma, optimize, optimize_walk_forward, save_results_csv
+from src.bot.resultstore import ResultReader, ResultWriter
+from src.bot.strategies import MovingAverageStrategy
+
+
+def make_noisy_prices(n=300, seed=11):
+    rng = random.Random(seed)
+    prices = [100.0]
+    for _ in range(n - 1):
+        prices.append(prices[-1] + rng.gauss(0.05, 1.0))
+    return prices
+
+
+GRID = {'short_window': [2, 3, 5, 8], 'long_window': [10, 20, 30]}
+
+
+def test_optimize_writer_matches_result_table(tmp_path):
+    prices = make_noisy_prices()
+    table = optimize(prices, MovingAverageStrategy, GRID)
+    writer = ResultWriter(tmp_path / 'grid', curve_points=50, part_rows=5)
+    reader = optimize(prices, MovingAverageStrategy, GRID, writer=writer)
+    assert isinstance(reader, ResultReader)
+    assert len(reader) == len(table) and len(reader.parts) == 3
+    assert reader.param_names == table.param_names
+    assert reader.metric_names == table.metric_names
+    for name in table.columns:
+        expected = np.array([np.nan if v is None else v for v in table.column(name)], dtype=float)
+        np.testing.assert_array_equal(reader.column(name), expected)
+
+    top = reader.top(5, sort_key='sharpe')
+    expected = table.top(5, sort_key='sharpe')
+    assert top.params == expected.params
+    assert top.column('sharpe') == expected.column('sharpe')
+    assert get_top_results(reader, top_n=5).params == expected.params
+
+    # curves are downsampled to curve_points, keeping the first and last value
+    curves = reader.curves()
+    assert curves.shape == (len(table), 50) and curves.dtype == np.float32
+    for i, res in enumerate(table.results):
+        assert curves[i, 0] == np.float32(res['equity_curve'][0])
+        assert curves[i, -1] == np.float32(res['equity_curve'][-1])
+    np.testing.assert_array_equal(reader.curves([7, 1]), curves[[7, 1]])
+
+
+def test_csv_export_streams_parts(tmp_path):
+    prices = make_noisy_prices()
+    table = optimize(prices, MovingAverageStrategy, GRID)
+    with ResultWriter(tmp_path / 'grid', part_rows=4) as writer:
+        writer.write_table(table)
+    save_results_csv(writer.reader(), str(tmp_path / 'store.csv'))
+    table.to_csv(str(tmp_path / 'table.csv'))
+    with open(tmp_path / 'store.csv') as f1, open(tmp_path / 'table.csv') as f2:
+        got, want = list(csv.reader(f1)), list(csv.reader(f2))
+    assert got[0] == want[0]
+    for a, b in zip(got[1:], want[1:]):
+        assert a[:2] == b[:2]
+        for x, y in zip(a[2:], b[2:]):
+            assert x == y or math.isclose(float(x), float(y))
+
+
+def test_walk_forward_writer_keeps_folds(tmp_path):
+    prices = make_noisy_prices(400)
+    grid = {'short_window': [3, 5], 'long_window': [10, 20]}
+    table = optimize_walk_forward(prices, MovingAverageStrategy, grid, train_size=100, test_size=100,
+                                  keep_folds=True)
+    folds = table.results[0]['folds']
+    assert len(folds['sharpe']) == 3
+    assert table.results[0]['avg_total_return'] == pytest.approx(np.mean(folds['total_return']))
+
+    reader = optimize_walk_forward(prices, MovingAverageStrategy, grid, train_size=100, test_size=100,
+                                   writer=ResultWriter(tmp_path / 'wf', part_rows=3))
+    assert set(reader.fold_names) == set(folds)
+    per_fold = reader.folds('total_return')
+    assert per_fold.shape == (4, 3)
+    np.testing.assert_allclose(per_fold, [res['folds']['total_return'] for res in table.results])
+    np.testing.assert_allclose(np.nanmean(per_fold, axis=1), reader.column('avg_total_return'))
+    best = reader.top(1, sort_key='avg_sharpe')
+    assert best.params == table.top(1, sort_key='avg_sharpe').params
+    assert best.results[0]['folds']['total_return'] == pytest.approx(per_fold[reader.sorted_indices('avg_sharpe')[0]])
+
+
+def test_reader_sees_completed_parts_while_writing(tmp_path):
+    rows = grid_search_ma(make_noisy_prices(), [2, 3, 5], [10, 20], keep_curves=False)
+    writer = ResultWriter(tmp_path / 'ma', part_rows=4)
+    assert len(ResultReader(tmp_path / 'ma')) == 0
+    writer.write_table(rows)
+    # one full part written, the other two rows still buffered
+    reader = ResultReader(tmp_path / 'ma')
+    assert len(reader) == 4 and reader.param_names == ['short', 'long']
+    assert reader.take([3]).params == [rows[3][:2]]
+    writer.close()
+    reader = ResultReader(tmp_path / 'ma')
+    assert len(reader) == 6
+    np.testing.assert_array_equal(reader.column('long'), [row[1] for row in rows])
+    with pytest.raises(ValueError):
+        writer.write(['a'], [(1,)], [{}])
+    with pytest.raises(KeyError):
+        reader.curves()
+
+
+def test_missing_metrics_are_nan_and_rank_last(tmp_path):
+    with ResultWriter(tmp_path / 'x') as writer:
+        writer.write(['p'], [(1,), (2,), (3,)], [{'sharpe': None, 'total_return': 0.1},
+                                                 {'sharpe': 0.5, 'total_return': 0.2},
+                                                 {'total_return': None}])
+    reader = writer.reader()
+    np.testing.assert_array_equal(reader.column('sharpe'), [np.nan, 0.5, np.nan])
+    top = reader.top(3)
+    assert top.params == [(2,), (1,), (3,)]
+    assert top.results[2] == {'sharpe': None, 'total_return': None}
+
+
+def test_streaming_run_reuses_one_process_pool(tmp_path, monkeypatch):
+    import concurrent.futures
+
+    started = []
+
+    class CountingPool(concurrent.futures.ProcessPoolExecutor):
+        def __init__(self, *args, **kwargs):
+            started.append(self)
+            super().__init__(*args, **kwargs)
+
+    monkeypatch.setattr(concurrent.futures, 'ProcessPoolExecutor', CountingPool)
+    prices = make_noisy_prices()
+    table = optimize(prices, MovingAverageStrategy, GRID, keep_curves=False)
+    reader = optimize(prices, MovingAverageStrategy, GRID, keep_curves=False, n_jobs=2,
+                      writer=ResultWriter(tmp_path / 'grid', part_rows=4))
+    assert len(reader.parts) == 3 and len(started) == 1
+    np.testing.assert_allclose(reader.column('sharpe'), table.column('sharpe'))
+
+    grid = {'short_window': [3, 5], 'long_window': [10, 20]}
+    wf = optimize_walk_forward(prices, MovingAverageStrategy, grid, train_size=100, test_size=100)
+    reader = optimize_walk_forward(prices, MovingAverageStrategy, grid, train_size=100, test_size=100, n_jobs=2,
+                                   writer=ResultWriter(tmp_path / 'wf', part_rows=1))
+    assert len(reader.parts) == 4 and len(started) == 2
+    np.testing.assert_allclose(reader.column('avg_sharpe'), wf.column('avg_sharpe'))
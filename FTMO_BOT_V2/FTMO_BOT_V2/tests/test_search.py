@@ -0,0 +1,71 @@
+import random
+
+from src.bot.optimizer import optimize
+from src.bot.search import hyperband, successive_halving, surrogate_search
+from src.bot.strategies import MovingAverageStrategy
+
+
+def make_noisy_prices(n=2000, seed=11):
+    rng = random.Random(seed)
+    prices = [100.0]
+    for _ in range(n - 1):
+        prices.append(max(1.0, prices[-1] + rng.gauss(0.02, 1.0)))
+    return prices
+
+
+GRID = {'short_window': [2, 3, 5, 8, 13], 'long_window': [20, 30, 50, 80, 120]}
+
+
+def test_successive_halving_full_budget_matches_grid():
+    prices = make_noisy_prices()
+    # min_bars above the series length: a single full-length rung, i.e. the exhaustive grid
+    table = successive_halving(prices, MovingAverageStrategy, GRID, min_bars=len(prices), top_n=5)
+    full = optimize(prices, MovingAverageStrategy, GRID).top(5)
+    assert table.params == full.params
+    assert table.column('sharpe') == full.column('sharpe')
+
+
+def test_successive_halving_returns_top_schema():
+    prices = make_noisy_prices()
+    table = successive_halving(prices, MovingAverageStrategy, GRID, min_bars=200, eta=2, top_n=3,
+                               keep_curves=False)
+    assert len(table) == 3
+    sharpes = table.column('sharpe')
+    assert sharpes == sorted(sharpes, key=lambda v: float('-inf') if v is None else v, reverse=True)
+    # survivors carry full-series metrics
+    grid = optimize(prices, MovingAverageStrategy, GRID, keep_curves=False)
+    full = dict(zip(grid.params, grid.results))
+    for params, res in zip(table.params, table.results):
+        assert res['sharpe'] == full[params]['sharpe']
+
+
+def test_hyperband_and_surrogate_return_evaluated_top():
+    prices = make_noisy_prices()
+    full = optimize(prices, MovingAverageStrategy, GRID, keep_curves=False)
+    by_params = dict(zip(full.params, full.results))
+
+    hb = hyperband(prices, MovingAverageStrategy, GRID, min_bars=200, top_n=4, seed=1)
+    assert 0 < len(hb) <= 4
+    for params, res in zip(hb.params, hb.results):
+        assert res['total_return'] == by_params[params]['total_return']
+
+    sg = surrogate_search(prices, MovingAverageStrategy, GRID, n_initial=8, n_iter=3, batch_size=4,
+                          top_n=4, seed=1)
+    assert len(sg) == 4
+    assert len(set(sg.params)) == 4
+    for params, res in zip(sg.params, sg.results):
+        assert res['total_return'] == by_params[params]['total_return']
+        assert res['equity_curve'] is not None
+
+
+def test_halving_ranks_missing_metrics_like_result_table():
+    from src.bot.results import ResultTable
+    from src.bot.search import _ranked
+
+    results = [{'sharpe': None, 'total_return': 0.3}, {'sharpe': 0.5, 'total_return': 0.1},
+               {'sharpe': float('nan'), 'total_return': 0.9}, {'total_return': None}, {'sharpe': 0.2}]
+    combos = [(i,) for i in range(len(results))]
+    order = _ranked(combos, results, 'sharpe')
+    # the missing sharpe falls back to the total return; NaN and no value at all rank last
+    assert order == [1, 0, 4, 2, 3]
+    assert [combos[i] for i in order] == ResultTable(['p'], combos, results).top(5).params
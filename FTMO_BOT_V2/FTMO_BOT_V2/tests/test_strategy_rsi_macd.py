@@ -0,0 +1,60 @@
+import random
+
+from src.bot import indicators
+from src.bot.backtest import Backtester
+from src.bot.optimizer import grid_search_macd, grid_search_rsi
+from src.bot.strategies import MACD_Strategy, RSI_Strategy
+
+
+def make_noisy_prices(n=400, seed=9):
+    rng = random.Random(seed)
+    prices = [100.0]
+    for _ in range(n - 1):
+        prices.append(prices[-1] + rng.gauss(0, 1))
+    return prices
+
+
+def test_rsi_strategy_follows_thresholds():
+    prices = make_noisy_prices()
+    strat = RSI_Strategy(period=14, lower=35, upper=65)
+    signals = strat.execute(prices)
+    rsi = indicators.rsi(prices, 14).tolist()
+
+    assert len(signals) == len(prices)
+    assert set(signals) <= {0, 1}
+    position = 0
+    for value, signal in zip(rsi, signals):
+        if value < 35:
+            position = 1
+        elif value > 65:
+            position = 0
+        assert signal == position
+
+
+def test_macd_strategy_long_above_signal_line():
+    prices = make_noisy_prices()
+    signals = MACD_Strategy(12, 26, 9).execute(prices)
+    macd = indicators.ema(prices, 12) - indicators.ema(prices, 26)
+    line = indicators.ema(macd[25:], 9)
+
+    assert signals[:25 + 8] == [0] * (25 + 8)
+    for i, (m, s) in enumerate(zip(macd[25 + 8:], line[8:]), start=25 + 8):
+        if m != s:
+            assert signals[i] == int(m > s)
+
+
+def test_batched_rsi_and_macd_grids_match_single_runs():
+    prices = make_noisy_prices()
+    bt = Backtester(initial_capital=10000)
+
+    rsi_results = grid_search_rsi(prices, periods=[7, 14], lowers=[30, 40], uppers=[60, 70], chunk_size=3)
+    assert len(rsi_results) == 8
+    for period, lower, upper, res in rsi_results:
+        signals = RSI_Strategy(period, lower, upper).generate_signals(prices)
+        assert abs(bt.run(prices, signals)['total_return'] - res['total_return']) < 1e-12
+
+    macd_results = grid_search_macd(prices, short_windows=[5, 12], long_windows=[12, 26], signal_windows=[9])
+    assert [(s, l, g) for s, l, g, _ in macd_results] == [(5, 12, 9), (5, 26, 9), (12, 26, 9)]
+    for short, long, signal, res in macd_results:
+        signals = MACD_Strategy(short, long, signal).generate_signals(prices)
+        assert abs(bt.run(prices, signals)['total_return'] - res['total_return']) < 1e-12
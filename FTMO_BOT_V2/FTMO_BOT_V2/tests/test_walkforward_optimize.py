@@ -0,0 +1,74 @@
+import math
+import random
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pytest
+
+from src.bot.backtest import Backtester
+from src.bot.optimizer import optimize, walk_forward_optimize
+from src.bot.strategies import MovingAverageStrategy
+
+GRID = {'short_window': [2, 3, 5, 8], 'long_window': [10, 20, 40]}
+
+
+def make_noisy_prices(n=700, seed=21):
+    rng = random.Random(seed)
+    prices = [100.0]
+    for _ in range(n - 1):
+        prices.append(prices[-1] * (1 + rng.gauss(0.0002, 0.01)))
+    return prices
+
+
+def test_anchored_selects_on_train_and_stitches_test_windows():
+    prices = make_noisy_prices()
+    res = walk_forward_optimize(prices, MovingAverageStrategy, GRID, train_size=200, test_size=100,
+                                sort_key='sharpe', commission=0.0005, initial_capital=10000.0)
+    folds = res['folds']
+    assert len(folds) == 5
+    balance = 10000.0
+    for row, combo in zip(folds.rows(), folds.params):
+        assert row['train_start'] == 0
+        a, b = row['test_start'], row['test_end']
+        # windows starting at bar 0 see the same signals as a plain grid search on the train prefix
+        train = optimize(prices[:a], MovingAverageStrategy, GRID, commission=0.0005, keep_curves=False)
+        assert train.top(1, sort_key='sharpe').params == [combo]
+        assert row['train_score'] == pytest.approx(train.top(1, sort_key='sharpe').results[0]['sharpe'])
+
+        signals = MovingAverageStrategy(*combo).generate_signals(prices)
+        ref = Backtester(initial_capital=balance, commission=0.0005).run(prices[a:b], signals[a:b])
+        assert row['total_return'] == pytest.approx(ref['total_return'])
+        balance = ref['equity_curve'][-1]
+
+    curve = res['equity_curve']
+    assert len(curve) == 500
+    assert curve[-1] == pytest.approx(balance)
+    assert res['total_return'] == pytest.approx(balance / 10000.0 - 1)
+    assert math.isclose(1 + res['total_return'], np.prod([1 + r for r in folds.column('total_return')]))
+
+
+def test_rolling_windows_and_parallel_parity():
+    prices = make_noisy_prices()
+    res = walk_forward_optimize(prices, MovingAverageStrategy, GRID, train_size=200, test_size=100, step=150,
+                                anchored=False)
+    rows = res['folds'].rows()
+    assert [(r['train_start'], r['train_end'], r['test_start'], r['test_end']) for r in rows] == \
+        [(0, 200, 200, 300), (150, 350, 350, 450), (300, 500, 500, 600)]
+    # bars between test windows are not traded
+    assert len(res['equity_curve']) == 300
+
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        par = walk_forward_optimize(prices, MovingAverageStrategy, GRID, train_size=200, test_size=100, step=150,
+                                    anchored=False, executor=pool, chunk_size=3)
+    assert par['folds'].params == res['folds'].params
+    np.testing.assert_array_equal(par['equity_curve'], res['equity_curve'])
+
+
+def test_overlapping_test_windows_are_cut_and_short_series_rejected():
+    prices = make_noisy_prices(400)
+    res = walk_forward_optimize(prices, MovingAverageStrategy, GRID, train_size=200, test_size=100, step=50)
+    bounds = [(r['test_start'], r['test_end']) for r in res['folds'].rows()]
+    assert bounds == [(200, 250), (250, 300), (300, 400)]
+    assert len(res['equity_curve']) == 200
+    with pytest.raises(ValueError):
+        walk_forward_optimize(prices[:250], MovingAverageStrategy, GRID, train_size=200, test_size=100)